@@ -0,0 +1,139 @@
+"""
+Task 2 F_1 Benchmark
+Compares latency and token usage of the two-call F_1 chain against the single structured call
+
+Run from the code/ directory:
+    python -m benchmarks.bench_task_2_f1 --runs 3
+"""
+
+import argparse
+import math
+import re
+import statistics
+import time
+
+from config.config import get_question_file_path, get_error_file_path, get_answer_file_path
+from utils.task_2_data_manager import DataManager
+from utils.task_2_llm_handler import LLMHandler
+from utils.llm_metrics import summarize_calls
+
+
+def build_responses(question, answer):
+    """
+    Build synthetic participant responses for one set
+
+    Args:
+        question (str): Paragraph with errors
+        answer (str): Corrected paragraph
+
+    Returns:
+        dict: Response label -> response text
+    """
+    question_sentences = re.split(r'(?<=[.!?])\s+', question.strip())
+    answer_sentences = re.split(r'(?<=[.!?])\s+', answer.strip())
+    half = len(answer_sentences) // 2
+
+    return {
+        "uncorrected": question,
+        "half_corrected": " ".join(answer_sentences[:half] + question_sentences[half:]),
+        "incomplete": " ".join(answer_sentences[:half]),
+        "fully_corrected": answer
+    }
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_mode(handler, mode, cases, runs):
+    """
+    Run every case in one F_1 mode
+
+    Args:
+        handler (LLMHandler): Task 2 handler (cache disabled)
+        mode (str): "chain" or "single"
+        cases (list): (set_number, label, question, answer, error_list, response) tuples
+        runs (int): Repetitions per case
+
+    Returns:
+        dict: Latencies, token totals and call counts
+    """
+    handler.f1_mode = mode
+    latencies = []
+    prompt_tokens = []
+    completion_tokens = []
+    calls = []
+
+    for set_number, label, question, answer, error_list, response in cases:
+        for _ in range(runs):
+            handler.call_log.drain()
+            start = time.perf_counter()
+            feedback = handler.get_feedback_response("F_1", question, answer, error_list, response)
+            elapsed = time.perf_counter() - start
+            summary = summarize_calls(handler.call_log.drain())
+
+            latencies.append(elapsed)
+            prompt_tokens.append(summary["prompt_tokens"])
+            completion_tokens.append(summary["completion_tokens"])
+            calls.append(summary["calls"])
+            print(f"  [{mode}] set {set_number} {label}: {elapsed:.2f}s -> {feedback}")
+
+    return {
+        "latencies": latencies,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "calls": calls
+    }
+
+
+def print_summary(results):
+    """Print a comparison table"""
+    print(f"\n{'='*78}")
+    print(f"{'mode':<8} {'n':>4} {'calls':>6} {'mean s':>8} {'p50 s':>8} {'p90 s':>8} "
+          f"{'prompt tok':>11} {'compl tok':>10}")
+    print(f"{'-'*78}")
+    for mode, result in results.items():
+        latencies = result["latencies"]
+        print(f"{mode:<8} {len(latencies):>4} {statistics.mean(result['calls']):>6.1f} "
+              f"{statistics.mean(latencies):>8.2f} {percentile(latencies, 0.5):>8.2f} "
+              f"{percentile(latencies, 0.9):>8.2f} {statistics.mean(result['prompt_tokens']):>11.0f} "
+              f"{statistics.mean(result['completion_tokens']):>10.0f}")
+    print(f"{'='*78}\n")
+
+
+def main():
+    """Benchmark both F_1 modes on the database/task_2 sets"""
+    parser = argparse.ArgumentParser(description="Task 2 F_1 chain vs single-call benchmark")
+    parser.add_argument('--sets', type=str, default="1,2,3,4,5,6,7,8",
+                        help='Comma-separated set numbers')
+    parser.add_argument('--runs', type=int, default=1,
+                        help='Repetitions per set and response')
+    parser.add_argument('--modes', type=str, default="chain,single",
+                        help='Comma-separated F_1 modes to compare')
+    args = parser.parse_args()
+
+    data_manager = DataManager()
+    cases = []
+    for set_number in args.sets.split(','):
+        question = data_manager.load_file(get_question_file_path(2, set_number))
+        answer = data_manager.load_file(get_answer_file_path(2, set_number))
+        error_list = data_manager.load_file(get_error_file_path(2, set_number))
+        for label, response in build_responses(question, answer).items():
+            cases.append((set_number, label, question, answer, error_list, response))
+
+    handler = LLMHandler()
+    handler.cache = None  # always measure real round trips
+    handler.request_policy = None  # no hedging or canned fallbacks in the comparison
+
+    results = {}
+    for mode in args.modes.split(','):
+        print(f"\nRunning F_1 mode '{mode}' on {len(cases)} cases x {args.runs} runs...")
+        results[mode] = run_mode(handler, mode, cases, args.runs)
+
+    print_summary(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+TTS Engine Benchmark
+Compares synthesis latency of the local engine (espeak-ng / Piper) with gTTS and Google Cloud TTS
+
+Run from the code/ directory:
+    python -m benchmarks.bench_tts_engines --runs 3
+    python -m benchmarks.bench_tts_engines --engines local --play
+
+The audio cache is bypassed so every request is a real synthesis. The first request
+of each engine is reported separately (cold: client, channel or model start-up).
+"""
+
+import argparse
+import math
+import statistics
+import time
+
+from config.config import TTS_ENGINES, TTS_LOCAL_SYNTHESIZER, FALLBACK_FEEDBACK
+from utils.tts_handler import TTSHandler
+
+# Short and long utterances the voice agent speaks
+SAMPLE_TEXTS = [
+    "Great job!",
+    "You're making steady progress with your designs.",
+    FALLBACK_FEEDBACK["task_1"]["F_1"],
+    FALLBACK_FEEDBACK["task_2"]["F_1"],
+]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_engine(handler, engine, texts, runs, play):
+    """
+    Synthesize (and optionally play) every text with one engine
+
+    Args:
+        handler (TTSHandler): Handler with the audio cache disabled
+        engine (str): "google_cloud", "gtts" or "local"
+        texts (list): Utterances
+        runs (int): Repetitions per utterance
+        play (bool): Play through speak_with_engine and time the first audio
+
+    Returns:
+        dict: cold, latencies, real-time factors, first-audio times and failures
+    """
+    cold = None
+    latencies = []
+    real_time_factors = []
+    first_audio = []
+    failures = 0
+
+    for text in texts:
+        for _ in range(runs):
+            try:
+                start = time.perf_counter()
+                audio_content, encoding = handler.synthesize(text, engine)
+                elapsed = time.perf_counter() - start
+                if play:
+                    result = handler.speak_with_engine(text, engine)
+                    first_audio.append(result["time_to_first_audio_s"])
+            except Exception as e:
+                failures += 1
+                print(f"  [{engine}] failed: {e}")
+                continue
+
+            duration = handler.audio_output.duration(handler.audio_output.decode(audio_content, encoding))
+            if cold is None:
+                cold = elapsed
+                print(f"  [{engine}] cold {elapsed:.3f}s")
+                continue
+
+            latencies.append(elapsed)
+            real_time_factors.append(elapsed / duration if duration else 0.0)
+            print(f"  [{engine}] {elapsed:.3f}s for {duration:.2f}s of audio: {text[:40]!r}")
+
+    return {
+        "cold": cold,
+        "latencies": latencies,
+        "real_time_factors": real_time_factors,
+        "first_audio": first_audio,
+        "failures": failures
+    }
+
+
+def print_summary(results):
+    """Print a comparison table"""
+    print(f"\n{'='*84}")
+    print(f"{'engine':<14} {'n':>4} {'fail':>5} {'cold s':>8} {'mean s':>8} {'p50 s':>8} {'p90 s':>8} "
+          f"{'RTF':>6} {'1st audio s':>12}")
+    print(f"{'-'*84}")
+    for engine, result in results.items():
+        latencies = result["latencies"]
+        if not latencies:
+            print(f"{engine:<14} {0:>4} {result['failures']:>5}   (no successful warm requests)")
+            continue
+        cold = f"{result['cold']:.2f}" if result["cold"] is not None else "-"
+        first_audio = f"{statistics.mean(result['first_audio']):.2f}" if result["first_audio"] else "-"
+        print(f"{engine:<14} {len(latencies):>4} {result['failures']:>5} {cold:>8} "
+              f"{statistics.mean(latencies):>8.3f} {percentile(latencies, 0.5):>8.3f} "
+              f"{percentile(latencies, 0.9):>8.3f} {statistics.mean(result['real_time_factors']):>6.2f} "
+              f"{first_audio:>12}")
+    print(f"{'='*84}")
+    print("RTF = synthesis time / audio duration (below 1 is faster than real time)\n")
+
+
+def main():
+    """Benchmark the TTS engines on the sample utterances"""
+    parser = argparse.ArgumentParser(description="Local vs cloud TTS latency benchmark")
+    parser.add_argument('--engines', type=str, default=",".join(TTS_ENGINES),
+                        help='Comma-separated engines: google_cloud, gtts, local')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Repetitions per utterance')
+    parser.add_argument('--text', type=str, default=None,
+                        help='Benchmark this utterance instead of the samples')
+    parser.add_argument('--play', action='store_true',
+                        help='Also play each utterance and report time to first audio')
+    args = parser.parse_args()
+
+    handler = TTSHandler()
+    handler.audio_cache = None  # always measure real synthesis
+
+    texts = [args.text] if args.text else SAMPLE_TEXTS
+    results = {}
+    for engine in args.engines.split(','):
+        label = f"local ({TTS_LOCAL_SYNTHESIZER})" if engine == "local" else engine
+        print(f"\nRunning {label} on {len(texts)} utterances x {args.runs} runs...")
+        results[engine] = run_engine(handler, engine, texts, args.runs, args.play)
+
+    print_summary(results)
+
+
+if __name__ == '__main__':
+    main()
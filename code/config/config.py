@@ -9,28 +9,150 @@ load_dotenv()
 # SHARED SETTINGS (Used by both Task 1 and Task 2)
 # =============================================================================
 
+# LLM Backend: "openai" or "mock" (local stand-in started with `python mock_openai_server.py`)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'openai')
+MOCK_OPENAI_BASE_URL = "http://127.0.0.1:8001/v1"
+
 # API Keys and Credentials
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
+    if LLM_BACKEND != "mock":
+        raise ValueError("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
+    OPENAI_API_KEY = "mock-key"
 
 GOOGLE_CREDENTIALS_PATH = "config/file_name.json"
 
 # ZMQ Settings
 ZMQ_ADDRESS = "tcp://localhost:5555"
+ZMQ_REQUEST_TIMEOUT = 5         # seconds to wait for nao_client's reply before reconnecting
+ZMQ_REQUEST_RETRIES = 2         # retries (on a fresh socket) after the first attempt
+ZMQ_RETRY_BACKOFF_BASE = 0.5    # seconds, doubled per retry with full jitter
+ZMQ_RETRY_BACKOFF_MAX = 4       # seconds
+ZMQ_HEARTBEAT_ENABLED = True    # ping nao_client while idle so robot liveness is known before feedback
+ZMQ_HEARTBEAT_INTERVAL = 2      # seconds between pings
+ZMQ_HEARTBEAT_TIMEOUT = 1       # seconds to wait for a ping reply
+ZMQ_HEARTBEAT_LIVENESS = 3      # missed pings before the robot counts as unreachable
+ZMQ_HEARTBEAT_MAX_INTERVAL = 16 # seconds between pings while the robot is unreachable
+ZMQ_EVENTS_ADDRESS = "tcp://localhost:5556"   # nao_client speech events (PUB)
+ZMQ_EVENT_TIMEOUT = 2           # seconds to wait for the first speech event before assuming there are none
+ZMQ_SPEECH_MAX_SECONDS = 60     # longest wait for a robot utterance to finish
+
+# TTS Engine Selection
+TTS_ENGINE = "google_cloud"     # engine the voice agent prefers: "google_cloud", "gtts" or "local"
+TTS_ENGINES = ("google_cloud", "gtts", "local")  # engines raced / fallen back to, in default order
 
 # Google TTS Settings
 TTS_LANGUAGE = "en-US"
 TTS_VOICE_NAME = "en-US-Wavenet-C"
+TTS_WARM_UP = True              # create the Cloud TTS client and open its channel at start-up
+TTS_WARM_UP_TEXT = "Hello."
+TTS_CHUNKED = True              # synthesize the next sentence/clause while the current one plays
+TTS_CHUNK_MAX_CHARS = 120       # longer sentences are split at commas, semicolons and dashes
+TTS_CHUNK_PREFETCH = 1          # chunks synthesized ahead of playback
+
+# TTS Engine Race (the preferred engine starts first, the other after the hedge delay;
+# the first audio to arrive plays). The engines have different voices, so racing makes the
+# agent's voice depend on network latency; keep it disabled for study sessions.
+TTS_RACE_ENGINES = False        # False: try the preferred engine, fall back after it fails
+TTS_RACE_HEDGE_DELAY = 0.8      # seconds before the second engine is started
+TTS_ENGINE_DEADLINES = {        # seconds before an engine's request is abandoned
+    "google_cloud": 5,
+    "gtts": 8,
+    "local": 5
+}
+TTS_RACE_MIN_SAMPLES = 5        # requests per engine before latency/success stats pick the first engine
+
+# Local TTS (offline engine, run as a subprocess on the CPU)
+TTS_LOCAL_SYNTHESIZER = "espeak-ng"   # "espeak-ng" or "piper"
+TTS_LOCAL_COMMAND = None              # executable path; None looks up espeak-ng / piper on PATH
+TTS_LOCAL_VOICE = "en-us"             # espeak-ng voice
+TTS_LOCAL_RATE = 165                  # espeak-ng words per minute
+TTS_PIPER_MODEL = "models/piper/en_US-lessac-medium.onnx"
+TTS_PIPER_SAMPLE_RATE = 22050         # sample rate of the Piper model (see its .onnx.json)
+
+# Audio Output (speech is decoded in memory and played on one persistent output stream)
+AUDIO_SAMPLE_RATE = 24000       # Hz; Google Cloud TTS is asked for LINEAR16 at this rate
+AUDIO_OUTPUT_DEVICE = None      # sounddevice device index or name; None uses the default output
+AUDIO_OUTPUT_LATENCY = "low"    # "low", "high" or seconds
 
-# Audio Files
-TEMP_AUDIO_FILE = "temp_audio.mp3"
-OUTPUT_AUDIO_FILE = "output.mp3"
+# TTS Audio Cache (repeated utterances, e.g. F_2/F_3 phrases, play without synthesis;
+# warm it with `python prerender_tts.py`)
+TTS_CACHE_ENABLED = True
+TTS_CACHE_PATH = "cache/tts_audio.sqlite3"
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024
+TTS_CACHE_MEMORY_ENTRIES = 64
+
+# Agent Speech (the end of the session waits this long for the agent to finish speaking
+# before the Phase 2 speech records are saved and the application closes)
+SPEECH_FINISH_TIMEOUT = 30      # seconds
 
 # OpenAI Settings
 OPENAI_MODEL = "gpt-4o-mini"  
 OPENAI_VISION_MODEL = "gpt-4o-mini" 
 
+# OpenAI prices in USD per million tokens, for the cost of each logged LLM call
+# (a model missing here is logged without a cost)
+LLM_PRICES_PER_MILLION_TOKENS = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+}
+
+# OpenAI HTTP Transport (shared keep-alive connection pool for both tasks)
+OPENAI_BASE_URL = MOCK_OPENAI_BASE_URL if LLM_BACKEND == "mock" else "https://api.openai.com/v1"
+HTTP_POOL_SIZE = 4
+HTTP_CONNECT_TIMEOUT = 5    # seconds
+HTTP_READ_TIMEOUT = 30      # seconds between bytes of the response
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF_BASE = 0.5   # seconds, doubled per attempt with full jitter
+HTTP_RETRY_BACKOFF_MAX = 4      # seconds
+
+# Stream completions and start speaking after the first sentence instead of the full response
+LLM_STREAMING = True
+
+# Prompt Layout: "inline" (participant data inside the feedback template) or "prefix"
+# (static per-set prompt first, participant data in a final message, so repeated
+# requests for a set reuse the provider's prompt cache - reported as cached tokens)
+PROMPT_LAYOUT = "inline"
+
+# Local Feedback Backend (answer these levels without a network call, e.g. ["F_2", "F_3"];
+# F_1 always goes to OpenAI). The phrase history keeps participants from hearing a repeat.
+LOCAL_FEEDBACK_LEVELS = []
+LOCAL_FEEDBACK_BACKEND = "phrase_bank"
+PHRASE_BANK_HISTORY_PATH = "data/phrase_bank_history.json"
+
+# LLM Response Cache (for pilots and rehearsals; keep disabled for real study sessions)
+LLM_CACHE_ENABLED = False
+LLM_CACHE_PATH = "cache/llm_responses.sqlite3"
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # 1 week
+LLM_CACHE_MEMORY_ENTRIES = 256
+LLM_CACHE_MAX_DISK_ENTRIES = 5000
+
+# LLM Request Policy (bounds the wait for feedback; a slow request is hedged with a duplicate).
+# Off by default: past the deadline participants hear the canned FALLBACK_FEEDBACK instead of
+# generated feedback. When enabled, the outcome is saved next to the response (LLM_Outcome_1).
+LLM_REQUEST_POLICY_ENABLED = False
+LLM_DEADLINE_SECONDS = 12               # until the response (or its first spoken sentence) arrives
+LLM_HEDGE_PERCENTILE = 0.9              # hedge once this latency percentile of recent requests has passed
+LLM_HEDGE_INITIAL_DELAY_SECONDS = 4     # hedge delay until enough latencies are known
+LLM_HEDGE_MIN_SAMPLES = 5
+LLM_MAX_HEDGES = 1
+
+# Canned feedback used when the deadline passes without a response
+FALLBACK_FEEDBACK = {
+    "task_1": {
+        "F_1": "Take another look at the shapes you have left and try combining them into one of the example "
+               "objects you have not built yet.",
+        "F_2": "You're making steady progress with your designs. Keep experimenting with new combinations!",
+        "F_3": "You have a great eye for turning simple shapes into creative designs.",
+    },
+    "task_2": {
+        "F_1": "Go through the passage one sentence at a time and check the grammar, spelling, word choice, "
+               "punctuation and capitalization in each one.",
+        "F_2": "You're putting real effort into this passage. Keep working through it carefully!",
+        "F_3": "You have a sharp eye for detail and a real feel for clear writing.",
+    },
+}
+
 # =============================================================================
 # TASK 1 SETTINGS
 # =============================================================================
@@ -41,6 +163,23 @@ TASK_1_TIME_PHASE_2 = 120  # 2 minutes in seconds
 TASK_1_DISPLAY_TIME_1 = "4:00"
 TASK_1_DISPLAY_TIME_2 = "2:00"
 
+# Task 1 Speculative Feedback (pre-generate feedback after each saved pattern)
+TASK_1_SPECULATIVE_FEEDBACK = False
+TASK_1_SPECULATION_DEBOUNCE_MS = 1500
+
+# Task 1 Vision Image Payload (question images are encoded once and reused)
+TASK_1_IMAGE_MAX_SIDE = None        # pixels; None keeps the original size
+TASK_1_IMAGE_FORMAT = "PNG"         # PNG, JPEG or WEBP
+TASK_1_IMAGE_QUALITY = 85           # JPEG/WEBP quality
+TASK_1_IMAGE_DETAIL = "auto"        # vision detail: low, high or auto ("low" bills the fewest tokens)
+TASK_1_IMAGE_SIDECAR_DIR = "cache/images"
+
+# Task 1 F_1 Candidates (give the F_1 prompt only the example objects the participant
+# has not built yet, instead of the whole example list). This changes the F_1 study
+# prompt, so keep it disabled unless the protocol calls for it.
+TASK_1_F1_CANDIDATE_LIST = False
+TASK_1_F1_MAX_CANDIDATES = 4
+
 # Task 1 UI Settings
 TASK_1_WINDOW_WIDTH = 2000
 TASK_1_WINDOW_HEIGHT = 1200
@@ -80,6 +219,16 @@ TIME_PHASE_2 = 120
 DISPLAY_TIME_1 = "4:00"
 DISPLAY_TIME_2 = "2:00"
 
+# Task 2 F_1 Mode: "chain" (detailed answer, then a second call to condense it)
+# or "single" (one structured-output call returning both)
+TASK_2_F1_MODE = "chain"
+
+# Task 2 Prompt Input: "full" (question, answer, error list and response are all sent and
+# the LLM finds the corrections itself) or "summary" (the response is diffed locally against
+# the answer and error list, and only the fixed/missed/introduced summary is sent; this
+# replaces the study prompts, so use it only if the protocol calls for it)
+TASK_2_PROMPT_INPUT = "full"
+
 # Task 2 UI Settings
 WINDOW_WIDTH = 2000
 WINDOW_HEIGHT = 1200
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: run the unit tests in tests/ without an OpenAI key
+"""
+
+import os
+
+# config.config refuses to load without a key; the unit tests never call the API
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+# Manual scripts that need the robot or Google credentials
+collect_ignore = ["system_test"]
@@ -4,9 +4,9 @@ import time
 import os
 import cv2
 from PyQt6.QtWidgets import (QWidget, QPushButton, QVBoxLayout, QMessageBox,
-                             QLabel, QHBoxLayout, QComboBox, QLCDNumber, QApplication,
+                             QLabel, QHBoxLayout, QComboBox, QLCDNumber,
                              QScrollArea, QGridLayout, QLineEdit)
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
 from PyQt6.QtGui import QImage, QPixmap
 
 from config.config import *
@@ -14,6 +14,9 @@ from utils.task_1_data_manager import DataManager
 from utils.task_1_llm_handler import LLMHandler
 from utils.robot_handler import RobotHandler
 from utils.tts_handler import TTSHandler
+from utils.feedback_worker import FeedbackWorker
+from utils.speech_queue import SpeechQueue
+from utils.speculative_feedback import SpeculativeFeedbackEngine
 
 
 class PatternWidget(QWidget):
@@ -99,13 +102,26 @@ class VideoCaptureApp(QWidget):
         self.get_feedback_button.setStyleSheet("font-size: 18px; font-family:Arial;")
         self.get_feedback_button.clicked.connect(self.get_feedback)
 
+        # Cancel Button (only visible while feedback is being processed)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFixedSize(button_width, button_height)
+        self.cancel_button.setStyleSheet("font-size: 18px; font-family:Arial;")
+        self.cancel_button.clicked.connect(self.cancel_feedback)
+        self.cancel_button.setVisible(False)
+
         # Add widgets to the layout
         button_layout.addWidget(self.object_name_field)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.get_feedback_button)
+        button_layout.addWidget(self.cancel_button)
 
         right_layout.addLayout(button_layout)
 
+        # Feedback progress status
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("font-size: 18px; font-family:Arial; color: gray;")
+        right_layout.addWidget(self.status_label)
+
         # Initialize video capture
         self.cap = cv2.VideoCapture(0)
         self.timer = QTimer(self)
@@ -115,6 +131,14 @@ class VideoCaptureApp(QWidget):
         self.captured_images = []
         self.object_list = []
 
+        # Background feedback pipeline
+        self.thread_pool = QThreadPool.globalInstance()
+        self.feedback_worker = None
+        self.feedback_error = None
+
+        self.parent.speech_queue.started.connect(self._on_speech_started)
+        self.parent.speech_queue.idle.connect(self._on_speech_idle)
+
     def save_pattern(self):
         """Save captured pattern from camera"""
         ret, frame = self.cap.read()
@@ -149,6 +173,10 @@ class VideoCaptureApp(QWidget):
             print(f"Pattern saved at {image_file_path}")
             self.object_list.append(object_name)
 
+            # Pre-generate feedback for the new object list while the participant keeps working
+            if self.parent.phase == 1:
+                self.parent.schedule_speculative_feedback(self.object_list)
+
             # Reset the object name field
             self.object_name_field.clear()
 
@@ -191,97 +219,284 @@ class VideoCaptureApp(QWidget):
         current_timestamp = time.time()
         remaining_time = self.parent.time_left
 
+        # Ignore repeated submissions while a feedback pipeline is running
+        if self.feedback_worker is not None:
+            return
+
         self.get_feedback_button.setEnabled(False)
 
         if self.parent.phase == 1:
             self.parent.timer.stop()
-
-            # Get feedback from LLM
-            feedback_response = self._process_feedback()
-            print(f"Feedback received: {feedback_response}")
-
-            # Send feedback to agent
-            self._send_feedback_to_agent(feedback_response)
-
-            # Save phase 1 data
-            self._save_phase_1_data(feedback_response, current_timestamp, remaining_time)
-
-            # Reset and move to phase 2
-            self.object_list = []
-            self.parent.start_phase_2()
-            self.get_feedback_button.setEnabled(True)
+            self._start_feedback_pipeline(current_timestamp, remaining_time)
 
         elif self.parent.phase == 2:
             self.parent.timer.stop()
             self._save_phase_2_data(current_timestamp, remaining_time)
 
-    def _process_feedback(self):
-        """Process feedback using LLM handler"""
+    def _session_info(self):
+        """
+        Read the session configuration from the parent window
+
+        Must be called on the GUI thread.
+
+        Returns:
+            dict: sub_id, task_id, agent_id and feedback_level
+        """
+        return {
+            "sub_id": self.parent.sub_id_combo.currentText(),
+            "task_id": self.parent.task_id_combo.currentText(),
+            "agent_id": self.parent.agent_combo.currentText(),
+            "feedback_level": self.parent.feedback_level_combo.currentText()
+        }
+
+    def _start_feedback_pipeline(self, submission_time, time_left):
+        """
+        Run LLM -> agent delivery -> data saving on a worker thread
+
+        Args:
+            submission_time (float): Timestamp of submission
+            time_left (int): Remaining time when submitted
+        """
+        session = self._session_info()
+        object_list = list(self.object_list)
+        self.feedback_error = None
+
+        # The first utterance of the new feedback barges in on anything the agent is still saying
+        # (see _send_feedback_to_agent); the robot stops and speaks it in one request
+        session["barge_in"] = True
+
+        if session["agent_id"] == 'agent_1' and self.parent.robot_handler.is_alive() is False:
+            print(f"Warning: NAO is not answering heartbeats {self.parent.robot_handler.stats()}")
+
+        # Request policy outcome of the feedback (None without the policy)
+        policy = {"outcome": None}
+
+        def generate(worker):
+            # With streaming, sentences are spoken while the rest of the response is generated
+            on_sentence = None
+            if LLM_STREAMING:
+                on_sentence = lambda sentence: (None if worker.is_cancelled()
+                                                else self._send_feedback_to_agent(session, sentence))
+            feedback_text, policy["outcome"] = self._process_feedback(session, object_list, on_sentence)
+            return feedback_text
+
+        def deliver(feedback_text, worker):
+            print(f"Feedback received: {feedback_text}")
+            # Queued only; the agent keeps speaking after the pipeline finishes
+            if not LLM_STREAMING:
+                self._send_feedback_to_agent(session, feedback_text)
+
+        def persist(feedback_text):
+            # Saved without feedback after a cancel, the outcome no longer describes the feedback
+            outcome = policy["outcome"] if feedback_text else None
+            return self._save_phase_1_data(session, object_list, feedback_text,
+                                           submission_time, time_left, outcome)
+
+        self.feedback_worker = FeedbackWorker(generate, deliver, persist)
+        self.feedback_worker.signals.progress.connect(self.status_label.setText)
+        self.feedback_worker.signals.finished.connect(self._on_feedback_finished)
+        self.feedback_worker.signals.failed.connect(self._on_feedback_failed)
+        self.feedback_worker.signals.cancelled.connect(self._on_feedback_cancelled)
+
+        self.save_button.setEnabled(False)
+        self.cancel_button.setVisible(True)
+        self.thread_pool.start(self.feedback_worker)
+
+    def cancel_feedback(self):
+        """Cancel the running feedback pipeline and stop the agent's speech"""
+        if self.feedback_worker is not None:
+            self.status_label.setText("Cancelling...")
+            self.feedback_worker.cancel()
+        self.parent.speech_queue.cancel()
+
+    def _end_feedback_pipeline(self):
+        """Reset controls after the feedback pipeline stops"""
+        speaking = self.parent.speech_queue.is_speaking()
+        self.feedback_worker = None
+        self.cancel_button.setVisible(speaking)
+        self.save_button.setEnabled(True)
+        self.get_feedback_button.setEnabled(True)
+        self.status_label.setText("Agent speaking..." if speaking else "")
+
+    def _on_speech_started(self, utterance_id, text):
+        """Let the agent's speech be stopped with the cancel button"""
+        self.cancel_button.setVisible(True)
+        if self.feedback_worker is None:
+            self.status_label.setText("Agent speaking...")
+
+    def _on_speech_idle(self):
+        """Hide the speech controls once the agent has finished"""
+        if self.feedback_worker is None:
+            self.cancel_button.setVisible(False)
+            self.status_label.setText("")
+
+    def _on_feedback_finished(self, feedback_text, message):
+        """Handle successful completion of the feedback pipeline"""
+        self._end_feedback_pipeline()
+
+        if self.feedback_error:
+            QMessageBox.warning(self, 'Error', 'Failed to get response from OpenAI API.')
+
+        print(f"\n=== PHASE 1 COMPLETED ===")
+        print(f"✓ Response 1 saved successfully")
+        print(f"✓ Feedback sent to {self.parent.agent_combo.currentText()}")
+        print(f"✓ Moving to Phase 2...")
+
+        # Reset and move to phase 2 (its timer runs while the agent speaks and the message is shown)
+        self._move_to_phase_2()
+        QMessageBox.information(self, 'Status', message)
+
+    def _on_feedback_failed(self, error_message):
+        """Handle a failure in the delivery or saving stage"""
+        persist = self.feedback_worker.persist_fn
+        self._end_feedback_pipeline()
+        QMessageBox.warning(self, 'Error', f'Failed to process feedback: {error_message}')
+        self._resume_phase_1(persist)
+
+    def _on_feedback_cancelled(self):
+        """Resume Phase 1 after the feedback pipeline was cancelled"""
+        persist = self.feedback_worker.persist_fn
+        self._end_feedback_pipeline()
+        self._resume_phase_1(persist)
+
+    def _resume_phase_1(self, persist):
+        """
+        Restart the Phase 1 timer, or move to Phase 2 if the pipeline was started by time expiry
+
+        Args:
+            persist (callable): The pipeline's persist stage, persist(feedback_text); saves the
+                                Phase 1 response without feedback before moving to Phase 2
+        """
+        # With no time left, update_timer would submit again at once (and fail again every second)
+        if self.parent.time_left > 0:
+            self.parent.timer.start(1000)
+            return
+        print(f"✓ Phase 1 time is up, moving to Phase 2 without feedback...")
         try:
-            feedback_level = self.parent.feedback_level_combo.currentText()
+            print(persist(""))
+        except Exception as e:
+            print(f"Error saving Phase 1 data: {e}")
+        self._move_to_phase_2()
+
+    def _move_to_phase_2(self):
+        """Reset the Phase 1 state and start Phase 2"""
+        if self.parent.speculative_engine is not None:
+            self.parent.speculative_engine.cancel()
+        self.object_list = []
+        self.parent.start_phase_2()
+
+    def _process_feedback(self, session, object_list, on_sentence=None):
+        """
+        Process feedback using LLM handler (runs on the worker thread)
 
+        Args:
+            session (dict): Session configuration from _session_info
+            object_list (list): Objects made by the user in phase 1
+            on_sentence (callable): Receives each sentence as it is streamed
+
+        Returns:
+            tuple: (feedback text, request policy outcome or None); ("", None) if the API call failed
+        """
+        try:
             # Prepare data for LLM
             image_path = self.parent.question_file_path
             shape_list_str = self.parent.shape_list
-            object_list_str = ', '.join(self.object_list)
-            example_objects_str = self.parent.example_object_list
+            object_list_str = ', '.join(object_list)
+            example_objects_str = self.parent.get_example_objects_str(session["feedback_level"], object_list)
 
             # Get feedback from LLM handler
-            feedback = self.parent.llm_handler.get_feedback_response(
-                feedback_level, image_path, shape_list_str, object_list_str, example_objects_str
-            )
-
-            return feedback
+            def request(request_on_sentence):
+                return self.parent.llm_handler.get_feedback_response(
+                    session["feedback_level"], image_path, shape_list_str, object_list_str, example_objects_str,
+                    on_sentence=request_on_sentence, subject_id=session["sub_id"], return_outcome=True
+                )
+
+            # Use the speculated feedback if it was generated for this exact object list
+            if self.parent.speculative_engine is not None:
+                feedback, outcome = self.parent.speculative_engine.take(
+                    session["feedback_level"], image_path, object_list, request, on_sentence
+                )
+            else:
+                feedback, outcome = request(on_sentence)
+
+            return feedback, outcome
 
         except Exception as e:
             print(f"Error processing feedback: {e}")
-            QMessageBox.warning(self, 'Error', 'Failed to get response from OpenAI API.')
-            return ""
-
-    def _send_feedback_to_agent(self, feedback_text):
-        """Send feedback to the appropriate agent"""
-        agent_id = self.parent.agent_combo.currentText()
-        feedback_level = self.parent.feedback_level_combo.currentText()
+            self.feedback_error = e
+            return "", None
 
+    def _send_feedback_to_agent(self, session, feedback_text):
+        """Queue feedback on the agent's speech output (returns at once; runs on the worker thread)"""
         # Skip if no feedback (F_4 level)
-        if feedback_level == "F_4" or not feedback_text:
+        if session["feedback_level"] == "F_4" or not feedback_text:
             return
 
-        if agent_id == 'agent_1':
-            # Send feedback to NAO robot
-            try:
-                self.parent.robot_handler.send_feedback_to_robot(feedback_text)
-            except Exception as e:
-                print(f"Robot communication failed: {e}")
-
-        elif agent_id == 'agent_2':
-            # Use TTS for agent_2
-            try:
-                self.parent.tts_handler.speak(feedback_text, use_google_cloud=True)
-            except Exception as e:
-                print(f"TTS failed: {e}")
-
-    def _save_phase_1_data(self, openai_response, submission_time, time_left):
-        """Save Phase 1 data"""
-        message = self.parent.data_manager.collect_data(
+        # agent_1 is the NAO robot, agent_2 the TTS voice (see the speech_queue registrations)
+        self.parent.speech_queue.say(feedback_text, session["agent_id"], barge_in=session.pop("barge_in", False))
+
+    def _save_phase_1_data(self, session, object_list, openai_response, submission_time, time_left,
+                           llm_outcome=None):
+        """Save Phase 1 data with the LLM call records (runs on the worker thread)"""
+        return self.parent.data_manager.collect_data(
             phase=1,
-            sub_id=self.parent.sub_id_combo.currentText(),
-            task_id=self.parent.task_id_combo.currentText(),
-            agent_id=self.parent.agent_combo.currentText(),
-            feedback_level=self.parent.feedback_level_combo.currentText(),
-            object_list=self.object_list,
+            sub_id=session["sub_id"],
+            task_id=session["task_id"],
+            agent_id=session["agent_id"],
+            feedback_level=session["feedback_level"],
+            object_list=object_list,
             openai_response=openai_response,
             submission_time=submission_time,
-            time_left=time_left
+            time_left=time_left,
+            llm_outcome=llm_outcome,
+            llm_calls=self.parent.llm_handler.call_log.drain(),
+            set_number=self.parent.set_number
         )
-        print(f"\n=== PHASE 1 COMPLETED ===")
-        print(f"✓ Response 1 saved successfully")
-        print(f"✓ Feedback sent to {self.parent.agent_combo.currentText()}")
-        print(f"✓ Moving to Phase 2...")
-        QMessageBox.information(self, 'Status', message)
 
     def _save_phase_2_data(self, submission_time, time_left):
-        """Save Phase 2 data"""
+        """Save Phase 2 data once the agent has finished speaking"""
+        self.save_button.setEnabled(False)
+
+        # Let the agent finish, so the last utterance is recorded and not cut off by the exit
+        self._when_speech_done(lambda: self._write_phase_2_data(submission_time, time_left))
+
+    def _when_speech_done(self, callback):
+        """
+        Call callback on the GUI thread once the agent has finished speaking
+
+        The queue is polled, so the window keeps responding meanwhile. After
+        SPEECH_FINISH_TIMEOUT the speech is cancelled and callback runs once the
+        stopped utterance has ended (or a second later).
+
+        Args:
+            callback (callable): Called without arguments
+        """
+        speech_queue = self.parent.speech_queue
+        if not speech_queue.is_speaking():
+            callback()
+            return
+
+        self.status_label.setText("Agent speaking...")
+        wait = {"deadline": time.time() + SPEECH_FINISH_TIMEOUT, "stopped": False}
+
+        def poll():
+            if speech_queue.is_speaking() and time.time() < wait["deadline"]:
+                return
+            if speech_queue.is_speaking() and not wait["stopped"]:
+                print(f"Warning: Agent still speaking after {SPEECH_FINISH_TIMEOUT}s, stopping it")
+                speech_queue.cancel()
+                wait["stopped"] = True
+                wait["deadline"] = time.time() + 1  # the stopped utterance ends within a playback block
+                return
+            self.speech_wait_timer.stop()
+            callback()
+
+        self.speech_wait_timer = QTimer(self)
+        self.speech_wait_timer.timeout.connect(poll)
+        self.speech_wait_timer.start(100)
+
+    def _write_phase_2_data(self, submission_time, time_left):
+        """Save Phase 2 data with the speech records and close the application"""
         message = self.parent.data_manager.collect_data(
             phase=2,
             sub_id=self.parent.sub_id_combo.currentText(),
@@ -291,7 +506,11 @@ class VideoCaptureApp(QWidget):
             object_list=self.object_list,
             openai_response="",
             submission_time=submission_time,
-            time_left=time_left
+            time_left=time_left,
+            # Hedged attempts that lost in Phase 1 finish after its save; their records land here
+            llm_calls=self.parent.llm_handler.call_log.drain(),
+            set_number=self.parent.set_number,
+            speech=self.parent.speech_queue.drain_records()
         )
         print(f"\n=== PHASE 2 COMPLETED ===")
         print(f"✓ Response 2 saved successfully")
@@ -299,10 +518,10 @@ class VideoCaptureApp(QWidget):
         print(f"✓ Closing application...")
         QMessageBox.information(self, 'Status', message)
 
-        # Auto-close the application after Phase 2
+        # Auto-close the application after Phase 2 (closing the last window quits and runs closeEvent)
         def close_application():
             print("Terminating application...")
-            QApplication.quit()
+            self.parent.close()
 
         QTimer.singleShot(1000, close_application)
 
@@ -333,11 +552,29 @@ class SimpleWindow(QWidget):
         self.llm_handler = LLMHandler()
         self.robot_handler = RobotHandler()
         self.tts_handler = TTSHandler()
+        if TTS_WARM_UP:
+            self.tts_handler.warm_up()
+
+        # Agent speech plays in the background so the phase timer and UI keep running
+        self.speech_queue = SpeechQueue(self)
+        self.speech_queue.register('agent_1', self.robot_handler.speak, self.robot_handler.stop_speech, preempt=True)
+        self.speech_queue.register(
+            'agent_2', lambda text, stop_event: self.tts_handler.speak(text, engine=TTS_ENGINE, stop_event=stop_event),
+            prepare_fn=lambda text: self.tts_handler.prefetch(text, TTS_ENGINE)
+        )
+
+        # Optional background pre-generation of phase 1 feedback
+        self.speculative_engine = None
+        if TASK_1_SPECULATIVE_FEEDBACK:
+            self.speculative_engine = SpeculativeFeedbackEngine(
+                self.llm_handler, TASK_1_SPECULATION_DEBOUNCE_MS
+            )
 
         # Store loaded content
         self.question_file_path = ""
         self.shape_list = ""
         self.example_object_list = ""
+        self.inventory = None
 
         self.initUI()
 
@@ -485,10 +722,14 @@ class SimpleWindow(QWidget):
         # Load shapes and objects
         self.shape_list = self.data_manager.load_shapes_from_file(shape_file_path)
         self.example_object_list = self.data_manager.load_objects_from_file(object_file_path)
+        self.inventory = self.data_manager.load_inventory(shape_file_path, object_file_path)
 
         print(f"Shapes: {self.shape_list}")
         print(f"Example objects: {self.example_object_list}")
 
+        # Encode the question image now so the submit path does not pay for it
+        self.llm_handler.preload_image(self.question_file_path)
+
         # Display shapes image
         pixmap = QPixmap(self.question_file_path)
         desired_width = 300
@@ -505,6 +746,46 @@ class SimpleWindow(QWidget):
         self.time_left = TASK_1_TIME_PHASE_1
         self.phase = 1
 
+        # Speculate feedback for an empty submission as well
+        self.schedule_speculative_feedback([])
+
+    def schedule_speculative_feedback(self, object_list):
+        """
+        Schedule background feedback generation for the given object list
+
+        Args:
+            object_list (list): Objects made by the user so far
+        """
+        if self.speculative_engine is None:
+            return
+
+        self.speculative_engine.schedule(
+            self.feedback_level_combo.currentText(), self.question_file_path,
+            self.shape_list, object_list,
+            self.get_example_objects_str(self.feedback_level_combo.currentText(), object_list)
+        )
+
+    def get_example_objects_str(self, feedback_level, object_list):
+        """
+        Get the example objects for the feedback prompt
+
+        With TASK_1_F1_CANDIDATE_LIST, F_1 gets the short list of example objects
+        that have not been built yet, so the LLM does not suggest repeats.
+
+        Args:
+            feedback_level (str): Feedback level
+            object_list (list): Objects made by the user so far
+
+        Returns:
+            str: Example objects for the prompt
+        """
+        if feedback_level != "F_1" or not TASK_1_F1_CANDIDATE_LIST or self.inventory is None:
+            return self.example_object_list
+
+        # Fall back to the whole list once every example object has been built
+        candidates_str = self.inventory.candidates_str(object_list, TASK_1_F1_MAX_CANDIDATES)
+        return candidates_str or self.example_object_list
+
     def update_timer(self):
         """Update timer display and handle time expiration"""
         if self.time_left > 0:
@@ -516,12 +797,23 @@ class SimpleWindow(QWidget):
             self.timer.stop()
 
             if self.phase == 1:
+                # Phase 2 starts once the feedback pipeline finishes
                 self.video_capture_widget.get_feedback()
-                self.start_phase_2()
             elif self.phase == 2:
                 self.video_capture_widget.get_feedback()
                 QMessageBox.information(self, 'Warning', 'Time\'s up!')
 
+    def closeEvent(self, event):
+        """Stop any running feedback pipeline, speech and video capture on close"""
+        # Qt does not send closeEvent to child widgets, so VideoCaptureApp is cleaned up here
+        capture = self.video_capture_widget
+        if capture.feedback_worker is not None:
+            capture.feedback_worker.cancel()
+        self.speech_queue.close()
+        self.robot_handler.close()
+        capture.cap.release()
+        super().closeEvent(event)
+
     def start_phase_2(self):
         """Start Phase 2 of the task"""
         self.phase = 2
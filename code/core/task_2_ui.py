@@ -1,14 +1,17 @@
 
 import time
 from PyQt6.QtWidgets import (QWidget, QPushButton, QVBoxLayout, QMessageBox,
-                             QLabel, QTextEdit, QHBoxLayout, QComboBox, QLCDNumber, QApplication)
-from PyQt6.QtCore import Qt, QTimer
+                             QLabel, QTextEdit, QHBoxLayout, QComboBox, QLCDNumber)
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
 
 from config.config import *
 from utils.task_2_data_manager import DataManager
 from utils.task_2_llm_handler import LLMHandler
 from utils.robot_handler import RobotHandler
 from utils.tts_handler import TTSHandler
+from utils.feedback_worker import FeedbackWorker
+from utils.speech_queue import SpeechQueue
+from utils.task_2_corrections import get_correction_checker
 
 class SimpleWindow(QWidget):
     """Main application window"""
@@ -32,13 +35,30 @@ class SimpleWindow(QWidget):
         self.llm_handler = LLMHandler()
         self.robot_handler = RobotHandler()
         self.tts_handler = TTSHandler()
+        if TTS_WARM_UP:
+            self.tts_handler.warm_up()
+
+        # Agent speech plays in the background so the phase timer and UI keep running
+        self.speech_queue = SpeechQueue(self)
+        self.speech_queue.register('agent_1', self.robot_handler.speak, self.robot_handler.stop_speech, preempt=True)
+        self.speech_queue.register(
+            'agent_2', lambda text, stop_event: self.tts_handler.speak(text, engine=TTS_ENGINE, stop_event=stop_event),
+            prepare_fn=lambda text: self.tts_handler.prefetch(text, TTS_ENGINE)
+        )
 
         # Store loaded content
         self.error = ""
         self.answer = ""
 
+        # Background feedback pipeline
+        self.thread_pool = QThreadPool.globalInstance()
+        self.feedback_worker = None
+
         self.initUI()
 
+        self.speech_queue.started.connect(self._on_speech_started)
+        self.speech_queue.idle.connect(self._on_speech_idle)
+
     def initUI(self):
         """Initialize the user interface"""
         self.setFixedSize(WINDOW_WIDTH, WINDOW_HEIGHT)
@@ -124,12 +144,23 @@ class SimpleWindow(QWidget):
         self.text_input.setStyleSheet(TEXT_INPUT_STYLE)
 
     def _create_submit_button(self):
-        """Create submit button"""
+        """Create submit button, cancel button and feedback status label"""
         self.button = QPushButton('Submit', self)
         self.button.setFixedSize(150, 50)
         self.button.setStyleSheet(BUTTON_STYLE)
         self.button.clicked.connect(self.submit_button_pressed)
 
+        # Cancel button (only visible while feedback is being processed)
+        self.cancel_button = QPushButton('Cancel', self)
+        self.cancel_button.setFixedSize(150, 50)
+        self.cancel_button.setStyleSheet(BUTTON_STYLE)
+        self.cancel_button.clicked.connect(self.cancel_feedback)
+        self.cancel_button.setVisible(False)
+
+        # Feedback progress status
+        self.status_label = QLabel("", self)
+        self.status_label.setStyleSheet(DROPDOWN_LABEL_STYLE + " color: gray;")
+
     def _setup_layout(self):
         """Set up the main layout"""
         # Dropdown layout
@@ -149,7 +180,9 @@ class SimpleWindow(QWidget):
 
         # Button layout
         button_layout = QHBoxLayout()
+        button_layout.addWidget(self.status_label)
         button_layout.addStretch(1)
+        button_layout.addWidget(self.cancel_button)
         button_layout.addWidget(self.button)
 
         # Main layout
@@ -188,8 +221,8 @@ class SimpleWindow(QWidget):
             self.timer.stop()
 
             if self.phase == 1:
+                # Phase 2 starts once the feedback pipeline finishes
                 self.send_response_to_llm(self.text_input.toPlainText(), time.time(), self.time_left)
-                self.start_phase_2()
             elif self.phase == 2:
                 print(f"\n=== TIME'S UP - PHASE 2 AUTO-SUBMIT ===")
                 self._save_phase_2_data("", submission_time=time.time(), time_left=0)
@@ -200,9 +233,12 @@ class SimpleWindow(QWidget):
         current_timestamp = time.time()
         remaining_time = self.time_left
 
+        # Ignore repeated submissions while a feedback pipeline is running
+        if self.feedback_worker is not None:
+            return
+
         if self.phase == 1 and not self.response_1_saved:
             self.send_response_to_llm(self.text_input.toPlainText(), current_timestamp, remaining_time)
-            self.start_phase_2()
         elif self.phase == 2 and not self.response_2_saved:
             self._save_phase_2_data("", submission_time=current_timestamp, time_left=remaining_time)
             self.timer.stop()
@@ -236,73 +272,232 @@ class SimpleWindow(QWidget):
         self.timer_display.display(DISPLAY_TIME_2)
         self.timer.start(1000)
 
-    def send_response_to_llm(self, submitted_response, submission_time, time_left):
-        """Send response to LLM and handle feedback"""
-        try:
-            feedback_level = self.feedback_level_combo.currentText()
+    def _session_info(self):
+        """
+        Read the session configuration from the dropdowns
 
-            # Get LLM response
-            openai_response = self.llm_handler.get_feedback_response(
-                feedback_level, self.paragraph.text(), self.answer, self.error, submitted_response
-            )
+        Must be called on the GUI thread.
 
+        Returns:
+            dict: sub_id, task_id, agent_id and feedback_level
+        """
+        return {
+            "sub_id": self.sub_id_combo.currentText(),
+            "task_id": self.task_id_combo.currentText(),
+            "agent_id": self.agent_combo.currentText(),
+            "feedback_level": self.feedback_level_combo.currentText()
+        }
+
+    def send_response_to_llm(self, submitted_response, submission_time, time_left):
+        """Send response to LLM and handle feedback on a worker thread"""
+        self.timer.stop()
+        session = self._session_info()
+        paragraph_text = self.paragraph.text()
+
+        # The first utterance of the new feedback barges in on anything the agent is still saying
+        # (see _send_feedback_to_agent); the robot stops and speaks it in one request
+        session["barge_in"] = True
+
+        if session["agent_id"] == 'agent_1' and self.robot_handler.is_alive() is False:
+            print(f"Warning: NAO is not answering heartbeats {self.robot_handler.stats()}")
+
+        # Request policy outcome of the response (None without the policy)
+        policy = {"outcome": None}
+
+        def generate(worker):
+            # With streaming, sentences are spoken while the rest of the response is generated
+            on_sentence = None
+            if LLM_STREAMING:
+                on_sentence = lambda sentence: (None if worker.is_cancelled()
+                                                else self._send_feedback_to_agent(session, sentence))
+            openai_response, policy["outcome"] = self.llm_handler.get_feedback_response(
+                session["feedback_level"], paragraph_text, self.answer, self.error, submitted_response,
+                on_sentence=on_sentence, subject_id=session["sub_id"], return_outcome=True
+            )
             print(f"OpenAI response: {openai_response}")
+            return openai_response
+
+        def deliver(openai_response, worker):
+            # Queued only; the agent keeps speaking after the pipeline finishes
+            if not LLM_STREAMING:
+                self._send_feedback_to_agent(session, openai_response)
+
+        def persist(openai_response):
+            # Saved without feedback after a cancel, the outcome no longer describes the response
+            outcome = policy["outcome"] if openai_response else None
+            return self._save_phase_1_data(session, paragraph_text, submitted_response, openai_response,
+                                           submission_time, time_left, outcome)
+
+        self.feedback_worker = FeedbackWorker(generate, deliver, persist)
+        self.feedback_worker.signals.progress.connect(self.status_label.setText)
+        self.feedback_worker.signals.finished.connect(self._on_feedback_finished)
+        self.feedback_worker.signals.failed.connect(self._on_feedback_failed)
+        self.feedback_worker.signals.cancelled.connect(self._on_feedback_cancelled)
+
+        self.button.setEnabled(False)
+        self.cancel_button.setVisible(True)
+        self.thread_pool.start(self.feedback_worker)
+
+    def cancel_feedback(self):
+        """Cancel the running feedback pipeline and stop the agent's speech"""
+        if self.feedback_worker is not None:
+            self.status_label.setText("Cancelling...")
+            self.feedback_worker.cancel()
+        self.speech_queue.cancel()
+
+    def _end_feedback_pipeline(self):
+        """Reset controls after the feedback pipeline stops"""
+        self.feedback_worker = None
+        self.cancel_button.setVisible(self.speech_queue.is_speaking())
+        self.button.setEnabled(True)
+        self.status_label.setText("Agent speaking..." if self.speech_queue.is_speaking() else "")
+
+    def _on_speech_started(self, utterance_id, text):
+        """Let the agent's speech be stopped with the cancel button"""
+        self.cancel_button.setVisible(True)
+        if self.feedback_worker is None:
+            self.status_label.setText("Agent speaking...")
+
+    def _on_speech_idle(self):
+        """Hide the speech controls once the agent has finished"""
+        if self.feedback_worker is None:
+            self.cancel_button.setVisible(False)
+            self.status_label.setText("")
+
+    def _on_feedback_finished(self, openai_response, message):
+        """Handle successful completion of the feedback pipeline"""
+        self._end_feedback_pipeline()
+        print(f"\n=== PHASE 1 COMPLETED ===")
+        print(f"✓ Response 1 saved successfully")
+        print(f"✓ Feedback sent to {self.agent_combo.currentText()}")
+        print(f"✓ Moving to Phase 2...")
+        # The phase 2 timer runs while the agent speaks and the message is shown
+        self.start_phase_2()
+        QMessageBox.information(self, 'Status', message)
 
-            # Send feedback to appropriate agent
-            self._send_feedback_to_agent(openai_response)
+    def _on_feedback_failed(self, error_message):
+        """Handle a failure in the feedback pipeline"""
+        persist = self.feedback_worker.persist_fn
+        self._end_feedback_pipeline()
+        print(f"Error: {error_message}")
+        QMessageBox.warning(self, 'Error', 'Failed to get response from OpenAI API.')
+        self._save_phase_1_without_feedback(persist)
+        self.start_phase_2()
+
+    def _on_feedback_cancelled(self):
+        """Resume Phase 1 after the feedback pipeline was cancelled"""
+        persist = self.feedback_worker.persist_fn
+        self._end_feedback_pipeline()
+        # With no time left, update_timer would submit again at once; go on to Phase 2 instead
+        if self.time_left > 0:
+            self.timer.start(1000)
+        else:
+            print(f"✓ Phase 1 time is up, moving to Phase 2 without feedback...")
+            self._save_phase_1_without_feedback(persist)
+            self.start_phase_2()
 
-            # Save data for phase 1
-            self._save_phase_1_data(openai_response, submission_time, time_left)
+    def _save_phase_1_without_feedback(self, persist):
+        """
+        Save the Phase 1 response when the pipeline ended without saving it
 
+        Args:
+            persist (callable): The pipeline's persist stage, persist(feedback_text)
+        """
+        try:
+            print(persist(""))
         except Exception as e:
-            print(f"Error: {e}")
-            QMessageBox.warning(self, 'Error', 'Failed to get response from OpenAI API.')
-
-    def _send_feedback_to_agent(self, feedback_text):
-        """Send feedback to the appropriate agent"""
-        agent_id = self.agent_combo.currentText()
+            print(f"Error saving Phase 1 data: {e}")
 
+    def _send_feedback_to_agent(self, session, feedback_text):
+        """Queue feedback on the agent's speech output (returns at once; runs on the worker thread)"""
         # Skip if no feedback (F_4 level)
         if not feedback_text:
             return
 
-        if agent_id == 'agent_1':
-            # Send feedback to NAO robot
-            try:
-                self.robot_handler.send_feedback_to_robot(feedback_text)
-            except Exception as e:
-                print(f"Robot communication failed: {e}")
-
-        elif agent_id == 'agent_2':
-            # Use TTS for agent_2
-            try:
-                self.tts_handler.speak(feedback_text, use_google_cloud=True)
-            except Exception as e:
-                print(f"TTS failed: {e}")
-
-    def _save_phase_1_data(self, openai_response, submission_time, time_left):
-        """Save Phase 1 data"""
-        message = self.data_manager.collect_data(
+        # agent_1 is the NAO robot, agent_2 the TTS voice (see the speech_queue registrations)
+        self.speech_queue.say(feedback_text, session["agent_id"], barge_in=session.pop("barge_in", False))
+
+    def _check_corrections(self, paragraph_text, user_response):
+        """
+        Score a response against the set's error list
+
+        Args:
+            paragraph_text (str): Question paragraph
+            user_response (str): User's response
+
+        Returns:
+            dict: Result of CorrectionChecker.check
+            None: If the error list cannot be parsed
+        """
+        checker = get_correction_checker(paragraph_text, self.answer, self.error)
+        if checker is None:
+            return None
+        return checker.check(user_response)
+
+    def _save_phase_1_data(self, session, paragraph_text, user_response, openai_response, submission_time,
+                           time_left, llm_outcome=None):
+        """Save Phase 1 data with the LLM call records and correction score (runs on the worker thread)"""
+        return self.data_manager.collect_data(
             phase=1,
-            sub_id=self.sub_id_combo.currentText(),
-            task_id=self.task_id_combo.currentText(),
-            agent_id=self.agent_combo.currentText(),
-            feedback_level=self.feedback_level_combo.currentText(),
+            sub_id=session["sub_id"],
+            task_id=session["task_id"],
+            agent_id=session["agent_id"],
+            feedback_level=session["feedback_level"],
             set_number=self.set_number,
-            user_response=self.text_input.toPlainText(),
+            user_response=user_response,
             openai_response=openai_response,
             submission_time=submission_time,
-            time_left=time_left
+            time_left=time_left,
+            llm_outcome=llm_outcome,
+            llm_calls=self.llm_handler.call_log.drain(),
+            corrections=self._check_corrections(paragraph_text, user_response)
         )
-        print(f"\n=== PHASE 1 COMPLETED ===")
-        print(f"✓ Response 1 saved successfully")
-        print(f"✓ Feedback sent to {self.agent_combo.currentText()}")
-        print(f"✓ Moving to Phase 2...")
-        QMessageBox.information(self, 'Status', message)
 
     def _save_phase_2_data(self, openai_response="", submission_time=None, time_left=None):
-        """Save Phase 2 data"""
+        """Save Phase 2 data once the agent has finished speaking"""
         self.response_2_saved = True
+        self.button.setEnabled(False)
+        self.text_input.setReadOnly(True)
+
+        # Let the agent finish, so the last utterance is recorded and not cut off by the exit
+        self._when_speech_done(lambda: self._write_phase_2_data(openai_response, submission_time, time_left))
+
+    def _when_speech_done(self, callback):
+        """
+        Call callback on the GUI thread once the agent has finished speaking
+
+        The queue is polled, so the window keeps responding meanwhile. After
+        SPEECH_FINISH_TIMEOUT the speech is cancelled and callback runs once the
+        stopped utterance has ended (or a second later).
+
+        Args:
+            callback (callable): Called without arguments
+        """
+        if not self.speech_queue.is_speaking():
+            callback()
+            return
+
+        self.status_label.setText("Agent speaking...")
+        wait = {"deadline": time.time() + SPEECH_FINISH_TIMEOUT, "stopped": False}
+
+        def poll():
+            if self.speech_queue.is_speaking() and time.time() < wait["deadline"]:
+                return
+            if self.speech_queue.is_speaking() and not wait["stopped"]:
+                print(f"Warning: Agent still speaking after {SPEECH_FINISH_TIMEOUT}s, stopping it")
+                self.speech_queue.cancel()
+                wait["stopped"] = True
+                wait["deadline"] = time.time() + 1  # the stopped utterance ends within a playback block
+                return
+            self.speech_wait_timer.stop()
+            callback()
+
+        self.speech_wait_timer = QTimer(self)
+        self.speech_wait_timer.timeout.connect(poll)
+        self.speech_wait_timer.start(100)
+
+    def _write_phase_2_data(self, openai_response, submission_time, time_left):
+        """Save Phase 2 data with the speech records and close the application"""
         message = self.data_manager.collect_data(
             phase=2,
             sub_id=self.sub_id_combo.currentText(),
@@ -313,7 +508,11 @@ class SimpleWindow(QWidget):
             user_response=self.text_input.toPlainText(),
             openai_response=openai_response,
             submission_time=submission_time,
-            time_left=time_left
+            time_left=time_left,
+            # Hedged attempts that lost in Phase 1 finish after its save; their records land here
+            llm_calls=self.llm_handler.call_log.drain(),
+            corrections=self._check_corrections(self.paragraph.text(), self.text_input.toPlainText()),
+            speech=self.speech_queue.drain_records()
         )
         print(f"\n=== PHASE 2 COMPLETED ===")
         print(f"✓ Response 2 saved successfully")
@@ -324,6 +523,14 @@ class SimpleWindow(QWidget):
         # Auto-close the application after Phase 2
         def close_application():
             print("Terminating application...")
-            QApplication.quit()
+            self.close()  # the last window: quits the application after closeEvent
+
+        QTimer.singleShot(1000, close_application)  # Close after 1 second
 
-        QTimer.singleShot(1000, close_application)  # Close after 1 second
\ No newline at end of file
+    def closeEvent(self, event):
+        """Stop any running feedback pipeline and speech on close"""
+        if self.feedback_worker is not None:
+            self.feedback_worker.cancel()
+        self.speech_queue.close()
+        self.robot_handler.close()
+        super().closeEvent(event)
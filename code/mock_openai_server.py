@@ -0,0 +1,373 @@
+"""
+Mock OpenAI Server
+Local stand-in for the chat-completions endpoint, used to load-test and benchmark
+the feedback pipeline without network access
+
+Usage:
+    python mock_openai_server.py --profile typical
+    LLM_BACKEND=mock python main.py --task_id task_2 --set_number 1
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FEEDBACK_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "..", "generated_feedback", "llm_generated_feedback_data.csv")
+
+# Latency profiles: time to first token is log-normal around its median, with an
+# optional slow tail; tokens then arrive every token_delay_s seconds
+LATENCY_PROFILES = {
+    "instant": {"ttft_median_s": 0.0, "ttft_sigma": 0.0, "tail_rate": 0.0, "tail_s": 0.0, "token_delay_s": 0.0},
+    "fast": {"ttft_median_s": 0.3, "ttft_sigma": 0.3, "tail_rate": 0.0, "tail_s": 0.0, "token_delay_s": 0.01},
+    "typical": {"ttft_median_s": 0.8, "ttft_sigma": 0.5, "tail_rate": 0.02, "tail_s": 6.0, "token_delay_s": 0.03},
+    "slow_tail": {"ttft_median_s": 1.0, "ttft_sigma": 0.6, "tail_rate": 0.1, "tail_s": 15.0, "token_delay_s": 0.04},
+}
+
+# Used when the generated-feedback CSV is not available
+TEMPLATE_FEEDBACK = {
+    ("task_1", "F_1"): ["Next, try making a house using 1 red square and 1 green triangle."],
+    ("task_1", "F_2"): ["You're making steady progress with your designs. Keep exploring new combinations!"],
+    ("task_1", "F_3"): ["You have a natural eye for turning simple shapes into creative designs."],
+    ("task_2", "F_1"): ["Check the second sentence again for a grammar error, and look for a spelling "
+                        "mistake near the end of the paragraph."],
+    ("task_2", "F_2"): ["You're making steady progress on this revision. Keep at it!"],
+    ("task_2", "F_3"): ["Your command of clarity and structure really stands out."],
+}
+
+# Phrases that identify the feedback level in the prompt templates
+LEVEL_MARKERS = [
+    ("task-learning", "F_1"),
+    ("Rewrite this in a conversational style", "F_1"),
+    ("task-motivation", "F_2"),
+    ("self-level", "F_3"),
+]
+
+
+def load_feedback_bank(csv_path=FEEDBACK_CSV_PATH):
+    """
+    Load canned feedback per (task, level) from the generated-feedback CSV
+
+    Args:
+        csv_path (str): Path to the CSV file
+
+    Returns:
+        dict: (task_id, feedback_level) -> list of feedback texts
+    """
+    bank = defaultdict(list)
+    if os.path.exists(csv_path):
+        with open(csv_path, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                if row.get("generated_feedback"):
+                    bank[(row["task_id"], row["Feedback_Level"])].append(row["generated_feedback"])
+
+    for key, texts in TEMPLATE_FEEDBACK.items():
+        if not bank[key]:
+            bank[key] = list(texts)
+
+    return dict(bank)
+
+
+def count_tokens(text):
+    """Rough token estimate (about 4 characters per token)"""
+    return max(1, math.ceil(len(text) / 4))
+
+
+class MockBehavior:
+    """Shared, thread-safe state of the mock server: feedback bank, latency and faults"""
+
+    def __init__(self, profile, error_rate=0.0, rate_limit_rate=0.0, retry_after=1, seed=None):
+        """
+        Initialize the behavior
+
+        Args:
+            profile (str): Name of a latency profile in LATENCY_PROFILES
+            error_rate (float): Probability of answering 500
+            rate_limit_rate (float): Probability of answering 429 with Retry-After
+            retry_after (int): Retry-After value in seconds for 429 responses
+            seed (int): Random seed for reproducible runs
+        """
+        self.profile = LATENCY_PROFILES[profile]
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.bank = load_feedback_bank()
+        self.random = random.Random(seed)
+        self.request_count = 0
+        self.seen_prefixes = set()
+        self._lock = threading.Lock()
+
+    def next_fault(self):
+        """
+        Decide whether the next request fails
+
+        Returns:
+            int: Status code to answer with (200 for success)
+        """
+        with self._lock:
+            self.request_count += 1
+            roll = self.random.random()
+
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return 200
+
+    def first_token_delay(self):
+        """
+        Sample the time to first token
+
+        Returns:
+            float: Delay in seconds
+        """
+        with self._lock:
+            if self.random.random() < self.profile["tail_rate"]:
+                return self.profile["tail_s"]
+            if self.profile["ttft_median_s"] <= 0:
+                return 0.0
+            return self.random.lognormvariate(math.log(self.profile["ttft_median_s"]), self.profile["ttft_sigma"])
+
+    def cached_tokens(self, messages):
+        """
+        Imitate provider prompt caching: a previously seen message prefix of at
+        least 1024 tokens is reported as cached, in 128-token increments
+
+        Args:
+            messages (list): Chat messages of the request
+
+        Returns:
+            int: Cached prompt tokens
+        """
+        prefixes = [json.dumps(messages[:length]) for length in range(1, len(messages) + 1)]
+
+        with self._lock:
+            cached = 0
+            for prefix in reversed(prefixes):
+                if prefix in self.seen_prefixes:
+                    cached = count_tokens(prefix)
+                    break
+            self.seen_prefixes.update(prefixes)
+
+        if cached < 1024:
+            return 0
+        return cached - cached % 128
+
+    def choose_feedback(self, messages):
+        """
+        Pick canned feedback matching the task and feedback level of the prompt
+
+        Args:
+            messages (list): Chat messages of the request
+
+        Returns:
+            str: Feedback text
+        """
+        # Only Task 1 (vision) requests carry an image
+        task_id = "task_2"
+        texts = []
+        for message in messages:
+            # The system prompts describe every level, so only the user prompt is inspected
+            if message.get("role") == "system":
+                continue
+            content = message.get("content")
+            if isinstance(content, list):
+                for part in content:
+                    if part.get("type") == "image_url":
+                        task_id = "task_1"
+                    elif part.get("type") == "text":
+                        texts.append(part.get("text", ""))
+            elif content:
+                texts.append(content)
+
+        prompt = "\n".join(texts)
+
+        feedback_level = "F_2"
+        for marker, level in LEVEL_MARKERS:
+            if marker in prompt:
+                feedback_level = level
+                break
+
+        with self._lock:
+            return self.random.choice(self.bank[(task_id, feedback_level)])
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Handles POST /v1/chat/completions (streaming and non-streaming)"""
+
+    protocol_version = "HTTP/1.1"
+    behavior = None
+
+    def log_message(self, format, *args):
+        """Keep the console quiet; requests are summarized by the client-side logs"""
+        return
+
+    def do_POST(self):
+        """Answer a chat-completion request"""
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if self.path.rstrip('/') not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        try:
+            payload = json.loads(body)
+            messages = payload["messages"]
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": {"message": "Invalid request body", "type": "invalid_request_error"}})
+            return
+
+        status = self.behavior.next_fault()
+        if status == 429:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                            {"Retry-After": str(self.behavior.retry_after)})
+            return
+        if status == 500:
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        content = self.behavior.choose_feedback(messages)
+        response_format = payload.get("response_format")
+        if response_format and response_format.get("type") == "json_schema":
+            content = self._structured_content(response_format, content)
+        elif response_format and response_format.get("type") == "json_object":
+            content = json.dumps({"feedback": content})
+
+        prompt_text = json.dumps(messages)
+        usage = {
+            "prompt_tokens": count_tokens(prompt_text),
+            "completion_tokens": count_tokens(content),
+            "total_tokens": count_tokens(prompt_text) + count_tokens(content),
+            "prompt_tokens_details": {"cached_tokens": self.behavior.cached_tokens(messages)}
+        }
+        model = payload.get("model", "mock")
+
+        time.sleep(self.behavior.first_token_delay())
+
+        if payload.get("stream"):
+            include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+            self._send_stream(model, content, usage if include_usage else None)
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+    @staticmethod
+    def _structured_content(response_format, feedback):
+        """
+        Build a JSON answer that satisfies a flat json_schema of string fields
+
+        Args:
+            response_format (dict): Requested response format
+            feedback (str): Canned feedback
+
+        Returns:
+            str: JSON text
+        """
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        fields = schema.get("required") or list(schema.get("properties", {})) or ["feedback"]
+        result = {field: f"Mock {field}." for field in fields}
+        if "feedback" in result:
+            result["feedback"] = feedback
+        return json.dumps(result)
+
+    def _send_json(self, status, data, headers=None):
+        """Send a complete JSON response"""
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, model, content, usage=None):
+        """Send the content as server-sent events, one word per chunk"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        def event(choices, extra=None):
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": model, "choices": choices}
+            data.update(extra or {})
+            self._write_chunk(f"data: {json.dumps(data)}\n\n")
+
+        words = content.split(" ")
+        for index, word in enumerate(words):
+            delta = word if index == 0 else f" {word}"
+            event([{"index": 0, "delta": {"content": delta}, "finish_reason": None}])
+            time.sleep(self.behavior.profile["token_delay_s"])
+
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage is not None:
+            event([], {"usage": usage})
+        self._write_chunk("data: [DONE]\n\n")
+        self._write_chunk("")
+
+    def _write_chunk(self, text):
+        """Write one HTTP/1.1 chunk (an empty text ends the response)"""
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def main():
+    """Parse arguments and serve until interrupted"""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock server")
+    parser.add_argument('--host', type=str, default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8001,
+                        help='Port (must match MOCK_OPENAI_BASE_URL in config)')
+    parser.add_argument('--profile', type=str, default="typical", choices=sorted(LATENCY_PROFILES),
+                        help='Latency profile')
+    parser.add_argument('--error_rate', type=float, default=0.0,
+                        help='Probability of a 500 response')
+    parser.add_argument('--rate_limit_rate', type=float, default=0.0,
+                        help='Probability of a 429 response')
+    parser.add_argument('--retry_after', type=int, default=1,
+                        help='Retry-After seconds sent with 429 responses')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for reproducible runs')
+    args = parser.parse_args()
+
+    MockOpenAIHandler.behavior = MockBehavior(
+        args.profile, args.error_rate, args.rate_limit_rate, args.retry_after, args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), MockOpenAIHandler)
+    server.daemon_threads = True
+
+    print(f"Mock OpenAI server on http://{args.host}:{args.port}/v1 "
+          f"(profile {args.profile}, errors {args.error_rate}, rate limits {args.rate_limit_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping mock server")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
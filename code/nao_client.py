@@ -1,3 +1,28 @@
+"""
+NAO bridge (run in the `nao` Python 2.7 environment)
+
+Replies to every request at once and speaks in the background:
+    "__ping__"          heartbeat, answered with "__pong__"
+    "__stop__"          stop the current utterance and drop the queued ones
+    "__preempt__:text"  like __stop__, then speak text
+    any other text      queued and spoken after the utterances before it
+
+Feedback requests are answered with JSON {"status": "queued", "id": ..., "queued": ...};
+a request that cannot be handled gets {"status": "error", "error": ...}, so the
+bridge always replies and keeps running.
+A request may start with "__msg__:<message id>:"; RobotHandler retries a request
+with the same id, and a repeated id gets the first reply again instead of being
+spoken (or stopping speech) twice.
+Speech events are published on EVENTS_PORT as JSON with "event" set to
+speech_started (only for utterances that are actually spoken), speech_finished
+or speech_stopped, plus the utterance id,
+the robot's timestamp and (when it ends) the speaking time.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict, deque
 import zmq
 import naoqi
 from naoqi import ALProxy
@@ -6,19 +31,152 @@ from naoqi import ALProxy
 SAM = "192.168.1.128"
 ROBOT_IP = SAM
 PORT = 9559
+REQUEST_PORT = 5555
+EVENTS_PORT = 5556
+
+SPEECH_PREFIX = "\\style=didactic\\ \\vol=90\\ "
+PREEMPT_PREFIX = "__preempt__:"
+MESSAGE_ID_PREFIX = "__msg__:"
+REPLY_HISTORY = 256     # message ids remembered for de-duplication
+
 context = zmq.Context()
 socket = context.socket(zmq.REP)
-socket.bind("tcp://*:5555") 
+socket.bind("tcp://*:{}".format(REQUEST_PORT))
+events = context.socket(zmq.PUB)
+events.bind("tcp://*:{}".format(EVENTS_PORT))
+events_lock = threading.Lock()
 
-tts = ALProxy("ALAnimatedSpeech",ROBOT_IP, PORT)
+tts = ALProxy("ALAnimatedSpeech", ROBOT_IP, PORT)
 # tts = ALProxy("ALTextToSpeech",ROBOT_IP, PORT)
+speech = ALProxy("ALTextToSpeech", ROBOT_IP, PORT)  # stopAll() interrupts animated speech too
+
+# The queue and the current utterance change together under one lock, so a stop
+# cannot miss an utterance the speech thread has taken but not started yet
+pending = deque()
+state_lock = threading.Condition()
+state = {"next_id": 1, "current": None}
+
+
+def publish(event, utterance, **fields):
+    """Publish a speech event to the study machine"""
+    message = {"event": event, "id": utterance["id"], "time": time.time()}
+    message.update(fields)
+    with events_lock:
+        events.send_string(json.dumps(message))
+
+
+def queue_utterance(text):
+    """Queue text for the speech thread and return its id and the queue length"""
+    with state_lock:
+        utterance = {"id": state["next_id"], "text": text, "stopped": False}
+        state["next_id"] += 1
+        pending.append(utterance)
+        state_lock.notify()
+        return utterance["id"], len(pending)
+
+
+def stop_speech():
+    """Drop queued utterances and stop the current one; returns how many were dropped"""
+    with state_lock:
+        dropped = list(pending)
+        pending.clear()
+        current = state["current"]
+        if current is not None:
+            current["stopped"] = True
+
+    for utterance in dropped:
+        publish("speech_stopped", utterance, duration_s=0.0)
+    if current is not None:
+        speech.stopAll()
+    return len(dropped)
+
+
+def speech_loop():
+    """Speak queued utterances one at a time (post.say returns at once; wait() blocks here only)"""
+    while True:
+        with state_lock:
+            while not pending:
+                state_lock.wait()
+            utterance = pending.popleft()
+            state["current"] = utterance
 
+        start = time.time()
+        try:
+            with state_lock:
+                stopped = utterance["stopped"]
+            if not stopped:
+                message_str = SPEECH_PREFIX + utterance["text"].encode('utf-8')
+                task_id = tts.post.say(message_str)
+                publish("speech_started", utterance)
+                # A stop that came in just before say() started would have had nothing to stop
+                with state_lock:
+                    stopped = utterance["stopped"]
+                if stopped:
+                    speech.stopAll()
+                tts.wait(task_id, 0)
+        except Exception as e:
+            print("Speech error: {}".format(e))
+
+        with state_lock:
+            state["current"] = None
+        event = "speech_stopped" if utterance["stopped"] else "speech_finished"
+        publish(event, utterance, duration_s=round(time.time() - start, 3))
+
+
+def respond(message):
+    """Reply to one request, answering a repeated message id from the reply history"""
+    message_id = None
+    if message.startswith(MESSAGE_ID_PREFIX):
+        parts = message[len(MESSAGE_ID_PREFIX):].split(":", 1)
+        if len(parts) != 2:
+            raise ValueError("Malformed message id: {}".format(message[:64].encode('utf-8')))
+        message_id, message = parts
+
+    # A retry of a request that was received but whose reply was lost
+    if message_id is not None and message_id in replies:
+        print("Repeated message {}, not acting on it again".format(message_id))
+        return replies[message_id]
+
+    reply = handle(message)
+    if message_id is not None:
+        replies[message_id] = reply
+        while len(replies) > REPLY_HISTORY:
+            replies.popitem(last=False)
+    return reply
+
+
+def handle(message):
+    """Act on one request and return the reply"""
+    # Heartbeat from RobotHandler: answer without speaking
+    if message == "__ping__":
+        return "__pong__"
+
+    if message == "__stop__":
+        dropped = stop_speech()
+        return json.dumps({"status": "stopped", "dropped": dropped})
+
+    if message.startswith(PREEMPT_PREFIX):
+        message = message[len(PREEMPT_PREFIX):]
+        stop_speech()
+
+    print("Received message: {}".format(message.encode('utf-8')))
+    utterance_id, queued = queue_utterance(message)
+    return json.dumps({"status": "queued", "id": utterance_id, "queued": queued})
+
+
+speech_thread = threading.Thread(target=speech_loop)
+speech_thread.daemon = True
+speech_thread.start()
+
+replies = OrderedDict()  # message id -> reply, oldest first
 
 while True:
     message = socket.recv_string()
-    print("Received message: {}".format(message))
-    message_str = message.encode('utf-8')
-    # print("Encoded message type: {}".format(type(message_str)))
-    message_str = "\\style=didactic\\ \\vol=90\\ \\wait=5\\" + message_str
-    tts.say(message_str)
-    socket.send_string("Message received by NAO")
+
+    # The REP socket must reply before it can receive again, so an error never skips the reply
+    try:
+        reply = respond(message)
+    except Exception as e:
+        print("Request error: {}".format(e))
+        reply = json.dumps({"status": "error", "error": str(e)})
+    socket.send_string(reply)
@@ -0,0 +1,192 @@
+"""
+TTS Pre-render Command
+Synthesizes the utterances the voice agent repeats most (phrase bank, recorded F_2/F_3
+feedback, canned fallbacks) into the audio cache, so they start playing without synthesis
+
+Run from the code/ directory:
+    python prerender_tts.py
+    python prerender_tts.py --sources csv --levels F_2,F_3 --engines google_cloud,gtts
+
+Utterances already in the cache are skipped.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import string
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config.config import (
+    TTS_CACHE_ENABLED, TTS_ENGINE, LLM_STREAMING, FALLBACK_FEEDBACK, TTS_CHUNKED, TTS_CHUNK_MAX_CHARS
+)
+from utils.sentence_stream import split_sentences, split_chunks
+
+FEEDBACK_CSV_PATH = "../generated_feedback/llm_generated_feedback_data.csv"
+
+
+def phrase_bank_texts(task_ids, levels):
+    """
+    Every feedback the phrase bank can compose
+
+    Args:
+        task_ids (list): Task IDs
+        levels (list): Feedback levels
+
+    Returns:
+        list: Feedback texts
+    """
+    texts = []
+    for task_id in task_ids:
+        with open(f"prompts/{task_id}/phrase_bank.json", "r") as file:
+            bank = json.load(file)
+        for level in levels:
+            entry = bank.get(level)
+            if entry is None:
+                continue
+            parts = [name for _, name, _, _ in string.Formatter().parse(entry["template"]) if name]
+            for combination in itertools.product(*(entry[part] for part in parts)):
+                texts.append(entry["template"].format(**dict(zip(parts, combination))))
+    return texts
+
+
+def csv_texts(csv_path, task_ids, levels):
+    """
+    Recorded LLM feedback (agent_2 only, the agent that speaks through TTS)
+
+    Args:
+        csv_path (str): llm_generated_feedback_data.csv
+        task_ids (list): Task IDs
+        levels (list): Feedback levels
+
+    Returns:
+        list: Feedback texts
+    """
+    with open(csv_path, "r", newline='', encoding='utf-8') as file:
+        return [
+            row["generated_feedback"] for row in csv.DictReader(file)
+            if row["task_id"] in task_ids and row["Feedback_Level"] in levels
+            and row["agent_type"] == "agent_2" and row["generated_feedback"].strip()
+        ]
+
+
+def fallback_texts(task_ids, levels):
+    """
+    Canned feedback of the request policy
+
+    Args:
+        task_ids (list): Task IDs
+        levels (list): Feedback levels
+
+    Returns:
+        list: Feedback texts
+    """
+    return [
+        FALLBACK_FEEDBACK[task_id][level]
+        for task_id in task_ids for level in levels
+        if level in FALLBACK_FEEDBACK.get(task_id, {})
+    ]
+
+
+def utterances(texts, whole):
+    """
+    Split feedback into the units TTSHandler synthesizes and caches
+
+    With LLM streaming every sentence is spoken on its own; otherwise the whole
+    feedback is one utterance. With TTS_CHUNKED, speak() synthesizes each
+    utterance chunk by chunk (long sentences split at clauses), so the chunks
+    are what is cached.
+
+    Args:
+        texts (list): Feedback texts
+        whole (bool): Cache whole feedback texts as well (no effect with TTS_CHUNKED,
+                      where a whole text is spoken as the same chunks as its sentences)
+
+    Returns:
+        list: Unique units in first-seen order
+    """
+    units = []
+    for text in texts:
+        spoken = split_sentences(text) if LLM_STREAMING else []
+        if whole or not LLM_STREAMING:
+            spoken.append(text.strip())
+        for utterance in spoken:
+            units.extend(split_chunks(utterance, TTS_CHUNK_MAX_CHARS) if TTS_CHUNKED else [utterance])
+    return list(dict.fromkeys(unit for unit in units if unit))
+
+
+def main():
+    """Pre-render repeated utterances into the audio cache"""
+    parser = argparse.ArgumentParser(description="Warm the TTS audio cache")
+    parser.add_argument('--sources', type=str, default="phrase_bank,csv,fallback",
+                        help='Comma-separated sources: phrase_bank, csv, fallback')
+    parser.add_argument('--tasks', type=str, default="task_1,task_2",
+                        help='Comma-separated task IDs')
+    parser.add_argument('--levels', type=str, default="F_2,F_3",
+                        help='Comma-separated feedback levels')
+    parser.add_argument('--csv', type=str, default=FEEDBACK_CSV_PATH,
+                        help='Recorded feedback CSV')
+    parser.add_argument('--engines', type=str, default=TTS_ENGINE,
+                        help='Comma-separated TTS engines: google_cloud, gtts, local')
+    parser.add_argument('--whole', action='store_true',
+                        help='Also cache whole feedback texts (not only sentences; no effect with TTS_CHUNKED)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent synthesis requests')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Only render the first N utterances')
+    args = parser.parse_args()
+
+    if not TTS_CACHE_ENABLED:
+        print("TTS_CACHE_ENABLED is False in config.py - nothing to warm")
+        return
+
+    # Imported here so --help works without the TTS dependencies
+    from utils.tts_handler import TTSHandler
+
+    task_ids = args.tasks.split(',')
+    levels = args.levels.split(',')
+    sources = args.sources.split(',')
+
+    texts = []
+    if "phrase_bank" in sources:
+        texts += phrase_bank_texts(task_ids, levels)
+    if "csv" in sources:
+        texts += csv_texts(args.csv, task_ids, levels)
+    if "fallback" in sources:
+        texts += fallback_texts(task_ids, levels)
+
+    units = utterances(texts, args.whole)
+    if args.limit is not None:
+        units = units[:args.limit]
+
+    tts_handler = TTSHandler()
+    jobs = [(unit, engine) for engine in args.engines.split(',') for unit in units]
+    print(f"{len(texts)} feedback texts -> {len(units)} utterances, {len(jobs)} to render")
+
+    rendered = 0
+    failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(tts_handler.synthesize, unit, engine): (unit, engine) for unit, engine in jobs}
+        for future in as_completed(futures):
+            unit, engine = futures[future]
+            try:
+                future.result()
+                rendered += 1
+            except Exception as e:
+                failed += 1
+                print(f"Failed {engine}: {unit!r}: {e}")
+
+    elapsed = time.perf_counter() - start
+    stats = tts_handler.audio_cache.stats()
+
+    print(f"\n{'='*60}")
+    print(f"Rendered {rendered} utterances ({failed} failed) in {elapsed:.1f}s")
+    print(f"Already cached: {stats['hits']}, synthesized: {stats['misses']}")
+    print(f"Cache: {stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.1f} MB")
+    print(f"{'='*60}\n")
+
+
+if __name__ == '__main__':
+    main()
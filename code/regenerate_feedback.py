@@ -0,0 +1,426 @@
+"""
+Feedback Regeneration Runner
+Rebuilds the phase 1 prompts of every recorded session and regenerates the feedback
+headlessly, e.g. to produce variants for a new model or prompt
+
+Run from the code/ directory:
+    python regenerate_feedback.py --output ../generated_feedback/regenerated_feedback.csv
+    python regenerate_feedback.py --tasks task_2 --workers 8 --rate 5 --parquet
+
+Finished rows are appended to the output CSV as they complete; rerunning with the
+same output resumes and skips every row already written.
+"""
+
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config.config import (
+    OPENAI_MODEL, OPENAI_VISION_MODEL, TASK_1_F1_CANDIDATE_LIST, TASK_1_F1_MAX_CANDIDATES,
+    get_question_file_path, get_error_file_path, get_answer_file_path
+)
+from utils.llm_metrics import summarize_calls
+
+# Phase 1 data file written by each task's DataManager
+SESSION_FILE_NAMES = {
+    "task_1": "objects_and_feedback.txt",
+    "task_2": "feedback_data.txt",
+}
+
+OUTPUT_FIELDS = ["subject_id", "task_id", "agent_type", "Feedback_Level", "set_number", "model",
+                 "generated_feedback", "original_feedback", "latency_s"]
+
+
+class RateLimiter:
+    """Token bucket limiting how many requests start per second (shared by all workers)"""
+
+    def __init__(self, rate, burst=1):
+        """
+        Initialize the bucket
+
+        Args:
+            rate (float): Requests per second; 0 disables limiting
+            burst (int): Requests that may start back to back
+        """
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may start"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def load_phase_1(file_path):
+    """
+    Load the phase 1 record of a session file
+
+    Args:
+        file_path (str): Session data file
+
+    Returns:
+        dict: Phase 1 data
+        None: If the file is missing or has no phase 1
+    """
+    if not os.path.exists(file_path):
+        return None
+    try:
+        with open(file_path, "r") as file:
+            return json.load(file).get("Phase_1")
+    except json.JSONDecodeError:
+        print(f"Warning: Skipping unreadable session file {file_path}")
+        return None
+
+
+def find_sessions(data_dir, task_ids, default_set_number=None):
+    """
+    Walk data/<task>/<agent>/<subject>/<level> and collect the sessions to regenerate
+
+    Args:
+        data_dir (str): Root of the recorded session data
+        task_ids (list): Tasks to include
+        default_set_number (str): Set number for Task 1 sessions recorded without one
+
+    Returns:
+        list: Session dicts (task_id, agent_id, sub_id, feedback_level, set_number, phase_1)
+    """
+    sessions = []
+    for task_id in task_ids:
+        if task_id not in SESSION_FILE_NAMES:
+            raise ValueError(f"Unknown task_id '{task_id}'")
+        task_dir = os.path.join(data_dir, task_id)
+        if not os.path.isdir(task_dir):
+            continue
+
+        for agent_id in sorted(os.listdir(task_dir)):
+            for sub_id in sorted(_subdirectories(os.path.join(task_dir, agent_id))):
+                for feedback_level in sorted(_subdirectories(os.path.join(task_dir, agent_id, sub_id))):
+                    # F_4 sessions have no feedback to regenerate
+                    if feedback_level == "F_4":
+                        continue
+
+                    file_path = os.path.join(task_dir, agent_id, sub_id, feedback_level,
+                                             SESSION_FILE_NAMES[task_id])
+                    phase_1 = load_phase_1(file_path)
+                    if phase_1 is None:
+                        continue
+
+                    set_number = phase_1.get("Set_Number") or default_set_number
+                    if set_number is None:
+                        print(f"Warning: No set number for {file_path}, pass --set_number to include it")
+                        continue
+
+                    sessions.append({
+                        "task_id": task_id,
+                        "agent_id": agent_id,
+                        "sub_id": sub_id,
+                        "feedback_level": feedback_level,
+                        "set_number": str(set_number),
+                        "phase_1": phase_1
+                    })
+    return sessions
+
+
+def _subdirectories(path):
+    """List the subdirectory names of a directory (empty if it does not exist)"""
+    if not os.path.isdir(path):
+        return []
+    return [name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name))]
+
+
+def session_key(task_id, agent_id, sub_id, feedback_level):
+    """Key identifying one output row"""
+    return (sub_id, task_id, agent_id, feedback_level)
+
+
+def load_completed(output_path):
+    """
+    Read the keys of the rows already written (checkpoint)
+
+    Args:
+        output_path (str): Output CSV path
+
+    Returns:
+        set: Completed session keys
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            completed.add(session_key(row["task_id"], row["agent_type"], row["subject_id"], row["Feedback_Level"]))
+    return completed
+
+
+class FeedbackRegenerator:
+    """Rebuilds the inputs of a session from database/ and regenerates its feedback"""
+
+    def __init__(self, task_ids, prompt_layout=None):
+        """
+        Create the handlers for the requested tasks
+
+        Args:
+            task_ids (list): Tasks that will be regenerated
+            prompt_layout (str): Overrides PROMPT_LAYOUT ("inline" or "prefix")
+        """
+        self.handlers = {}
+        self.set_inputs = {}
+        self._lock = threading.Lock()
+
+        if "task_1" in task_ids:
+            from utils.task_1_llm_handler import LLMHandler as Task1LLMHandler
+            from utils.task_1_data_manager import DataManager as Task1DataManager
+            self.handlers["task_1"] = Task1LLMHandler()
+            self.task_1_data_manager = Task1DataManager()
+
+        if "task_2" in task_ids:
+            from utils.task_2_llm_handler import LLMHandler as Task2LLMHandler
+            from utils.task_2_data_manager import DataManager as Task2DataManager
+            self.handlers["task_2"] = Task2LLMHandler()
+            self.task_2_data_manager = Task2DataManager()
+
+        # Regenerated feedback must come from the model, never from the canned fallback,
+        # the phrase bank (which would also use up the participants' phrase history)
+        # or the response cache (which would return the stored responses, not new samples)
+        for handler in self.handlers.values():
+            handler.request_policy = None
+            handler.local_backend = None
+            handler.cache = None
+            if prompt_layout is not None:
+                handler.prompt_layout = prompt_layout
+
+    def model_for(self, task_id):
+        """Model name used for a task"""
+        return OPENAI_VISION_MODEL if task_id == "task_1" else OPENAI_MODEL
+
+    def _load_set(self, task_id, set_number):
+        """
+        Load (once) the database files of a question set
+
+        Args:
+            task_id (str): Task ID
+            set_number (str): Set number
+
+        Returns:
+            dict: Set inputs for the prompt
+        """
+        key = (task_id, set_number)
+        with self._lock:
+            if key in self.set_inputs:
+                return self.set_inputs[key]
+
+        if task_id == "task_1":
+            inputs = {
+                "image_path": f"database/task_1/question/q_{set_number}.png",
+                "shape_list_str": self.task_1_data_manager.load_shapes_from_file(
+                    f"database/task_1/shape_list/shape_{set_number}.txt"),
+                "example_objects_str": self.task_1_data_manager.load_objects_from_file(
+                    f"database/task_1/object_list/object_{set_number}.txt"),
+                "inventory": self.task_1_data_manager.load_inventory(
+                    f"database/task_1/shape_list/shape_{set_number}.txt",
+                    f"database/task_1/object_list/object_{set_number}.txt")
+            }
+        else:
+            inputs = {
+                "paragraph_text": self.task_2_data_manager.load_file(get_question_file_path(2, set_number)),
+                "answer": self.task_2_data_manager.load_file(get_answer_file_path(2, set_number)),
+                "error_list": self.task_2_data_manager.load_file(get_error_file_path(2, set_number))
+            }
+
+        with self._lock:
+            self.set_inputs[key] = inputs
+        return inputs
+
+    def regenerate(self, session):
+        """
+        Regenerate the phase 1 feedback of one session
+
+        Args:
+            session (dict): Session from find_sessions
+
+        Returns:
+            dict: Output row
+        """
+        task_id = session["task_id"]
+        phase_1 = session["phase_1"]
+        inputs = self._load_set(task_id, session["set_number"])
+        handler = self.handlers[task_id]
+
+        start = time.perf_counter()
+        if task_id == "task_1":
+            object_list = phase_1.get("Objects_1", [])
+            example_objects_str = inputs["example_objects_str"]
+            if session["feedback_level"] == "F_1" and TASK_1_F1_CANDIDATE_LIST and inputs["inventory"] is not None:
+                example_objects_str = inputs["inventory"].candidates_str(
+                    object_list, TASK_1_F1_MAX_CANDIDATES) or example_objects_str
+            feedback = handler.get_feedback_response(
+                session["feedback_level"], inputs["image_path"], inputs["shape_list_str"],
+                ', '.join(object_list), example_objects_str
+            )
+        else:
+            feedback = handler.get_feedback_response(
+                session["feedback_level"], inputs["paragraph_text"], inputs["answer"], inputs["error_list"],
+                phase_1.get("Response_1", "")
+            )
+        latency = time.perf_counter() - start
+
+        return {
+            "subject_id": session["sub_id"],
+            "task_id": task_id,
+            "agent_type": session["agent_id"],
+            "Feedback_Level": session["feedback_level"],
+            "set_number": session["set_number"],
+            "model": self.model_for(task_id),
+            "generated_feedback": feedback,
+            "original_feedback": phase_1.get("OpenAI_Response_1", ""),
+            "latency_s": round(latency, 4)
+        }
+
+    def drain_calls(self):
+        """Return the LLM call records of all handlers"""
+        records = []
+        for handler in self.handlers.values():
+            records.extend(handler.call_log.drain())
+        return records
+
+
+def write_parquet(csv_path):
+    """
+    Convert the output CSV to Parquet next to it (requires pandas and pyarrow)
+
+    Args:
+        csv_path (str): Output CSV path
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        print("Warning: pandas is not installed, skipping Parquet output")
+        return
+
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    try:
+        pd.read_csv(csv_path).to_parquet(parquet_path, index=False)
+        print(f"Parquet written to {parquet_path}")
+    except ImportError as e:
+        print(f"Warning: Parquet output needs pyarrow ({e})")
+
+
+def main():
+    """Regenerate feedback for every recorded session"""
+    parser = argparse.ArgumentParser(description="Headless feedback regeneration")
+    parser.add_argument('--tasks', type=str, default="task_1,task_2",
+                        help='Comma-separated task IDs')
+    parser.add_argument('--data_dir', type=str, default="data",
+                        help='Root of the recorded session data')
+    parser.add_argument('--output', type=str, default="../generated_feedback/regenerated_feedback.csv",
+                        help='Output CSV (appended to; existing rows are skipped)')
+    parser.add_argument('--set_number', type=str, default=None,
+                        help='Set number for Task 1 sessions recorded without one')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent requests')
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help='Maximum requests started per second (0 for no limit)')
+    parser.add_argument('--prompt_layout', type=str, default=None, choices=['inline', 'prefix'],
+                        help='Override PROMPT_LAYOUT (prefix reuses the prompt cache across a set)')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Only regenerate the first N pending sessions')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Also write the output as Parquet')
+    args = parser.parse_args()
+
+    task_ids = args.tasks.split(',')
+    sessions = find_sessions(args.data_dir, task_ids, args.set_number)
+    completed = load_completed(args.output)
+    pending = [
+        session for session in sessions
+        if session_key(session["task_id"], session["agent_id"], session["sub_id"],
+                       session["feedback_level"]) not in completed
+    ]
+    if args.limit is not None:
+        pending = pending[:args.limit]
+
+    print(f"Found {len(sessions)} sessions, {len(sessions) - len(pending)} already done, "
+          f"{len(pending)} to regenerate")
+    if not pending:
+        return
+
+    regenerator = FeedbackRegenerator(task_ids, args.prompt_layout)
+    rate_limiter = RateLimiter(args.rate)
+    write_lock = threading.Lock()
+
+    def run(session):
+        rate_limiter.acquire()
+        return regenerator.regenerate(session)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    write_header = not os.path.exists(args.output) or os.path.getsize(args.output) == 0
+
+    done = 0
+    failed = 0
+    start = time.perf_counter()
+    with open(args.output, "a", newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=OUTPUT_FIELDS)
+        if write_header:
+            writer.writeheader()
+
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(run, session): session for session in pending}
+            for future in as_completed(futures):
+                session = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"Failed {session['task_id']} {session['sub_id']} {session['feedback_level']}: {e}")
+                    continue
+
+                # Checkpoint: each finished row is flushed so an interrupted run can resume
+                with write_lock:
+                    writer.writerow(row)
+                    file.flush()
+                done += 1
+
+                elapsed = time.perf_counter() - start
+                print(f"[{done + failed}/{len(pending)}] {row['task_id']} {row['subject_id']} "
+                      f"{row['Feedback_Level']} in {row['latency_s']:.2f}s ({done / elapsed:.2f} req/s)")
+
+    elapsed = time.perf_counter() - start
+    calls = summarize_calls(regenerator.drain_calls())
+
+    print(f"\n{'='*60}")
+    print(f"Regenerated {done} sessions ({failed} failed) in {elapsed:.1f}s")
+    print(f"Throughput: {done / elapsed:.2f} req/s with {args.workers} workers")
+    print(f"LLM calls: {calls['calls']}, tokens {calls['prompt_tokens']}+{calls['completion_tokens']} "
+          f"(cached {calls['cached_tokens']}), retries {calls['retries']}")
+    unpriced = f" ({calls['unpriced_calls']} calls to unpriced models)" if calls['unpriced_calls'] else ""
+    print(f"Estimated cost: ${calls['cost_usd']:.4f}{unpriced}")
+    print(f"Output: {args.output}")
+    print(f"{'='*60}\n")
+
+    if args.parquet:
+        write_parquet(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+from utils.audio_cache import AudioCache, normalize_text
+
+
+def make_cache(tmp_path, max_bytes=1000, memory_entries=2):
+    return AudioCache(str(tmp_path / "cache" / "audio.sqlite3"), max_bytes, memory_entries)
+
+
+def disk_keys(cache):
+    return sorted(key for (key,) in cache.connection.execute("SELECT key FROM audio"))
+
+
+def test_normalize_text():
+    assert normalize_text("  Don’t  stop,\n“go” ") == "Don't stop, \"go\""
+
+
+def test_make_key_normalizes_the_text_only():
+    key = AudioCache.make_key("google", "en-US-Wavenet-C", "en-US", "LINEAR16", "Don’t stop.")
+    assert key == AudioCache.make_key("google", "en-US-Wavenet-C", "en-US", "LINEAR16", " Don't  stop.")
+    assert key != AudioCache.make_key("gtts", "en-US-Wavenet-C", "en-US", "LINEAR16", "Don't stop.")
+    assert key != AudioCache.make_key("google", "en-US-Wavenet-D", "en-US", "LINEAR16", "Don't stop.")
+
+
+def test_miss_put_and_hits(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("a") is None
+    assert not cache.contains("a")
+
+    cache.put("a", b"\x00\x01", "Nice fish.")
+    assert cache.contains("a")
+    assert cache.get("a") == b"\x00\x01"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert (stats["entries"], stats["bytes"]) == (1, 2)
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    make_cache(tmp_path).put("a", b"audio")
+
+    cache = make_cache(tmp_path)
+    assert cache.contains("a")
+    assert cache.get("a") == b"audio"
+    assert cache.stats()["memory_hits"] == 0
+    assert "a" in cache.memory
+
+
+def test_disk_tier_is_trimmed_to_max_bytes(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("utils.audio_cache.time.time", lambda: next(clock))
+    cache = make_cache(tmp_path, max_bytes=10, memory_entries=3)
+
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    cache.put("c", b"x" * 4)
+
+    assert disk_keys(cache) == ["b", "c"]
+    assert "a" not in cache.memory
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_eviction_follows_memory_hits(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("utils.audio_cache.time.time", lambda: next(clock))
+    cache = make_cache(tmp_path, max_bytes=12, memory_entries=3)
+
+    for key in "abc":
+        cache.put(key, b"x" * 4)
+    # A replayed utterance must stay on disk when "d" pushes the store over its size
+    assert cache.get("a") == b"x" * 4
+    cache.put("d", b"x" * 4)
+
+    assert disk_keys(cache) == ["a", "c", "d"]
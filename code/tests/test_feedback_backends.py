@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from utils.feedback_backends import PhraseBankBackend
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def history_path(tmp_path, monkeypatch):
+    # The phrase banks are loaded relative to the code directory, as in a session
+    monkeypatch.chdir(CODE_DIR)
+    return str(tmp_path / "phrase_history.json")
+
+
+def test_parts_follow_the_template(history_path):
+    backend = PhraseBankBackend("task_1", ["F_2", "F_3"], history_path)
+    assert backend.parts["F_2"] == ["opener", "action", "closer"]
+    assert backend.parts["F_3"] == ["trait", "affirmation"]
+    assert backend.supports("F_3") and not backend.supports("F_1")
+
+
+def test_missing_level_is_rejected(history_path):
+    with pytest.raises(ValueError):
+        PhraseBankBackend("task_1", ["F_3", "F_9"], history_path)
+
+
+def test_participant_never_hears_a_combination_twice(history_path):
+    backend = PhraseBankBackend("task_2", ["F_3"], history_path)
+    entry = backend.bank["F_3"]
+    total = len(entry["trait"]) * len(entry["affirmation"])
+
+    feedback = [backend.generate("F_3", "P01") for _ in range(total)]
+    assert len(set(feedback)) == total
+
+    combinations = backend.history["P01"]["F_3"]
+    assert len({tuple(combination) for combination in combinations}) == total
+
+
+def test_fresh_parts_are_used_first(history_path):
+    backend = PhraseBankBackend("task_1", ["F_2"], history_path)
+    entry = backend.bank["F_2"]
+    fresh_rounds = min(len(entry[part]) for part in backend.parts["F_2"])
+
+    for _ in range(fresh_rounds):
+        backend.generate("F_2", "P01")
+
+    combinations = backend.history["P01"]["F_2"]
+    for index in range(len(backend.parts["F_2"])):
+        assert len({combination[index] for combination in combinations}) == fresh_rounds
+
+
+def test_exhausted_bank_starts_over(history_path):
+    backend = PhraseBankBackend("task_1", ["F_3"], history_path)
+    entry = backend.bank["F_3"]
+    total = len(entry["trait"]) * len(entry["affirmation"])
+
+    for _ in range(total + 1):
+        backend.generate("F_3", "P01")
+    assert len(backend.history["P01"]["F_3"]) == 1
+
+
+def test_history_is_shared_across_sessions(history_path):
+    first = PhraseBankBackend("task_2", ["F_3"], history_path)
+    heard = first.generate("F_3", "P01")
+
+    with open(history_path) as file:
+        assert json.load(file)["task_2"]["P01"]["F_3"] == first.history["P01"]["F_3"]
+
+    second = PhraseBankBackend("task_2", ["F_3"], history_path)
+    entry = second.bank["F_3"]
+    total = len(entry["trait"]) * len(entry["affirmation"])
+    assert heard not in {second.generate("F_3", "P01") for _ in range(total - 1)}
+
+
+def test_without_subject_nothing_is_remembered(history_path):
+    backend = PhraseBankBackend("task_1", ["F_3"], history_path)
+    assert backend.generate("F_3")
+    assert backend.history == {}
+    assert not os.path.exists(history_path)
@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+
+from utils.request_policy import HedgedRequestPolicy, _SentenceGate
+
+
+def test_gate_first_attempt_to_speak_owns_it():
+    spoken = []
+    gate = _SentenceGate(spoken.append)
+    first, second = gate.for_attempt(0), gate.for_attempt(1)
+
+    second("From the hedge.")
+    first("From the primary.")
+    second("More from the hedge.")
+
+    assert gate.owner == 1
+    assert spoken == ["From the hedge.", "More from the hedge."]
+    assert gate.close() is False
+
+
+def test_gate_close_silences_every_attempt():
+    spoken = []
+    gate = _SentenceGate(spoken.append)
+    attempt = gate.for_attempt(0)
+
+    assert gate.close() is True
+    attempt("Too late.")
+    assert spoken == []
+    assert gate.owner is None
+
+
+def test_gate_without_callback_does_not_stream():
+    assert _SentenceGate(None).for_attempt(0) is None
+
+
+def test_fast_primary_wins():
+    policy = HedgedRequestPolicy(deadline_s=2.0, initial_hedge_delay_s=1.0)
+    result, outcome = policy.run(lambda on_sentence: "Nice fish.", "F_1", "Fallback.")
+
+    assert result == "Nice fish."
+    assert outcome["outcome"] == "primary"
+    assert outcome["attempts"] == 1
+    assert len(policy.latencies["F_1"]) == 1
+
+
+def test_slow_primary_is_hedged():
+    release = threading.Event()
+    calls = []
+
+    def request(on_sentence):
+        calls.append(on_sentence)
+        if len(calls) == 1:
+            release.wait(2.0)
+            return "Slow answer."
+        return "Hedged answer."
+
+    policy = HedgedRequestPolicy(deadline_s=2.0, initial_hedge_delay_s=0.05)
+    try:
+        result, outcome = policy.run(request, "F_1", "Fallback.")
+    finally:
+        release.set()
+
+    assert result == "Hedged answer."
+    assert outcome["outcome"] == "hedge"
+    assert outcome["attempts"] == 2
+
+
+def test_deadline_delivers_the_fallback():
+    release = threading.Event()
+    spoken = []
+
+    def request(on_sentence):
+        release.wait(2.0)
+        return "Too slow."
+
+    policy = HedgedRequestPolicy(deadline_s=0.1, initial_hedge_delay_s=0.05)
+    try:
+        result, outcome = policy.run(request, "F_1", "Keep going, you are doing well.", spoken.append)
+    finally:
+        release.set()
+
+    assert result == "Keep going, you are doing well."
+    assert outcome["outcome"] == "fallback"
+    assert spoken == ["Keep going, you are doing well."]
+    assert len(policy.latencies["F_1"]) == 0
+
+
+def test_all_attempts_failing_delivers_the_fallback():
+    def request(on_sentence):
+        raise ConnectionError("offline")
+
+    policy = HedgedRequestPolicy(deadline_s=2.0, initial_hedge_delay_s=1.0, max_hedges=1)
+    result, outcome = policy.run(request, "F_1", "Fallback.")
+
+    assert result == "Fallback."
+    assert outcome["outcome"] == "fallback"
+    assert outcome["attempts"] == 2
+
+
+def test_speaking_attempt_finishes_past_the_deadline():
+    spoke = threading.Event()
+
+    def request(on_sentence):
+        on_sentence("First sentence is out.")
+        spoke.set()
+        threading.Event().wait(0.2)
+        return "First sentence is out. Second one."
+
+    spoken = []
+    policy = HedgedRequestPolicy(deadline_s=0.05, initial_hedge_delay_s=1.0)
+    result, outcome = policy.run(request, "F_1", "Fallback.", spoken.append)
+
+    assert result == "First sentence is out. Second one."
+    assert outcome["outcome"] == "primary"
+    assert spoken == ["First sentence is out."]
+
+
+def test_speaking_attempt_failure_is_raised():
+    def request(on_sentence):
+        on_sentence("Half an answer.")
+        raise ConnectionError("stream dropped")
+
+    policy = HedgedRequestPolicy(deadline_s=2.0, initial_hedge_delay_s=1.0)
+    with pytest.raises(ConnectionError):
+        policy.run(request, "F_1", "Fallback.", lambda sentence: None)
+
+
+def test_hedge_delay_uses_the_latency_percentile():
+    policy = HedgedRequestPolicy(deadline_s=10.0, hedge_percentile=0.5,
+                                 initial_hedge_delay_s=3.0, min_samples=3)
+    assert policy.hedge_delay("F_2") == 3.0
+
+    policy.latencies["F_2"].extend([1.0, 4.0, 2.0, 8.0])
+    assert policy.hedge_delay("F_2") == 4.0
+
+    policy.latencies["F_2"].extend([20.0] * 10)
+    assert policy.hedge_delay("F_2") == 9.0
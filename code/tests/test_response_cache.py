@@ -0,0 +1,87 @@
+from utils.response_cache import ResponseCache
+
+
+def make_cache(tmp_path, ttl_seconds=3600, memory_entries=2, max_disk_entries=3):
+    return ResponseCache(str(tmp_path / "cache" / "responses.sqlite3"), ttl_seconds,
+                         memory_entries, max_disk_entries)
+
+
+def disk_keys(cache):
+    return sorted(key for (key,) in cache.connection.execute("SELECT key FROM responses"))
+
+
+def test_make_key_separates_the_inputs():
+    key = ResponseCache.make_key("gpt-4o-mini", "system", "user")
+    assert key == ResponseCache.make_key("gpt-4o-mini", "system", "user")
+    assert key != ResponseCache.make_key("gpt-4o-mini", "systemu", "ser")
+    assert key != ResponseCache.make_key("gpt-4o-mini", "system", "user", b"image")
+    assert key != ResponseCache.make_key("gpt-4o", "system", "user")
+
+
+def test_miss_put_and_memory_hit(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("a") is None
+
+    cache.put("a", "Nice fish.")
+    assert cache.get("a") == "Nice fish."
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    make_cache(tmp_path).put("a", "Nice fish.")
+
+    cache = make_cache(tmp_path)
+    assert cache.get("a") == "Nice fish."
+    assert cache.stats()["memory_hits"] == 0
+    assert "a" in cache.memory
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=2)
+    for key in "abc":
+        cache.put(key, key.upper())
+
+    assert list(cache.memory) == ["b", "c"]
+    assert cache.get("a") == "A"
+    assert list(cache.memory) == ["c", "a"]
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=-1)
+    cache.put("a", "Old.")
+
+    assert cache.get("a") is None
+    assert "a" not in cache.memory
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_eviction_follows_memory_hits(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("utils.response_cache.time.time", lambda: next(clock))
+    cache = make_cache(tmp_path, memory_entries=3, max_disk_entries=3)
+
+    for key in "abc":
+        cache.put(key, key.upper())
+    # A memory hit on "a" must keep it on disk when "d" pushes the table over its limit
+    assert cache.get("a") == "A"
+    cache.put("d", "D")
+
+    assert disk_keys(cache) == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_hits_are_written_in_batches(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=4)
+    cache.TOUCH_BATCH_SIZE = 3
+    for key in "abc":
+        cache.put(key, key.upper())
+
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    assert list(cache.touched) == ["a", "b"]
+    cache.get("c")
+    assert not cache.touched
@@ -0,0 +1,43 @@
+from utils.sentence_stream import SentenceSplitter, split_chunks, split_sentences
+
+
+def test_feed_yields_sentences_across_chunks():
+    splitter = SentenceSplitter(min_length=5)
+    assert splitter.feed("You built a fish") == []
+    assert splitter.feed(" already. Now try ") == ["You built a fish already."]
+    assert splitter.feed("a rocket! Keep") == ["Now try a rocket!"]
+    assert splitter.flush() == ["Keep"]
+    assert splitter.flush() == []
+
+
+def test_boundary_needs_whitespace_after_punctuation():
+    splitter = SentenceSplitter(min_length=1)
+    # 3.5 and a sentence end without the following space are not boundaries yet
+    assert splitter.feed("It is 3.5 cm long.") == []
+    assert splitter.feed(" Next") == ["It is 3.5 cm long."]
+
+
+def test_closing_quotes_stay_with_their_sentence():
+    sentences = split_sentences('She said "well done." Then she left.', min_length=1)
+    assert sentences == ['She said "well done."', "Then she left."]
+
+
+def test_short_sentences_are_merged_with_the_next():
+    sentences = split_sentences("Great! You found all the triangles.", min_length=20)
+    assert sentences == ["Great! You found all the triangles."]
+
+
+def test_split_chunks_breaks_long_sentences_at_clauses():
+    text = ("You used the red trapezoid, the yellow hexagon, and the green triangle, "
+            "which together make a candy. Well done.")
+    chunks = split_chunks(text, max_length=40, min_length=5)
+    assert " ".join(chunks) == text
+    assert chunks[-1] == "Well done."
+    assert all(len(chunk) <= 40 for chunk in chunks[:-1])
+    assert len(chunks) > 2
+
+
+def test_split_chunks_keeps_short_sentences_whole():
+    assert split_chunks("Try a fish next. It needs a hexagon.", max_length=120, min_length=5) == [
+        "Try a fish next.", "It needs a hexagon."
+    ]
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+
+from utils.task_1_inventory import ShapeInventory, normalize_object_name, normalize_shape
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASK_1_DIR = os.path.join(CODE_DIR, "database", "task_1")
+
+
+def load_set(number):
+    return ShapeInventory.from_files(
+        os.path.join(TASK_1_DIR, "shape_list", f"shape_{number}.txt"),
+        os.path.join(TASK_1_DIR, "object_list", f"object_{number}.txt")
+    )
+
+
+@pytest.fixture
+def flowers():
+    inventory = {("triangle", "green"): 2, ("rhombus", "white"): 4}
+    recipes = [
+        ("flower 1", {("triangle", "green"): 1, ("rhombus", "white"): 2}),
+        ("rocket", {("triangle", "green"): 1}),
+        ("flower 2", {("triangle", "green"): 1, ("rhombus", "white"): 2}),
+    ]
+    return ShapeInventory(inventory, recipes)
+
+
+@pytest.mark.parametrize("shape, expected", [
+    ("Triangles", "triangle"),
+    ("rhombuses", "rhombus"),
+    ("3D Trapezoids", "3D trapezoid"),
+    ("rectangel", "rectangle"),
+    ("glass", "glass"),
+])
+def test_normalize_shape(shape, expected):
+    assert normalize_shape(shape) == expected
+
+
+def test_normalize_object_name():
+    assert normalize_object_name(" Fish  2") == ("fish", 2)
+    assert normalize_object_name("pear-fruit!") == ("pear fruit", None)
+
+
+def test_numbered_example_matches_only_its_number(flowers):
+    assert flowers.built_mask(["flower 2"]).tolist() == [False, False, True]
+    assert flowers.built_mask(["flower 3"]).tolist() == [False, False, False]
+
+
+def test_unnumbered_name_marks_one_unbuilt_example(flowers):
+    assert flowers.built_mask(["flower"]).tolist() == [True, False, False]
+    assert flowers.built_mask(["flower", "Flowr"]).tolist() == [True, False, True]
+    assert flowers.built_mask(["flower 1", "flower"]).tolist() == [True, False, True]
+    assert flowers.built_mask(["flower", "flower", "flower"]).tolist() == [True, False, True]
+
+
+def test_unrelated_or_empty_names_mark_nothing(flowers):
+    assert not flowers.built_mask(["boat", "", "!!"]).any()
+
+
+def test_candidates_skip_built_and_infeasible_objects():
+    inventory = {("triangle", "green"): 1, ("square", "red"): 1}
+    recipes = [
+        ("house", {("triangle", "green"): 1, ("square", "red"): 1}),
+        ("tower", {("square", "red"): 2}),
+        ("tree", {("triangle", "green"): 1}),
+        ("star", {("hexagon", "yellow"): 1}),
+    ]
+    shapes = ShapeInventory(inventory, recipes)
+
+    assert shapes.feasible_mask().tolist() == [True, False, True, False]
+    assert shapes.candidates([]) == ["house", "tree"]
+    assert shapes.candidates(["House"]) == ["tree"]
+    assert shapes.candidates_str(["house", "tree"]) is None
+
+
+def test_recipe_color_missing_from_the_set_uses_the_only_color_of_that_shape():
+    shapes = load_set(3)
+    # object_3.txt asks for an orange square; shape_3.txt has one red square
+    assert shapes.describe("rocket") == "rocket: 1 green triangle, 2 white rhombus, 1 red square"
+    assert shapes.feasible_mask().all()
+
+
+def test_database_sets_load_with_every_recipe_feasible():
+    for number in range(1, 9):
+        shapes = load_set(number)
+        assert shapes.names
+        assert shapes.recipes.shape == (len(shapes.names), len(shapes.pieces))
+        assert np.all(shapes.feasible_mask())
+
+
+def test_candidates_str_lists_pieces_in_the_order_of_the_shape_file():
+    shapes = load_set(1)
+    text = shapes.candidates_str(["pear fruit", "candy"], limit=2)
+    assert text == ("cat face: 1 yellow hexagon, 2 green triangle; "
+                    "apple: 2 red trapezoid, 1 green triangle;")
@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+from utils.task_2_corrections import CorrectionChecker, parse_error_list, tokenize
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASK_2_DIR = os.path.join(CODE_DIR, "database", "task_2")
+SETS = range(1, 9)
+
+
+def read_set(number):
+    texts = []
+    for kind in ("question", "answer", "error"):
+        with open(os.path.join(TASK_2_DIR, kind, f"{kind}_{number}.txt"), "r") as file:
+            texts.append(file.read())
+    return texts
+
+
+def statuses(result):
+    return {error["number"]: error["status"] for error in result["errors"]}
+
+
+@pytest.fixture(scope="module")
+def set_1():
+    question, answer, error_list = read_set(1)
+    return question, answer, CorrectionChecker(question, answer, error_list)
+
+
+def test_tokenize_keeps_contractions_whole():
+    assert tokenize("We don’t, can't.") == ["We", "don’t", ",", "can't", "."]
+
+
+def test_parse_error_list():
+    errors = parse_error_list(
+        '1.\tSpelling Error: "developement", position: first sentence  \n'
+        'not an error line\n'
+        '2.  Grammar Error: "has change"\n'
+    )
+    assert [error["number"] for error in errors] == [1, 2]
+    assert errors[0]["type"] == "Spelling Error"
+    assert errors[0]["text"] == "developement"
+    assert errors[0]["sentence"] == 0
+    assert errors[1]["position"] == "" and errors[1]["sentence"] is None
+
+
+@pytest.mark.parametrize("number", SETS)
+def test_answer_fixes_every_checkable_error(number):
+    question, answer, error_list = read_set(number)
+    result = CorrectionChecker(question, answer, error_list).check(answer)
+
+    assert result["score"] == 100.0
+    assert result["fixed"] == result["total"] > 0
+    assert result["introduced"] == 0
+    assert set(statuses(result).values()) <= {"fixed", "unchecked"}
+
+
+@pytest.mark.parametrize("number", SETS)
+def test_unchanged_question_fixes_nothing(number):
+    question, answer, error_list = read_set(number)
+    result = CorrectionChecker(question, answer, error_list).check(question)
+
+    assert result["score"] == 0.0
+    assert result["missed"] == result["total"]
+    assert result["introduced"] == 0
+    assert result["completion"] == 1.0
+    assert set(statuses(result).values()) <= {"missed", "unchecked"}
+
+
+def test_partial_correction(set_1):
+    question, _, checker = set_1
+    response = question.replace("developement", "development").replace("lifes", "lives")
+    result = checker.check(response)
+
+    assert (result["fixed"], result["total"]) == (2, 15)
+    assert statuses(result)[1] == statuses(result)[3] == "fixed"
+    assert statuses(result)[2] == "missed"
+
+
+def test_wrong_correction_is_attempted(set_1):
+    question, _, checker = set_1
+    result = checker.check(question.replace("has change", "has chance"))
+
+    error = next(error for error in result["errors"] if error["number"] == 2)
+    assert error["status"] == "attempted"
+    assert error["user_text"] == "has chance"
+
+
+def test_edit_outside_the_errors_is_introduced(set_1):
+    question, _, checker = set_1
+    result = checker.check(question.replace("many aspects", "few aspects"))
+
+    assert result["introduced"] == 1
+    assert result["introduced_edits"] == [{"original": "many", "changed": "few", "sentence": 0}]
+    assert "\"many\" changed to \"few\" (first sentence)" in checker.summarize(result)
+
+
+def test_unfinished_response_leaves_later_errors_not_reached(set_1):
+    question, answer, checker = set_1
+    first_sentences = answer[:answer.index("However")]
+    result = checker.check(first_sentences)
+
+    assert result["introduced"] == 0
+    assert 0 < result["completion"] < 1
+    assert all(statuses(result)[number] == "fixed" for number in range(1, 6))
+    assert statuses(result)[15] == "not_reached"
+
+
+def test_summary_does_not_give_away_corrections(set_1):
+    question, _, checker = set_1
+    summary = checker.summarize(checker.check(question))
+
+    assert summary.startswith("Listed errors: 15. Fixed: 0. Not fixed: 15.")
+    assert "developement" in summary
+    assert "development" not in summary
+
+
+def test_overview_counts_the_checkable_errors(set_1):
+    _, _, checker = set_1
+    assert checker.overview() == (
+        "15 errors across 5 types:\n"
+        "Spelling (5), Grammar (5), Word Choice (3), Punctuation (1), and Consistency (1)"
+    )
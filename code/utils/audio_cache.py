@@ -0,0 +1,253 @@
+"""
+Audio Cache Module
+Content-addressed cache of synthesized speech (in-memory LRU + size-capped SQLite store)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config.config import (
+    TTS_CACHE_ENABLED, TTS_CACHE_PATH, TTS_CACHE_MAX_BYTES, TTS_CACHE_MEMORY_ENTRIES
+)
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """
+    Get the process-wide audio cache
+
+    Returns:
+        AudioCache: Shared cache instance
+        None: If TTS_CACHE_ENABLED is False
+    """
+    global _shared_cache
+
+    if not TTS_CACHE_ENABLED:
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = AudioCache(TTS_CACHE_PATH, TTS_CACHE_MAX_BYTES, TTS_CACHE_MEMORY_ENTRIES)
+        return _shared_cache
+
+
+def normalize_text(text):
+    """
+    Normalize an utterance so trivially different strings share an entry
+
+    Args:
+        text (str): Text to synthesize
+
+    Returns:
+        str: Text with typographic quotes replaced and whitespace collapsed
+    """
+    text = text.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+    return " ".join(text.split())
+
+
+class AudioCache:
+    """
+    Caches synthesized audio keyed by everything that determines the sound
+
+    Entries are the encoded bytes returned by the engine. The disk tier is
+    trimmed to max_bytes by evicting the least recently played entries;
+    synthesis is deterministic, so entries do not expire.
+
+    Memory hits update the disk tier's last_access in batches (at the next put,
+    disk hit or every TOUCH_BATCH_SIZE memory hits), as in ResponseCache.
+    """
+
+    TOUCH_BATCH_SIZE = 32
+
+    def __init__(self, db_path, max_bytes, memory_entries):
+        """
+        Initialize the cache and create the SQLite table if needed
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            max_bytes (int): Maximum total audio size on disk
+            memory_entries (int): Maximum entries in the in-memory LRU tier
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+
+        self.memory = OrderedDict()
+        self.touched = {}
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS audio ("
+            "key TEXT PRIMARY KEY, audio BLOB NOT NULL, size INTEGER NOT NULL, "
+            "text TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(engine, voice, language, encoding, text):
+        """
+        Build a cache key from the synthesis inputs
+
+        Args:
+            engine (str): TTS engine name
+            voice (str): Voice name
+            language (str): Language code
+            encoding (str): Audio encoding of the stored bytes
+            text (str): Text to synthesize (normalized here)
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in (engine, voice, language, encoding, normalize_text(text)):
+            part = (part or "").encode('utf-8')
+            # Length prefix keeps ("ab", "c") and ("a", "bc") distinct
+            digest.update(str(len(part)).encode('ascii') + b":")
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Look up cached audio
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            bytes: Cached audio
+            None: On a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                # Disk eviction orders by last_access, so hot entries must be touched there too
+                self.touched[key] = now
+                if len(self.touched) >= self.TOUCH_BATCH_SIZE:
+                    self._write_touched()
+                    self.connection.commit()
+                return audio
+
+            row = self.connection.execute("SELECT audio FROM audio WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            audio = bytes(row[0])
+            self.touched[key] = now
+            self._write_touched()
+            self.connection.commit()
+            self._remember(key, audio)
+            self.hits += 1
+            return audio
+
+    def contains(self, key):
+        """
+        Check for an entry without counting a lookup
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            bool: True if the audio is cached
+        """
+        with self._lock:
+            if key in self.memory:
+                return True
+            return self.connection.execute("SELECT 1 FROM audio WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, key, audio, text=""):
+        """
+        Store audio in both tiers
+
+        Args:
+            key (str): Cache key from make_key
+            audio (bytes): Encoded audio
+            text (str): Utterance, stored for inspection
+        """
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, audio)
+            self._write_touched()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO audio (key, audio, size, text, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(audio), len(audio), normalize_text(text), now, now)
+            )
+            self._evict_disk()
+            self.connection.commit()
+
+    def _remember(self, key, audio):
+        """Insert into the in-memory tier, evicting the least recently used entry"""
+        self.memory[key] = audio
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _write_touched(self):
+        """Write the pending last_access updates of memory hits to the disk tier"""
+        if self.touched:
+            self.connection.executemany(
+                "UPDATE audio SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self.touched.items()]
+            )
+            self.touched.clear()
+
+    def _evict_disk(self):
+        """Trim the disk tier to max_bytes, least recently played first"""
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.connection.execute("SELECT key, size FROM audio ORDER BY last_access ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+            self.memory.pop(key, None)
+
+        self.connection.executemany("DELETE FROM audio WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def stats(self):
+        """
+        Get hit/miss counters and the disk size
+
+        Returns:
+            dict: hits, memory_hits, misses, evictions, hit_rate, entries and bytes
+        """
+        with self._lock:
+            entries, total = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM audio"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": total
+            }
@@ -0,0 +1,263 @@
+"""
+Audio Output Module
+Decodes synthesized speech in memory and plays it on one persistent output stream
+"""
+
+import io
+import threading
+import time
+import wave
+import miniaudio
+import numpy as np
+import sounddevice
+from config.config import AUDIO_SAMPLE_RATE, AUDIO_OUTPUT_DEVICE, AUDIO_OUTPUT_LATENCY
+
+# Encodings accepted by decode(): MP3 (gTTS), LINEAR16 (WAV from Google Cloud TTS), raw int16 PCM
+AUDIO_ENCODINGS = ("mp3", "linear16", "pcm")
+
+# Samples quieter than this (int16 amplitude) count as silence when trimming chunk edges
+SILENCE_THRESHOLD = 200
+
+# Interruptible writes hand the stream this much audio at a time
+WRITE_BLOCK_SECONDS = 0.1
+
+_shared_output = None
+_shared_output_lock = threading.Lock()
+
+
+def get_audio_output():
+    """
+    Get the process-wide audio output so every utterance uses the same stream
+
+    Returns:
+        AudioOutput: Shared audio output
+    """
+    global _shared_output
+
+    with _shared_output_lock:
+        if _shared_output is None:
+            _shared_output = AudioOutput(AUDIO_SAMPLE_RATE, AUDIO_OUTPUT_DEVICE, AUDIO_OUTPUT_LATENCY)
+        return _shared_output
+
+
+class AudioOutput:
+    """
+    Persistent mono 16-bit output stream
+
+    Audio is decoded to PCM at the stream's sample rate in memory (no temp
+    files) and written to a stream that is opened once, so an utterance does
+    not pay for a file write, a reopen and a player start-up. Writes are
+    serialized, so concurrent callers queue instead of overlapping; hold
+    exclusive() to keep a multi-chunk utterance together.
+    """
+
+    def __init__(self, sample_rate=24000, device=None, latency="low"):
+        """
+        Initialize the output (the stream is opened on first use)
+
+        Args:
+            sample_rate (int): Stream sample rate in Hz; all audio is converted to it
+            device (int or str): sounddevice output device, None for the default
+            latency (str or float): sounddevice latency ("low", "high" or seconds)
+        """
+        self.sample_rate = sample_rate
+        self.device = device
+        self.latency = latency
+        self.stream = None
+        self._stream_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+
+    def open(self):
+        """
+        Open and start the output stream if it is not open yet
+
+        Call at start-up to take the device opening off the first utterance.
+
+        Raises:
+            Exception: If the output device cannot be opened
+        """
+        with self._stream_lock:
+            if self.stream is not None:
+                return
+            try:
+                self.stream = sounddevice.RawOutputStream(
+                    samplerate=self.sample_rate,
+                    channels=1,
+                    dtype="int16",
+                    device=self.device,
+                    latency=self.latency
+                )
+                self.stream.start()
+                print(f"Debug log: Audio output open at {self.sample_rate} Hz "
+                      f"(latency {self.stream.latency * 1000:.0f} ms)")
+            except Exception as e:
+                self.stream = None
+                print(f"Audio output error: {e}")
+                raise e
+
+    def decode(self, audio_bytes, encoding, sample_rate=None):
+        """
+        Decode synthesized audio to mono int16 PCM at the stream's sample rate
+
+        Args:
+            audio_bytes (bytes): Encoded audio
+            encoding (str): "mp3", "linear16" (WAV) or "pcm" (raw mono int16)
+            sample_rate (int): Sample rate of "pcm" input (default: stream rate)
+
+        Returns:
+            bytes: PCM frames ready for write()
+
+        Raises:
+            ValueError: If the encoding is unknown or the WAV is not 16-bit
+        """
+        if encoding == "mp3":
+            decoded = miniaudio.decode(
+                audio_bytes,
+                output_format=miniaudio.SampleFormat.SIGNED16,
+                nchannels=1,
+                sample_rate=self.sample_rate
+            )
+            return decoded.samples.tobytes()
+
+        if encoding == "linear16":
+            with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+                if wav.getsampwidth() != 2:
+                    raise ValueError(f"Unsupported WAV sample width: {wav.getsampwidth()}")
+                return self._convert(wav.readframes(wav.getnframes()), wav.getnchannels(), wav.getframerate())
+
+        if encoding == "pcm":
+            return self._convert(audio_bytes, 1, sample_rate or self.sample_rate)
+
+        raise ValueError(f"Unknown audio encoding: {encoding}")
+
+    def _convert(self, pcm, channels, sample_rate):
+        """
+        Convert int16 PCM to mono at the stream's sample rate
+
+        Args:
+            pcm (bytes): Interleaved int16 frames
+            channels (int): Number of channels
+            sample_rate (int): Sample rate in Hz
+
+        Returns:
+            bytes: Mono int16 frames at the stream rate
+        """
+        if channels == 1 and sample_rate == self.sample_rate:
+            return bytes(pcm)
+        return bytes(miniaudio.convert_frames(
+            miniaudio.SampleFormat.SIGNED16, channels, sample_rate, pcm,
+            miniaudio.SampleFormat.SIGNED16, 1, self.sample_rate
+        ))
+
+    def trim_silence(self, pcm, keep=0.05):
+        """
+        Cut the leading and trailing silence engines pad audio with
+
+        Used to join chunks of one utterance without audible gaps.
+
+        Args:
+            pcm (bytes): Output of decode()
+            keep (float): Seconds of silence to keep at each end (a natural pause)
+
+        Returns:
+            bytes: Trimmed PCM (unchanged if it is all silence)
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        loud = np.flatnonzero(np.abs(samples.astype(np.int32)) > SILENCE_THRESHOLD)
+        if loud.size == 0:
+            return pcm
+
+        margin = int(keep * self.sample_rate)
+        start = max(0, loud[0] - margin)
+        end = min(samples.size, loud[-1] + 1 + margin)
+        return samples[start:end].tobytes()
+
+    def duration(self, pcm):
+        """
+        Playing time of decoded PCM
+
+        Args:
+            pcm (bytes): Output of decode()
+
+        Returns:
+            float: Seconds
+        """
+        return len(pcm) / 2 / self.sample_rate
+
+    def write(self, pcm, stop_event=None):
+        """
+        Queue decoded PCM on the stream
+
+        Blocks until the frames are in the stream's buffer, so consecutive
+        writes play back to back without a gap. With a stop_event the audio is
+        written in WRITE_BLOCK_SECONDS blocks and the write ends early once the
+        event is set.
+
+        Args:
+            pcm (bytes): Output of decode()
+            stop_event (threading.Event): Optional event that interrupts playback
+
+        Returns:
+            bool: False if playback was interrupted
+
+        Raises:
+            Exception: If the output device fails
+        """
+        self.open()
+        with self._write_lock:
+            if stop_event is None:
+                self.stream.write(pcm)
+                return True
+
+            block_size = int(WRITE_BLOCK_SECONDS * self.sample_rate) * 2
+            for offset in range(0, len(pcm), block_size):
+                if stop_event.is_set():
+                    return False
+                self.stream.write(pcm[offset:offset + block_size])
+            return not stop_event.is_set()
+
+    def exclusive(self):
+        """
+        Lock that keeps other writers out while held (reentrant)
+
+        Returns:
+            threading.RLock: Use as "with audio_output.exclusive(): ..."
+        """
+        return self._write_lock
+
+    def drain(self):
+        """Wait until the audio already written has been heard"""
+        if self.stream is not None:
+            time.sleep(self.stream.latency)
+
+    def play(self, audio_bytes, encoding, sample_rate=None):
+        """
+        Decode and play audio, returning once it has been heard
+
+        Args:
+            audio_bytes (bytes): Encoded audio
+            encoding (str): "mp3", "linear16" or "pcm"
+            sample_rate (int): Sample rate of "pcm" input
+
+        Returns:
+            float: Playing time in seconds
+
+        Raises:
+            Exception: If decoding or playback fails
+        """
+        pcm = self.decode(audio_bytes, encoding, sample_rate)
+        self.write(pcm)
+        self.drain()
+        return self.duration(pcm)
+
+    def close(self):
+        """Stop and close the output stream"""
+        with self._stream_lock:
+            if self.stream is None:
+                return
+            try:
+                self.stream.stop()
+                self.stream.close()
+            except Exception as e:
+                print(f"Error closing audio output: {e}")
+            self.stream = None
@@ -0,0 +1,252 @@
+"""
+Feedback Backends Module
+Pluggable generators that answer selected feedback levels locally instead of calling OpenAI
+"""
+
+import itertools
+import json
+import os
+import random
+import string
+import threading
+from abc import ABC, abstractmethod
+from config.config import LOCAL_FEEDBACK_BACKEND, LOCAL_FEEDBACK_LEVELS, PHRASE_BANK_HISTORY_PATH
+from utils.llm_metrics import CallTimer, call_context
+from utils.sentence_stream import split_sentences
+
+
+def create_local_backend(task_id):
+    """
+    Create the configured local backend for a task
+
+    Args:
+        task_id (str): Task ID ("task_1" or "task_2")
+
+    Returns:
+        FeedbackBackend: Backend answering LOCAL_FEEDBACK_LEVELS
+        None: If no level is answered locally
+
+    Raises:
+        ValueError: If the configured backend is unknown
+    """
+    if not LOCAL_FEEDBACK_LEVELS:
+        return None
+
+    backend_class = FEEDBACK_BACKENDS.get(LOCAL_FEEDBACK_BACKEND)
+    if backend_class is None:
+        raise ValueError(f"Unknown local feedback backend: {LOCAL_FEEDBACK_BACKEND}")
+
+    return backend_class(task_id, LOCAL_FEEDBACK_LEVELS)
+
+
+class LocalFeedbackMixin:
+    """
+    Routes feedback levels to the local backend in the LLM handlers
+
+    The handler sets self.local_backend (from create_local_backend) and
+    self.call_log before using these methods.
+    """
+
+    def uses_local_backend(self, feedback_level):
+        """
+        Check whether a feedback level is answered without a network call
+
+        Args:
+            feedback_level (str): Feedback level
+
+        Returns:
+            bool: True if the local backend answers this level
+        """
+        return self.local_backend is not None and self.local_backend.supports(feedback_level)
+
+    def _generate_local_feedback(self, feedback_level, subject_id=None, on_sentence=None):
+        """
+        Answer a feedback level with the local backend (no network call)
+
+        Args:
+            feedback_level (str): Feedback level
+            subject_id (str): Participant ID, so the feedback is not repeated
+            on_sentence (callable): Receives each sentence of the feedback
+
+        Returns:
+            str: Feedback text
+        """
+        with call_context(feedback_level=feedback_level):
+            timer = CallTimer(self.local_backend.name, "local")
+            feedback = self.local_backend.generate(feedback_level, subject_id)
+            self.call_log.add(timer.finish())
+
+        if on_sentence is not None:
+            for sentence in split_sentences(feedback):
+                on_sentence(sentence)
+
+        return feedback
+
+
+class FeedbackBackend(ABC):
+    """
+    Interface of a local feedback generator
+
+    Subclasses implement generate(); the LLM handlers route a feedback level to
+    the backend when supports() is True and to OpenAI otherwise.
+    """
+
+    name = "base"
+
+    def __init__(self, task_id, feedback_levels):
+        """
+        Initialize the backend
+
+        Args:
+            task_id (str): Task ID
+            feedback_levels (list): Feedback levels this backend answers
+        """
+        self.task_id = task_id
+        self.feedback_levels = set(feedback_levels)
+
+    def supports(self, feedback_level):
+        """
+        Check whether a feedback level is answered by this backend
+
+        Args:
+            feedback_level (str): Feedback level
+
+        Returns:
+            bool: True if generate() should be used for this level
+        """
+        return feedback_level in self.feedback_levels
+
+    @abstractmethod
+    def generate(self, feedback_level, subject_id=None):
+        """
+        Generate feedback
+
+        Args:
+            feedback_level (str): Feedback level
+            subject_id (str): Participant ID, used to avoid repeating feedback
+
+        Returns:
+            str: Feedback text
+        """
+
+
+class PhraseBankBackend(FeedbackBackend):
+    """
+    Composes F_2/F_3 feedback from the curated phrase bank in prompts/<task>/phrase_bank.json
+
+    Each level has a template and lists of interchangeable parts. A participant
+    never gets the same combination twice, and parts they have already heard are
+    avoided while fresh ones remain. The history is kept on disk because every
+    session runs in its own process.
+    """
+
+    name = "phrase_bank"
+
+    def __init__(self, task_id, feedback_levels, history_path=PHRASE_BANK_HISTORY_PATH):
+        """
+        Load the phrase bank and the participants' history
+
+        Args:
+            task_id (str): Task ID
+            feedback_levels (list): Feedback levels this backend answers
+            history_path (str): JSON file with the combinations each participant has heard
+
+        Raises:
+            ValueError: If an answered level has no phrase-bank entry
+        """
+        super().__init__(task_id, feedback_levels)
+        self.history_path = history_path
+        self.random = random.Random()
+        self._lock = threading.Lock()
+
+        with open(f"prompts/{task_id}/phrase_bank.json", "r") as file:
+            self.bank = json.load(file)
+
+        missing = sorted(self.feedback_levels - set(self.bank))
+        if missing:
+            raise ValueError(f"Phrase bank for {task_id} has no entries for: {', '.join(missing)}")
+
+        # Parts in template order, e.g. ["opener", "action", "closer"]
+        self.parts = {
+            level: [name for _, name, _, _ in string.Formatter().parse(entry["template"]) if name]
+            for level, entry in self.bank.items()
+        }
+        self.history = self._load_history()
+
+    def _load_history(self):
+        """Load {subject_id: {level: [combination, ...]}} for this task"""
+        if not self.history_path or not os.path.exists(self.history_path):
+            return {}
+        try:
+            with open(self.history_path, "r") as file:
+                return json.load(file).get(self.task_id, {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read phrase history {self.history_path}: {e}")
+            return {}
+
+    def _save_history(self):
+        """Write the history of this task back to disk (atomically)"""
+        if not self.history_path:
+            return
+
+        all_history = {}
+        if os.path.exists(self.history_path):
+            try:
+                with open(self.history_path, "r") as file:
+                    all_history = json.load(file)
+            except (OSError, ValueError):
+                all_history = {}
+        all_history[self.task_id] = self.history
+
+        directory = os.path.dirname(self.history_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.history_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(all_history, file, indent=4)
+        os.replace(temp_path, self.history_path)
+
+    def generate(self, feedback_level, subject_id=None):
+        """
+        Compose feedback the participant has not heard before
+
+        Args:
+            feedback_level (str): Feedback level (F_2 or F_3)
+            subject_id (str): Participant ID; without it nothing is remembered
+
+        Returns:
+            str: Feedback text
+        """
+        entry = self.bank[feedback_level]
+        parts = self.parts[feedback_level]
+
+        with self._lock:
+            used = self.history.get(subject_id, {}).get(feedback_level, []) if subject_id else []
+            used_combinations = {tuple(combination) for combination in used}
+
+            all_combinations = list(itertools.product(*(range(len(entry[part])) for part in parts)))
+            unused = [c for c in all_combinations if c not in used_combinations]
+            if not unused:
+                # Bank exhausted for this participant - start over
+                used = []
+                unused = all_combinations
+
+            # Controlled variation: prefer combinations whose parts are all new to the participant
+            used_parts = [{combination[i] for combination in used} for i in range(len(parts))]
+            fresh = [c for c in unused if all(c[i] not in used_parts[i] for i in range(len(parts)))]
+            combination = self.random.choice(fresh or unused)
+
+            if subject_id:
+                self.history.setdefault(subject_id, {})[feedback_level] = used + [list(combination)]
+                try:
+                    self._save_history()
+                except OSError as e:
+                    print(f"Warning: Could not save phrase history: {e}")
+
+        return entry["template"].format(**{part: entry[part][index] for part, index in zip(parts, combination)})
+
+
+# Available local backends (LOCAL_FEEDBACK_BACKEND)
+FEEDBACK_BACKENDS = {
+    PhraseBankBackend.name: PhraseBankBackend,
+}
@@ -0,0 +1,98 @@
+"""
+Feedback Worker Module
+Runs the LLM -> delivery -> persist pipeline off the Qt main thread
+"""
+
+import threading
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class FeedbackCancelled(Exception):
+    """Raised inside the pipeline when the worker has been cancelled"""
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by FeedbackWorker (delivered on the GUI thread)"""
+
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(str, str)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class FeedbackWorker(QRunnable):
+    """
+    Runs feedback generation, agent delivery and data saving in a QThreadPool
+
+    The three stages are plain callables supplied by the UI, so the worker
+    never touches widgets. Any widget state the stages need must be read on
+    the GUI thread before the worker is started.
+    """
+
+    def __init__(self, generate_fn, deliver_fn, persist_fn, cleanup_fn=None):
+        """
+        Initialize the worker
+
+        Args:
+            generate_fn (callable): generate_fn(worker) -> feedback text
+            deliver_fn (callable): deliver_fn(feedback_text, worker)
+            persist_fn (callable): persist_fn(feedback_text) -> status message
+            cleanup_fn (callable): Optional cleanup_fn(), always called when the pipeline ends
+        """
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.generate_fn = generate_fn
+        self.deliver_fn = deliver_fn
+        self.persist_fn = persist_fn
+        self.cleanup_fn = cleanup_fn
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; the pipeline stops at the next stage boundary"""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        """
+        Check whether cancellation has been requested
+
+        Returns:
+            bool: True if cancel() was called
+        """
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """
+        Raise FeedbackCancelled if cancellation has been requested
+
+        Raises:
+            FeedbackCancelled: If cancel() was called
+        """
+        if self.is_cancelled():
+            raise FeedbackCancelled()
+
+    def run(self):
+        """Execute the pipeline (called by QThreadPool)"""
+        try:
+            self.signals.progress.emit("Generating feedback...")
+            feedback_text = self.generate_fn(self)
+            self.check_cancelled()
+
+            self.signals.progress.emit("Delivering feedback...")
+            self.deliver_fn(feedback_text, self)
+            self.check_cancelled()
+
+            # Persisting is not interruptible so a delivered feedback is always saved
+            self.signals.progress.emit("Saving response...")
+            message = self.persist_fn(feedback_text)
+
+            self.signals.finished.emit(feedback_text, message)
+
+        except FeedbackCancelled:
+            print("Debug log: Feedback pipeline cancelled")
+            self.signals.cancelled.emit()
+        except Exception as e:
+            print(f"Feedback pipeline error: {e}")
+            self.signals.failed.emit(str(e))
+        finally:
+            if self.cleanup_fn is not None:
+                self.cleanup_fn()
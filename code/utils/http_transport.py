@@ -0,0 +1,227 @@
+"""
+HTTP Transport Module
+Shared keep-alive HTTP client for OpenAI chat-completion requests (used by both tasks)
+"""
+
+import json
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from config.config import (
+    OPENAI_API_KEY, OPENAI_BASE_URL, HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+    HTTP_MAX_RETRIES, HTTP_RETRY_BACKOFF_BASE, HTTP_RETRY_BACKOFF_MAX
+)
+
+# Status codes worth retrying (rate limit and transient server errors)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_shared_transport = None
+_shared_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """
+    Get the process-wide transport so both handlers share one connection pool
+
+    Returns:
+        OpenAITransport: Shared transport instance
+    """
+    global _shared_transport
+
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = OpenAITransport(
+                OPENAI_BASE_URL, OPENAI_API_KEY,
+                connect_timeout=HTTP_CONNECT_TIMEOUT,
+                read_timeout=HTTP_READ_TIMEOUT,
+                max_retries=HTTP_MAX_RETRIES,
+                backoff_base=HTTP_RETRY_BACKOFF_BASE,
+                backoff_max=HTTP_RETRY_BACKOFF_MAX,
+                pool_size=HTTP_POOL_SIZE
+            )
+        return _shared_transport
+
+
+class OpenAITransport:
+    """Pooled requests.Session with timeouts and jittered retries for the chat-completions API"""
+
+    def __init__(self, base_url, api_key, connect_timeout=5, read_timeout=30, max_retries=2,
+                 backoff_base=0.5, backoff_max=4, pool_size=4):
+        """
+        Initialize the session and connection pool
+
+        Args:
+            base_url (str): API base URL, e.g. "https://api.openai.com/v1"
+            api_key (str): Bearer token
+            connect_timeout (float): Seconds to wait for the TCP/TLS connection
+            read_timeout (float): Seconds to wait between bytes of the response
+            max_retries (int): Retries after the first attempt
+            backoff_base (float): Base delay for exponential backoff in seconds
+            backoff_max (float): Upper bound for a single backoff delay in seconds
+            pool_size (int): Keep-alive connections kept per host
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        })
+
+        # Retries are handled here (with jitter), not by urllib3
+        self.adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self.request_count = 0
+        self.retry_count = 0
+        self._lock = threading.Lock()
+
+    def post_chat_completion(self, payload, stream=False):
+        """
+        POST a chat-completion request, retrying transient failures
+
+        Args:
+            payload (dict): Request body
+            stream (bool): Keep the response open for server-sent events
+
+        Returns:
+            requests.Response: Successful response; response.retry_count holds the
+                               number of retries it took
+
+        Raises:
+            Exception: If the request still fails after all retries
+        """
+        url = f"{self.base_url}/chat/completions"
+        attempt = 0
+
+        while True:
+            retry_after = None
+            try:
+                with self._lock:
+                    self.request_count += 1
+                response = self.session.post(url, json=payload, stream=stream, timeout=self.timeout)
+
+                if response.status_code == 200:
+                    response.retry_count = attempt
+                    return response
+
+                error = Exception(f"API request failed with status code {response.status_code}: {response.text}")
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise error
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt >= self.max_retries:
+                raise error
+
+            delay = self._backoff_delay(attempt, retry_after)
+            attempt += 1
+            with self._lock:
+                self.retry_count += 1
+            print(f"Debug log: Retrying OpenAI request in {delay:.2f}s ({error})")
+            time.sleep(delay)
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """
+        Compute a full-jitter exponential backoff delay
+
+        Args:
+            attempt (int): Zero-based attempt number that just failed
+            retry_after (str): Optional Retry-After header value in seconds
+
+        Returns:
+            float: Delay in seconds
+        """
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def create_chat_completion(self, payload):
+        """
+        Make a non-streaming chat-completion request
+
+        Args:
+            payload (dict): Request body
+
+        Returns:
+            dict: Parsed JSON response; "_retry_count" holds the number of retries
+        """
+        response = self.post_chat_completion(payload)
+        data = response.json()
+        data["_retry_count"] = response.retry_count
+        return data
+
+    def stream_chat_completion(self, payload, stream_info=None):
+        """
+        Make a streaming chat-completion request and yield text deltas
+
+        Args:
+            payload (dict): Request body ("stream" is set automatically)
+            stream_info (dict): Optional dict filled with "retry_count" and, once the
+                                stream ends, the final "usage" block
+
+        Yields:
+            str: Content deltas in order
+        """
+        payload = dict(payload, stream=True, stream_options={"include_usage": True})
+        response = self.post_chat_completion(payload, stream=True)
+        if stream_info is not None:
+            stream_info["retry_count"] = response.retry_count
+
+        # SSE is always UTF-8; without a charset requests would decode it as ISO-8859-1
+        response.encoding = "utf-8"
+
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                event = json.loads(data)
+                if event.get("usage") and stream_info is not None:
+                    stream_info["usage"] = event["usage"]
+                if not event.get("choices"):
+                    continue
+                delta = event["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+        finally:
+            response.close()
+
+    def stats(self):
+        """
+        Get connection-reuse statistics
+
+        Returns:
+            dict: requests, retries, connections_opened and connections_reused
+        """
+        connections_opened = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections_opened += pool.num_connections
+
+        with self._lock:
+            return {
+                "requests": self.request_count,
+                "retries": self.retry_count,
+                "connections_opened": connections_opened,
+                "connections_reused": max(0, self.request_count - connections_opened)
+            }
@@ -0,0 +1,146 @@
+"""
+Image Payload Cache Module
+Encodes Task 1 question images for the vision API once instead of on every request
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from PIL import Image
+
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+class ImagePayloadCache:
+    """
+    Caches base64 data URLs for question images
+
+    Entries are kept in memory per process, keyed by path, modification time
+    and size. When a sidecar directory is configured the encoded payload is
+    also written there, keyed by the image's content hash and the encoding
+    settings, so later sessions skip the encoding entirely.
+    """
+
+    def __init__(self, max_side=None, image_format="PNG", quality=85, sidecar_dir=None):
+        """
+        Initialize ImagePayloadCache
+
+        Args:
+            max_side (int): Downscale so the longest side is at most this many pixels (None keeps size)
+            image_format (str): PNG, JPEG or WEBP
+            quality (int): Encoder quality for JPEG and WEBP
+            sidecar_dir (str): Directory for precomputed payloads (None disables sidecar files)
+
+        Raises:
+            ValueError: If image_format is not supported
+        """
+        image_format = image_format.upper()
+        if image_format not in MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {image_format}")
+
+        self.max_side = max_side
+        self.image_format = image_format
+        self.quality = quality
+        self.sidecar_dir = sidecar_dir
+        self.payloads = {}
+        self._lock = threading.Lock()
+
+    def get_data_url(self, image_path):
+        """
+        Get the data URL for an image, encoding it only on first use
+
+        Args:
+            image_path (str): Path to the image file
+
+        Returns:
+            str: "data:<mime>;base64,<payload>"
+
+        Raises:
+            ValueError: If the image cannot be loaded
+        """
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            raise ValueError(f"Failed to load image from {image_path}")
+
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            data_url = self.payloads.get(key)
+        if data_url is not None:
+            return data_url
+
+        with open(image_path, 'rb') as file:
+            image_bytes = file.read()
+
+        data_url = self._load_sidecar(image_bytes)
+        if data_url is None:
+            data_url = self._encode(image_bytes, image_path)
+            self._save_sidecar(image_bytes, data_url)
+
+        with self._lock:
+            self.payloads[key] = data_url
+        return data_url
+
+    def _encode(self, image_bytes, image_path):
+        """
+        Convert, optionally downscale, and re-encode an image
+
+        Args:
+            image_bytes (bytes): Raw file content
+            image_path (str): Path used in error messages
+
+        Returns:
+            str: Data URL
+        """
+        try:
+            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+        except Exception:
+            raise ValueError(f"Failed to load image from {image_path}")
+
+        if self.max_side and max(image.size) > self.max_side:
+            image.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+
+        buffered = io.BytesIO()
+        if self.image_format == "PNG":
+            image.save(buffered, format="PNG", optimize=True)
+        else:
+            image.save(buffered, format=self.image_format, quality=self.quality)
+
+        payload = base64.b64encode(buffered.getvalue()).decode('utf-8')
+        print(f"Debug log: Encoded {image_path} ({len(payload)} base64 chars)")
+        return f"data:{MIME_TYPES[self.image_format]};base64,{payload}"
+
+    def _sidecar_path(self, image_bytes):
+        """Path of the sidecar file for this content and these encoding settings"""
+        content_hash = hashlib.sha256(image_bytes).hexdigest()[:32]
+        settings = f"{self.image_format.lower()}_{self.max_side or 'full'}_q{self.quality}"
+        return os.path.join(self.sidecar_dir, f"{content_hash}_{settings}.txt")
+
+    def _load_sidecar(self, image_bytes):
+        """Read a precomputed data URL, or None"""
+        if not self.sidecar_dir:
+            return None
+
+        sidecar_path = self._sidecar_path(image_bytes)
+        if not os.path.exists(sidecar_path):
+            return None
+
+        with open(sidecar_path, 'r') as file:
+            return file.read()
+
+    def _save_sidecar(self, image_bytes, data_url):
+        """Write a data URL next to the others so later sessions can reuse it"""
+        if not self.sidecar_dir:
+            return
+
+        try:
+            os.makedirs(self.sidecar_dir, exist_ok=True)
+            sidecar_path = self._sidecar_path(image_bytes)
+            temp_path = sidecar_path + ".tmp"
+            with open(temp_path, 'w') as file:
+                file.write(data_url)
+            os.replace(temp_path, sidecar_path)
+        except OSError as e:
+            print(f"Image sidecar write error: {e}")
@@ -0,0 +1,188 @@
+"""
+LLM Metrics Module
+Structured per-call latency, token and cost records for LLM requests
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from config.config import LLM_PRICES_PER_MILLION_TOKENS
+
+_context = threading.local()
+
+
+@contextmanager
+def call_context(**fields):
+    """
+    Attach fields (e.g. feedback_level, purpose) to every call record made in this thread
+
+    Args:
+        **fields: Fields merged into the records created inside the block
+    """
+    previous = getattr(_context, "fields", {})
+    _context.fields = dict(previous, **fields)
+    try:
+        yield
+    finally:
+        _context.fields = previous
+
+
+def current_context():
+    """
+    Get the fields set by the enclosing call_context blocks
+
+    Returns:
+        dict: Context fields (copy)
+    """
+    return dict(getattr(_context, "fields", {}))
+
+
+def call_cost(model, prompt_tokens, cached_tokens, completion_tokens):
+    """
+    Price a call with LLM_PRICES_PER_MILLION_TOKENS
+
+    Args:
+        model (str): Model name
+        prompt_tokens (int): Prompt tokens, including the cached ones
+        cached_tokens (int): Prompt tokens served from the provider's prompt cache
+        completion_tokens (int): Completion tokens
+
+    Returns:
+        float: Cost in USD
+        None: If the model has no price
+    """
+    prices = LLM_PRICES_PER_MILLION_TOKENS.get(model)
+    if prices is None:
+        return None
+
+    cost = ((prompt_tokens - cached_tokens) * prices["input"] + cached_tokens * prices["cached_input"]
+            + completion_tokens * prices["output"]) / 1_000_000
+    return round(cost, 8)
+
+
+class CallTimer:
+    """Measures one LLM request and builds its record"""
+
+    def __init__(self, model, stage, streamed=False):
+        """
+        Start timing a request
+
+        Args:
+            model (str): Model name
+            stage (str): Which call this is (e.g. "feedback", "f1_rewrite")
+            streamed (bool): Whether the completion is streamed
+        """
+        self.model = model
+        self.stage = stage
+        self.streamed = streamed
+        self.context = current_context()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.first_token_time = None
+        self.usage = None
+        self.retries = 0
+
+    def mark_first_token(self):
+        """Record the arrival of the first streamed token (later calls are ignored)"""
+        if self.first_token_time is None:
+            self.first_token_time = time.perf_counter() - self.start
+
+    def finish(self, cache_hit=False, error=None):
+        """
+        Stop timing and build the call record
+
+        Args:
+            cache_hit (bool): Whether the response came from the local response cache
+            error (Exception): Error raised by the request, if any
+
+        Returns:
+            dict: Call record
+        """
+        wall_time = time.perf_counter() - self.start
+        usage = self.usage or {}
+        prompt_details = usage.get("prompt_tokens_details") or {}
+
+        record = {
+            "stage": self.stage,
+            "model": self.model,
+            "started_at": self.started_at,
+            "wall_time_s": round(wall_time, 4),
+            # Without streaming the first token arrives with the full response
+            "time_to_first_token_s": round(self.first_token_time if self.first_token_time is not None
+                                           else wall_time, 4),
+            "streamed": self.streamed,
+            "cache_hit": cache_hit,
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+            "cached_tokens": prompt_details.get("cached_tokens", 0),
+            "cost_usd": call_cost(self.model, usage.get("prompt_tokens", 0), prompt_details.get("cached_tokens", 0),
+                                  usage.get("completion_tokens", 0)),
+            "retries": self.retries,
+            "error": str(error) if error is not None else None
+        }
+        record.update(self.context)
+        return record
+
+
+class LLMCallLog:
+    """Thread-safe list of call records collected until the session data is saved"""
+
+    def __init__(self):
+        """Initialize an empty log"""
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        """
+        Append a call record and print a one-line summary
+
+        Args:
+            record (dict): Record from CallTimer.finish
+        """
+        with self._lock:
+            self.records.append(record)
+
+        cost = "-" if record.get("cost_usd") is None else f"${record['cost_usd']:.6f}"
+        print(f"Debug log: LLM call {record['stage']} ({record.get('feedback_level', '-')}): "
+              f"{record['wall_time_s']:.2f}s, ttft {record['time_to_first_token_s']:.2f}s, "
+              f"tokens {record['prompt_tokens']}+{record['completion_tokens']} "
+              f"(cached {record['cached_tokens']}), cost {cost}, retries {record['retries']}"
+              f"{', cache hit' if record['cache_hit'] else ''}")
+
+    def drain(self):
+        """
+        Return and clear all collected records
+
+        Returns:
+            list: Call records in arrival order
+        """
+        with self._lock:
+            records = self.records
+            self.records = []
+        return records
+
+
+def summarize_calls(records):
+    """
+    Aggregate call records
+
+    Args:
+        records (list): Call records
+
+    Returns:
+        dict: Call count, total wall time, token totals, cost_usd (calls priced with
+              LLM_PRICES_PER_MILLION_TOKENS) and unpriced_calls (calls to models without a price)
+    """
+    costs = [call_cost(r["model"], r["prompt_tokens"], r["cached_tokens"], r["completion_tokens"])
+             for r in records]
+    return {
+        "calls": len(records),
+        "wall_time_s": round(sum(r["wall_time_s"] for r in records), 4),
+        "prompt_tokens": sum(r["prompt_tokens"] for r in records),
+        "completion_tokens": sum(r["completion_tokens"] for r in records),
+        "cached_tokens": sum(r["cached_tokens"] for r in records),
+        "cost_usd": round(sum(cost for cost in costs if cost is not None), 6),
+        "unpriced_calls": sum(1 for cost in costs if cost is None),
+        "retries": sum(r["retries"] for r in records)
+    }
@@ -0,0 +1,192 @@
+"""
+Prompt Registry Module
+Loads prompt templates once, validates their placeholders and serves them from memory
+"""
+
+import os
+import string
+import threading
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_prompt_registry(prompts_dir, expected_fields=None):
+    """
+    Get the shared registry for a prompts directory, creating it on first use
+
+    Args:
+        prompts_dir (str): Directory containing the .txt templates
+        expected_fields (dict): Template name -> set of format arguments it is rendered with
+
+    Returns:
+        PromptRegistry: Loaded and validated registry
+
+    Raises:
+        ValueError: If a template uses placeholders that are not supplied
+    """
+    with _registries_lock:
+        registry = _registries.get(prompts_dir)
+        if registry is None:
+            registry = PromptRegistry(prompts_dir, expected_fields)
+            _registries[prompts_dir] = registry
+        return registry
+
+
+class PromptRegistry:
+    """In-memory store of prompt templates, reloaded only when a file's mtime changes"""
+
+    def __init__(self, prompts_dir, expected_fields=None):
+        """
+        Load and validate every template in the directory
+
+        Args:
+            prompts_dir (str): Directory containing the .txt templates
+            expected_fields (dict): Template name -> set of format arguments it is rendered with
+
+        Raises:
+            ValueError: If a template uses placeholders that are not supplied
+        """
+        self.prompts_dir = prompts_dir
+        self.expected_fields = expected_fields or {}
+        self.templates = {}
+        self._lock = threading.Lock()
+
+        self.load_all()
+
+    def load_all(self):
+        """
+        Load every .txt template in the prompts directory
+
+        Raises:
+            ValueError: If a template uses placeholders that are not supplied
+            FileNotFoundError: If an expected template is missing
+        """
+        if not os.path.isdir(self.prompts_dir):
+            raise FileNotFoundError(f"Prompt directory not found: {self.prompts_dir}")
+
+        for file_name in sorted(os.listdir(self.prompts_dir)):
+            if file_name.endswith(".txt"):
+                self._load(file_name[:-len(".txt")])
+
+        missing = sorted(set(self.expected_fields) - set(self.templates))
+        if missing:
+            raise FileNotFoundError(f"Prompt files not found in {self.prompts_dir}: {', '.join(missing)}")
+
+        print(f"Debug log: Loaded {len(self.templates)} prompt templates from {self.prompts_dir}")
+
+    def _load(self, prompt_name):
+        """
+        Read, parse and validate one template
+
+        Args:
+            prompt_name (str): Template name (file name without .txt)
+
+        Raises:
+            ValueError: If the template is malformed or uses unsupplied placeholders
+        """
+        file_path = os.path.join(self.prompts_dir, f"{prompt_name}.txt")
+        mtime = os.stat(file_path).st_mtime_ns
+
+        with open(file_path, 'r') as file:
+            text = file.read()
+
+        fields = self._parse_fields(prompt_name, text)
+        self._validate(prompt_name, fields)
+
+        with self._lock:
+            self.templates[prompt_name] = (mtime, text, fields)
+
+    @staticmethod
+    def _parse_fields(prompt_name, text):
+        """
+        Collect the placeholder names used by a template
+
+        Args:
+            prompt_name (str): Template name used in error messages
+            text (str): Template text
+
+        Returns:
+            set: Placeholder names
+
+        Raises:
+            ValueError: If the template has unbalanced braces
+        """
+        try:
+            return {
+                field_name.split('.')[0].split('[')[0]
+                for _, field_name, _, _ in string.Formatter().parse(text)
+                if field_name
+            }
+        except ValueError as e:
+            raise ValueError(f"Malformed prompt template '{prompt_name}': {e}")
+
+    def _validate(self, prompt_name, fields):
+        """
+        Check a template's placeholders against the arguments it is rendered with
+
+        Args:
+            prompt_name (str): Template name
+            fields (set): Placeholders used by the template
+
+        Raises:
+            ValueError: If the template uses a placeholder that is never supplied
+        """
+        if prompt_name not in self.expected_fields:
+            return
+
+        expected = set(self.expected_fields[prompt_name])
+        unknown = fields - expected
+        if unknown:
+            raise ValueError(
+                f"Prompt template '{prompt_name}' uses unknown placeholders: {', '.join(sorted(unknown))}"
+            )
+
+        unused = expected - fields
+        if unused:
+            print(f"Warning: Prompt template '{prompt_name}' does not use: {', '.join(sorted(unused))}")
+
+    def get(self, prompt_name):
+        """
+        Get a template, reloading it only if the file changed on disk
+
+        Args:
+            prompt_name (str): Template name (file name without .txt)
+
+        Returns:
+            str: Template text
+
+        Raises:
+            FileNotFoundError: If the template does not exist
+        """
+        file_path = os.path.join(self.prompts_dir, f"{prompt_name}.txt")
+
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt file not found: {file_path}")
+
+        with self._lock:
+            entry = self.templates.get(prompt_name)
+
+        if entry is None or entry[0] != mtime:
+            print(f"Debug log: Reloading prompt template '{prompt_name}'")
+            self._load(prompt_name)
+            with self._lock:
+                entry = self.templates[prompt_name]
+
+        return entry[1]
+
+    def fields(self, prompt_name):
+        """
+        Get the placeholder names of a template
+
+        Args:
+            prompt_name (str): Template name
+
+        Returns:
+            set: Placeholder names
+        """
+        self.get(prompt_name)
+        with self._lock:
+            return set(self.templates[prompt_name][2])
@@ -0,0 +1,245 @@
+"""
+Request Policy Module
+Deadline-aware hedged execution of LLM feedback requests with a canned fallback
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config.config import (
+    LLM_REQUEST_POLICY_ENABLED, LLM_DEADLINE_SECONDS, LLM_HEDGE_PERCENTILE, LLM_HEDGE_INITIAL_DELAY_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES, LLM_MAX_HEDGES
+)
+from utils.llm_metrics import call_context, current_context
+from utils.sentence_stream import split_sentences
+
+
+def create_request_policy():
+    """
+    Create a policy from the config settings
+
+    Each handler gets its own policy so Task 1 (vision) and Task 2 latencies
+    are tracked separately.
+
+    Returns:
+        HedgedRequestPolicy: New policy
+        None: If the request policy is disabled
+    """
+    if not LLM_REQUEST_POLICY_ENABLED:
+        return None
+
+    return HedgedRequestPolicy(
+        LLM_DEADLINE_SECONDS,
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        initial_hedge_delay_s=LLM_HEDGE_INITIAL_DELAY_SECONDS,
+        min_samples=LLM_HEDGE_MIN_SAMPLES,
+        max_hedges=LLM_MAX_HEDGES
+    )
+
+
+class _SentenceGate:
+    """
+    Lets only one attempt speak
+
+    The first attempt that produces a sentence becomes the owner; sentences
+    from the other attempts are dropped. Once closed (fallback chosen), no
+    attempt can speak any more.
+    """
+
+    def __init__(self, on_sentence):
+        self.on_sentence = on_sentence
+        self.owner = None
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def for_attempt(self, attempt):
+        """Sentence callback for one attempt, or None when the caller does not stream"""
+        if self.on_sentence is None:
+            return None
+
+        def emit(sentence):
+            with self._lock:
+                if self.closed:
+                    return
+                if self.owner is None:
+                    self.owner = attempt
+                if self.owner != attempt:
+                    return
+                self.on_sentence(sentence)
+
+        return emit
+
+    def close(self):
+        """
+        Stop all attempts from speaking
+
+        Returns:
+            bool: False if an attempt is already speaking (it must be allowed to finish)
+        """
+        with self._lock:
+            if self.owner is not None:
+                return False
+            self.closed = True
+            return True
+
+
+class HedgedRequestPolicy:
+    """
+    Runs a feedback request under a total deadline, hedging slow attempts
+
+    If the first attempt has not answered after the configured latency
+    percentile of recent requests, a duplicate is sent and whichever finishes
+    first wins. If no attempt has answered (or started speaking) by the
+    deadline, or every attempt failed, the canned fallback for the feedback level
+    is returned instead.
+    Losing attempts cannot be aborted mid-request; their results are discarded.
+    """
+
+    def __init__(self, deadline_s, hedge_percentile=0.9, initial_hedge_delay_s=3.0,
+                 min_samples=5, max_hedges=1, history_size=50):
+        """
+        Initialize the policy
+
+        Args:
+            deadline_s (float): Total time budget for a feedback request
+            hedge_percentile (float): Latency percentile after which a hedge is sent
+            initial_hedge_delay_s (float): Hedge delay used until min_samples latencies are known
+            min_samples (int): Latencies needed before the percentile is used
+            max_hedges (int): Maximum duplicate requests per feedback request
+            history_size (int): Latencies remembered per feedback level
+        """
+        self.deadline_s = deadline_s
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay_s = initial_hedge_delay_s
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self.latencies = defaultdict(lambda: deque(maxlen=history_size))
+        self.executor = ThreadPoolExecutor(max_workers=2 * (max_hedges + 1), thread_name_prefix="llm-hedge")
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, key):
+        """
+        Time to wait for an attempt before sending a hedge
+
+        Args:
+            key (str): Latency history key (feedback level)
+
+        Returns:
+            float: Delay in seconds (always below the deadline)
+        """
+        with self._lock:
+            history = sorted(self.latencies[key])
+
+        if len(history) < self.min_samples:
+            delay = self.initial_hedge_delay_s
+        else:
+            index = min(len(history) - 1, int(self.hedge_percentile * len(history)))
+            delay = history[index]
+        return min(delay, 0.9 * self.deadline_s)
+
+    def run(self, request_fn, key, fallback_text, on_sentence=None):
+        """
+        Execute a request under the policy
+
+        Args:
+            request_fn (callable): request_fn(on_sentence) -> feedback text
+            key (str): Latency history key (feedback level)
+            fallback_text (str): Canned feedback used when the deadline passes or every attempt fails
+            on_sentence (callable): Optional sentence callback of the caller
+
+        Returns:
+            str: Feedback text
+            dict: Outcome with "outcome" ("primary", "hedge" or "fallback"), "attempts"
+                  and "elapsed_s"
+
+        Raises:
+            Exception: If the attempt that already started speaking fails
+        """
+        start = time.monotonic()
+        deadline = start + self.deadline_s
+        hedge_at = start + self.hedge_delay(key)
+        gate = _SentenceGate(on_sentence)
+        context = current_context()
+        attempts = {}
+        errors = []
+
+        def submit():
+            attempt = len(attempts)
+            attempt_on_sentence = gate.for_attempt(attempt)
+
+            def call():
+                with call_context(**dict(context, attempt=attempt)):
+                    return request_fn(attempt_on_sentence)
+
+            attempts[self.executor.submit(call)] = attempt
+            if attempt > 0:
+                print(f"Debug log: Sending hedged LLM request #{attempt} after {time.monotonic() - start:.2f}s")
+
+        submit()
+
+        while True:
+            # A finished attempt wins unless another attempt is already speaking
+            for future, attempt in attempts.items():
+                if not future.done() or future in errors:
+                    continue
+                if future.exception() is not None:
+                    print(f"Debug log: LLM attempt #{attempt} failed: {future.exception()}")
+                    errors.append(future)
+                    continue
+                if gate.owner is None or gate.owner == attempt:
+                    return self._finish(key, future.result(), attempt, len(attempts), start)
+
+            # An attempt is speaking; it must be allowed to finish even past the deadline
+            if gate.owner is not None:
+                owner_future = next(f for f, a in attempts.items() if a == gate.owner)
+                result = owner_future.result()
+                return self._finish(key, result, gate.owner, len(attempts), start)
+
+            now = time.monotonic()
+            hedges_left = len(attempts) <= self.max_hedges
+            all_failed = len(errors) == len(attempts)
+
+            if now >= deadline or (all_failed and not hedges_left):
+                if gate.close():
+                    reason = "all attempts failed" if all_failed else f"deadline of {self.deadline_s}s missed"
+                    return self._fallback(fallback_text, on_sentence, reason, len(attempts), start)
+                continue
+
+            if hedges_left and (now >= hedge_at or all_failed):
+                submit()
+                continue
+
+            next_event = min(deadline, hedge_at) if hedges_left else deadline
+            pending = [f for f in attempts if not f.done()]
+            wait(pending, timeout=max(0.0, next_event - now), return_when=FIRST_COMPLETED)
+
+    def _finish(self, key, result, attempt, attempt_count, start):
+        """Record the winning latency and build the outcome"""
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self.latencies[key].append(elapsed)
+
+        outcome = {
+            "outcome": "primary" if attempt == 0 else "hedge",
+            "attempts": attempt_count,
+            "elapsed_s": round(elapsed, 4)
+        }
+        return result, outcome
+
+    def _fallback(self, fallback_text, on_sentence, reason, attempt_count, start):
+        """Deliver the canned response"""
+        elapsed = time.monotonic() - start
+        print(f"Debug log: LLM {reason}, using canned feedback")
+
+        if on_sentence is not None:
+            for sentence in split_sentences(fallback_text):
+                on_sentence(sentence)
+
+        outcome = {
+            "outcome": "fallback",
+            "attempts": attempt_count,
+            "elapsed_s": round(elapsed, 4)
+        }
+        return fallback_text, outcome
+
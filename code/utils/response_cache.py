@@ -0,0 +1,231 @@
+"""
+Response Cache Module
+Two-tier (in-memory LRU + SQLite) cache for LLM feedback responses
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config.config import (
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_MAX_DISK_ENTRIES
+)
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Get the process-wide response cache
+
+    Returns:
+        ResponseCache: Shared cache instance
+        None: If LLM_CACHE_ENABLED is False (real study sessions)
+    """
+    global _shared_cache
+
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS,
+                LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_MAX_DISK_ENTRIES
+            )
+        return _shared_cache
+
+
+class ResponseCache:
+    """
+    Caches LLM responses keyed by a hash of everything that determines the output
+
+    Memory hits update the disk tier's last_access in batches (at the next put,
+    disk hit or every TOUCH_BATCH_SIZE memory hits) so the disk LRU order follows
+    the memory tier without a SQLite commit per hit.
+    """
+
+    TOUCH_BATCH_SIZE = 32
+
+    def __init__(self, db_path, ttl_seconds, memory_entries, max_disk_entries):
+        """
+        Initialize the cache and create the SQLite table if needed
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            ttl_seconds (float): Entries older than this are treated as misses
+            memory_entries (int): Maximum entries in the in-memory LRU tier
+            max_disk_entries (int): Maximum entries on disk; least recently used are evicted
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self.memory = OrderedDict()
+        self.touched = {}
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(model, system_prompt, user_prompt, image_data=None):
+        """
+        Build a cache key from the request inputs
+
+        Args:
+            model (str): Model name
+            system_prompt (str): System prompt
+            user_prompt (str): Rendered user prompt
+            image_data (str or bytes): Optional image payload
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, user_prompt, image_data or ""):
+            if isinstance(part, str):
+                part = part.encode('utf-8')
+            # Length prefix keeps ("ab", "c") and ("a", "bc") distinct
+            digest.update(str(len(part)).encode('ascii') + b":")
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached response
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            str: Cached response
+            None: On a miss or an expired entry
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    # Disk eviction orders by last_access, so hot entries must be touched there too
+                    self.touched[key] = now
+                    if len(self.touched) >= self.TOUCH_BATCH_SIZE:
+                        self._write_touched()
+                        self.connection.commit()
+                    return value
+                del self.memory[key]
+
+            row = self.connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.connection.commit()
+                self.misses += 1
+                return None
+
+            self.touched[key] = now
+            self._write_touched()
+            self.connection.commit()
+            self._remember(key, value, created_at)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a response in both tiers
+
+        Args:
+            key (str): Cache key from make_key
+            value (str): Response text
+        """
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, value, now)
+            self._write_touched()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict_disk()
+            self.connection.commit()
+
+    def _remember(self, key, value, created_at):
+        """Insert into the in-memory tier, evicting the least recently used entry"""
+        self.memory[key] = (value, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _write_touched(self):
+        """Write the pending last_access updates of memory hits to the disk tier"""
+        if self.touched:
+            self.connection.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self.touched.items()]
+            )
+            self.touched.clear()
+
+    def _evict_disk(self):
+        """Drop expired entries and trim the disk tier to max_disk_entries"""
+        cursor = self.connection.execute(
+            "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        self.evictions += cursor.rowcount
+
+        count = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            cursor = self.connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)", (excess,)
+            )
+            self.evictions += cursor.rowcount
+
+    def stats(self):
+        """
+        Get hit/miss counters
+
+        Returns:
+            dict: hits, memory_hits, misses, evictions, hit_rate and memory_entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory)
+            }
@@ -3,64 +3,437 @@ Robot Handler Module
 Handles NAO robot communication via ZMQ
 """
 
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
 import zmq
-from config.config import ZMQ_ADDRESS
+from config.config import (
+    ZMQ_ADDRESS, ZMQ_REQUEST_TIMEOUT, ZMQ_REQUEST_RETRIES, ZMQ_RETRY_BACKOFF_BASE, ZMQ_RETRY_BACKOFF_MAX,
+    ZMQ_HEARTBEAT_ENABLED, ZMQ_HEARTBEAT_INTERVAL, ZMQ_HEARTBEAT_TIMEOUT, ZMQ_HEARTBEAT_LIVENESS,
+    ZMQ_HEARTBEAT_MAX_INTERVAL, ZMQ_EVENTS_ADDRESS, ZMQ_EVENT_TIMEOUT, ZMQ_SPEECH_MAX_SECONDS
+)
+
+# Requests answered by nao_client without speaking
+PING_MESSAGE = "__ping__"
+STOP_MESSAGE = "__stop__"
+PREEMPT_PREFIX = "__preempt__:"
+# Prefix of a request's id; nao_client answers a repeated id without acting on it again
+MESSAGE_ID_PREFIX = "__msg__:"
+SPEECH_END_EVENTS = ("speech_finished", "speech_stopped")
+
 
 class RobotHandler:
-    """Handles NAO robot communication"""
+    """
+    Handles NAO robot communication over one long-lived REQ socket
+
+    A REQ socket that misses a reply cannot send again, so on a timeout the
+    socket is closed and reopened before the request is retried with backoff
+    (the "lazy pirate" pattern). A heartbeat thread pings the robot while the
+    socket is idle, so robot liveness is known before feedback is due.
+
+    nao_client acknowledges feedback on receipt and speaks in the background;
+    an events thread subscribes to its speech events, so speak() can wait for
+    the end of an utterance and the start latency and speaking time are measured.
+    """
+
+    def __init__(self, address=ZMQ_ADDRESS, heartbeat=ZMQ_HEARTBEAT_ENABLED, events_address=ZMQ_EVENTS_ADDRESS):
+        """
+        Initialize the ZMQ context and start the heartbeat and events threads
 
-    def __init__(self):
-        """Initialize ZMQ context and socket"""
-        self.context = None
+        Args:
+            address (str): nao_client REP address
+            heartbeat (bool): Ping the robot in the background
+            events_address (str): nao_client PUB address, None to ignore speech events
+        """
+        self.address = address
+        self.events_address = events_address
+        self.context = zmq.Context()
         self.socket = None
+        self.poller = zmq.Poller()
+        self._socket_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        # Liveness and round-trip metrics
+        self.alive = None
+        self.last_seen = None
+        self.request_count = 0
+        self.timeout_count = 0
+        self.retry_count = 0
+        self.reconnect_count = 0
+        self.feedback_rtts = deque(maxlen=100)
+        self.ping_rtts = deque(maxlen=100)
+        self.speech_start_latencies = deque(maxlen=100)
+        self.speech_durations = deque(maxlen=100)
+        self._missed_pings = 0
 
-    def send_feedback_to_robot(self, feedback_text):
+        # Speech events by utterance id (filled by the events thread), and the
+        # utterances speak() stopped waiting for (their later events are dropped)
+        self.speech_events = {}
+        self._abandoned = {}
+        self.events_seen = False
+        self._events_condition = threading.Condition()
+
+        self._closed = threading.Event()
+        self._heartbeat_thread = None
+        if heartbeat:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="robot-heartbeat", daemon=True)
+            self._heartbeat_thread.start()
+        self._events_thread = None
+        if events_address:
+            self._events_thread = threading.Thread(target=self._receive_events, name="robot-events", daemon=True)
+            self._events_thread.start()
+
+    def send_feedback_to_robot(self, feedback_text, preempt=False):
         """
         Send feedback to NAO robot via ZMQ
 
+        nao_client replies as soon as the text is queued, not after speaking.
+
         Args:
             feedback_text (str): Feedback text to send to robot
+            preempt (bool): Stop whatever the robot is saying and speak this instead
 
         Returns:
-            str: Acknowledgment message from robot
+            str: Acknowledgment message from robot (JSON with the utterance id)
 
         Raises:
-            Exception: If ZMQ communication fails
+            Exception: If ZMQ communication fails after all retries
         """
         try:
-            # Create ZMQ context and socket
-            self.context = zmq.Context()
-            self.socket = self.context.socket(zmq.REQ)
-            self.socket.setsockopt(zmq.RCVTIMEO, 5000)  # 5 second timeout
-            self.socket.connect(ZMQ_ADDRESS)
+            message = PREEMPT_PREFIX + feedback_text if preempt else feedback_text
+            acknowledgment, rtt = self._request_with_retries(message)
+            print(f"Received ack from NAO: {acknowledgment} ({rtt * 1000:.0f} ms)")
+            return acknowledgment
 
-            # Send feedback to robot
-            self.socket.send_string(feedback_text)
+        except Exception as e:
+            print(f"Robot communication error: {e}")
+            raise e
 
-            # Wait for acknowledgment
-            acknowledgment = self.socket.recv_string()
-            print(f"Received ack from NAO: {acknowledgment}")
+    def speak(self, feedback_text, stop_event=None, preempt=False):
+        """
+        Send feedback and wait until the robot has said it
 
-            return acknowledgment
+        Used as the SpeechQueue speak function for the robot agent.
+
+        Args:
+            feedback_text (str): Feedback text to send to robot
+            stop_event (threading.Event): Optional event that ends the wait early
+            preempt (bool): Stop whatever the robot is saying and speak this instead
+
+        Returns:
+            dict: Speech events of the utterance (received times and the robot's
+                  duration_s); empty if the bridge publishes no events
 
+        Raises:
+            RuntimeError: If the bridge replies with an error
+            Exception: If ZMQ communication fails after all retries
+        """
+        sent_at = time.time()
+        acknowledgment = self.send_feedback_to_robot(feedback_text, preempt)
+        try:
+            reply = json.loads(acknowledgment)
+        except ValueError:
+            reply = None
+        if isinstance(reply, dict) and reply.get("status") == "error":
+            raise RuntimeError(f"NAO bridge could not queue the feedback: {reply.get('error')}")
+        try:
+            utterance_id = reply["id"]
+        except (KeyError, TypeError):
+            # Older bridge that replies after speaking
+            return {}
+
+        started_deadline = time.perf_counter() + ZMQ_EVENT_TIMEOUT
+        finished_deadline = time.perf_counter() + ZMQ_SPEECH_MAX_SECONDS
+        with self._events_condition:
+            while True:
+                events = self.speech_events.get(utterance_id, {})
+                if any(name in events for name in SPEECH_END_EVENTS):
+                    break
+                if stop_event is not None and stop_event.is_set():
+                    break
+                now = time.perf_counter()
+                if now > finished_deadline or (not self.events_seen and now > started_deadline):
+                    print(f"Warning: No end-of-speech event from NAO for utterance {utterance_id}")
+                    break
+                self._events_condition.wait(0.1)
+            events = self.speech_events.pop(utterance_id, {})
+            if not any(name in events for name in SPEECH_END_EVENTS):
+                self._abandoned[utterance_id] = time.time()
+
+        with self._stats_lock:
+            if "speech_started" in events:
+                self.speech_start_latencies.append(events["speech_started"]["received_at"] - sent_at)
+            if "speech_finished" in events:
+                self.speech_durations.append(events["speech_finished"].get("duration_s"))
+        return events
+
+    def stop_speech(self):
+        """
+        Stop the current utterance and drop the queued ones on the robot
+
+        Used as the SpeechQueue stop function for the robot agent.
+        """
+        try:
+            acknowledgment, _ = self._request_with_retries(STOP_MESSAGE)
+            print(f"Debug log: NAO speech stopped: {acknowledgment}")
         except Exception as e:
             print(f"Robot communication error: {e}")
-            raise e
 
+    def ping(self, timeout=ZMQ_HEARTBEAT_TIMEOUT):
+        """
+        Check that nao_client answers
+
+        Args:
+            timeout (float): Seconds to wait for the reply
+
+        Returns:
+            float: Round-trip time in seconds
+            None: If the robot did not answer
+        """
+        with self._socket_lock:
+            reply, rtt = self._request(PING_MESSAGE, timeout)
+        self._record_ping(rtt)
+        return rtt
+
+    def _request_with_retries(self, message):
+        """
+        Send a request, reconnecting and retrying with backoff on timeouts
+
+        Every attempt carries the same message id, so a retry of a request that
+        reached the robot but whose reply was lost is not spoken twice.
+
+        Args:
+            message (str): Request text
+
+        Returns:
+            tuple: (reply, round-trip time in seconds)
+
+        Raises:
+            TimeoutError: If no reply arrived after ZMQ_REQUEST_RETRIES retries
+        """
+        message = f"{MESSAGE_ID_PREFIX}{uuid.uuid4().hex}:{message}"
+        with self._socket_lock:
+            for attempt in range(ZMQ_REQUEST_RETRIES + 1):
+                if attempt > 0:
+                    delay = random.uniform(0, min(ZMQ_RETRY_BACKOFF_MAX, ZMQ_RETRY_BACKOFF_BASE * (2 ** (attempt - 1))))
+                    print(f"Debug log: Retrying robot request in {delay:.2f}s")
+                    with self._stats_lock:
+                        self.retry_count += 1
+                    time.sleep(delay)
+
+                reply, rtt = self._request(message, ZMQ_REQUEST_TIMEOUT)
+                if reply is not None:
+                    with self._stats_lock:
+                        self.feedback_rtts.append(rtt)
+                        self.alive = True
+                        self.last_seen = time.time()
+                    return reply, rtt
+
+        with self._stats_lock:
+            self.alive = False
+        raise TimeoutError(f"No reply from NAO at {self.address} after {ZMQ_REQUEST_RETRIES + 1} attempts")
+
+    def _request(self, message, timeout):
+        """
+        One request/reply on the current socket (the caller holds _socket_lock)
+
+        Args:
+            message (str): Request text
+            timeout (float): Seconds to wait for the reply
+
+        Returns:
+            tuple: (reply, round-trip time in seconds), or (None, None) on a timeout
+                   or socket error, after which the socket has been replaced
+        """
+        if self.socket is None:
+            self._connect()
+
+        with self._stats_lock:
+            self.request_count += 1
+
+        start = time.perf_counter()
+        try:
+            self.socket.send_string(message)
+            if self.poller.poll(timeout * 1000):
+                return self.socket.recv_string(), time.perf_counter() - start
+        except zmq.ZMQError as e:
+            print(f"Robot socket error: {e}")
+
+        # The REQ socket is stuck waiting for this reply; replace it
+        with self._stats_lock:
+            self.timeout_count += 1
+        self._disconnect()
+        self._connect()
+        with self._stats_lock:
+            self.reconnect_count += 1
+        return None, None
+
+    def _connect(self):
+        """Open the REQ socket (the caller holds _socket_lock)"""
+        self.socket = self.context.socket(zmq.REQ)
+        self.socket.setsockopt(zmq.LINGER, 0)  # drop unsent requests on close
+        self.socket.connect(self.address)
+        self.poller.register(self.socket, zmq.POLLIN)
+
+    def _disconnect(self):
+        """Close the REQ socket (the caller holds _socket_lock)"""
+        if self.socket is None:
+            return
+        self.poller.unregister(self.socket)
+        self.socket.close()
+        self.socket = None
+
+    def _record_ping(self, rtt):
+        """Update liveness after a heartbeat"""
+        with self._stats_lock:
+            was_alive = self.alive
+            if rtt is not None:
+                self.ping_rtts.append(rtt)
+                self._missed_pings = 0
+                self.alive = True
+                self.last_seen = time.time()
+            else:
+                self._missed_pings += 1
+                if self._missed_pings >= ZMQ_HEARTBEAT_LIVENESS:
+                    self.alive = False
+            now_alive = self.alive
+
+        # Log changes only, so a session without the robot is not flooded
+        if now_alive != was_alive and now_alive is not None:
+            if now_alive:
+                print(f"Debug log: NAO reachable at {self.address} (ping {rtt * 1000:.0f} ms)")
+            else:
+                print(f"Warning: NAO not answering at {self.address}")
+
+    def _receive_events(self):
+        """Collect nao_client speech events (events thread)"""
+        subscriber = self.context.socket(zmq.SUB)
+        subscriber.setsockopt(zmq.LINGER, 0)
+        subscriber.setsockopt_string(zmq.SUBSCRIBE, "")
+        subscriber.connect(self.events_address)
+        try:
+            while not self._closed.is_set():
+                if not subscriber.poll(500):
+                    continue
+                try:
+                    event = json.loads(subscriber.recv_string())
+                    name, utterance_id = event["event"], event["id"]
+                except (ValueError, KeyError) as e:
+                    print(f"Warning: Malformed NAO event: {e}")
+                    continue
+
+                event["received_at"] = time.time()
+                print(f"Debug log: NAO {name} (utterance {utterance_id})")
+                with self._events_condition:
+                    self.events_seen = True
+                    self._prune_events(event["received_at"])
+                    if utterance_id in self._abandoned:
+                        # Nothing waits for this utterance any more
+                        if name in SPEECH_END_EVENTS:
+                            del self._abandoned[utterance_id]
+                        continue
+                    self.speech_events.setdefault(utterance_id, {})[name] = event
+                    self._events_condition.notify_all()
+        except zmq.ZMQError as e:
+            if not self._closed.is_set():
+                print(f"Robot events error: {e}")
         finally:
-            # Clean up ZMQ resources
-            self._cleanup()
+            subscriber.close()
+
+    def _prune_events(self, now):
+        """
+        Forget events and abandoned ids older than the longest utterance (the caller
+        holds _events_condition)
+
+        Events can arrive before speak() knows the utterance id, so unclaimed events
+        are kept for a while; events of utterances sent without speak() (and ids
+        reused after nao_client restarts) are cleared here.
+        """
+        cutoff = now - ZMQ_SPEECH_MAX_SECONDS
+        for utterance_id, events in list(self.speech_events.items()):
+            if max(event["received_at"] for event in events.values()) < cutoff:
+                del self.speech_events[utterance_id]
+        for utterance_id, abandoned_at in list(self._abandoned.items()):
+            if abandoned_at < cutoff:
+                del self._abandoned[utterance_id]
+
+    def _heartbeat(self):
+        """Ping the robot while the socket is idle (heartbeat thread)"""
+        interval = ZMQ_HEARTBEAT_INTERVAL
+        while not self._closed.wait(interval):
+            # Feedback requests prove liveness too; never queue behind one
+            if not self._socket_lock.acquire(blocking=False):
+                continue
+            try:
+                reply, rtt = self._request(PING_MESSAGE, ZMQ_HEARTBEAT_TIMEOUT)
+            finally:
+                self._socket_lock.release()
+            self._record_ping(rtt)
+
+            # Back off while the robot is away
+            interval = ZMQ_HEARTBEAT_INTERVAL if rtt is not None else min(interval * 2, ZMQ_HEARTBEAT_MAX_INTERVAL)
+
+    def is_alive(self):
+        """
+        Check whether the robot answered recently
+
+        Returns:
+            bool: True if the last request or heartbeat got a reply
+            None: If the robot has not been contacted yet
+        """
+        with self._stats_lock:
+            return self.alive
+
+    def stats(self):
+        """
+        Get liveness and round-trip statistics
+
+        Returns:
+            dict: alive, last_seen_s_ago, requests, timeouts, retries, reconnects,
+                  the mean / p90 / last round-trip times of feedback and pings, and
+                  the robot's speech start latency and speaking time
+        """
+        def summarize(values):
+            if not values:
+                return {"mean_ms": None, "p90_ms": None, "last_ms": None}
+            ordered = sorted(values)
+            return {
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                "p90_ms": round(ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))] * 1000, 1),
+                "last_ms": round(values[-1] * 1000, 1)
+            }
+
+        with self._stats_lock:
+            return {
+                "alive": self.alive,
+                "last_seen_s_ago": round(time.time() - self.last_seen, 1) if self.last_seen is not None else None,
+                "requests": self.request_count,
+                "timeouts": self.timeout_count,
+                "retries": self.retry_count,
+                "reconnects": self.reconnect_count,
+                "feedback_rtt": summarize(self.feedback_rtts),
+                "ping_rtt": summarize(self.ping_rtts),
+                "speech_start_latency": summarize(self.speech_start_latencies),
+                "speech_duration": summarize([duration for duration in self.speech_durations if duration is not None])
+            }
 
-    def _cleanup(self):
-        """Clean up ZMQ resources"""
+    def close(self):
+        """Stop the heartbeat and close the socket and context (safe to call twice)"""
+        self._closed.set()
+        for thread in (self._heartbeat_thread, self._events_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=ZMQ_HEARTBEAT_TIMEOUT + 1)
         try:
-            if self.socket:
-                self.socket.close()
-            if self.context:
+            with self._socket_lock:
+                self._disconnect()
+            if not self.context.closed:
                 self.context.term()
         except Exception as e:
             print(f"Error cleaning up ZMQ resources: {e}")
 
     def __del__(self):
         """Destructor to ensure cleanup"""
-        self._cleanup()
\ No newline at end of file
+        self.close()
@@ -0,0 +1,106 @@
+"""
+Sentence Stream Module
+Splits streamed LLM text into sentences (and long sentences into speakable chunks)
+"""
+
+import re
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])(["\'\)\]]*)\s+')
+
+# Clause end inside a long sentence: comma, semicolon, colon or dash, then whitespace
+CLAUSE_BOUNDARY = re.compile(r'(?<=[,;:\u2013\u2014])\s+')
+
+
+class SentenceSplitter:
+    """Accumulates streamed text chunks and yields complete sentences"""
+
+    def __init__(self, min_length=20):
+        """
+        Initialize SentenceSplitter
+
+        Args:
+            min_length (int): Sentences shorter than this are merged with the next one,
+                              so fragments like "Great!" are not spoken on their own
+        """
+        self.min_length = min_length
+        self.buffer = ""
+
+    def feed(self, text):
+        """
+        Add a chunk of streamed text
+
+        Args:
+            text (str): Text delta from the stream
+
+        Returns:
+            list: Sentences completed by this chunk (may be empty)
+        """
+        self.buffer += text
+        sentences = []
+        start = 0
+
+        for match in SENTENCE_BOUNDARY.finditer(self.buffer):
+            candidate = self.buffer[start:match.end(1)].strip()
+            if len(candidate) >= self.min_length:
+                sentences.append(candidate)
+                start = match.end()
+
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """
+        Return whatever text remains after the stream has ended
+
+        Returns:
+            list: The remaining sentence, or an empty list
+        """
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return [remainder] if remainder else []
+
+
+def split_sentences(text, min_length=20):
+    """
+    Split a complete text into sentences using the same rules as the stream
+
+    Args:
+        text (str): Text to split
+        min_length (int): Minimum sentence length (see SentenceSplitter)
+
+    Returns:
+        list: Sentences in order
+    """
+    splitter = SentenceSplitter(min_length)
+    return splitter.feed(text) + splitter.flush()
+
+
+def split_chunks(text, max_length=120, min_length=20):
+    """
+    Split text into speakable chunks: sentences, with long sentences broken at clauses
+
+    Args:
+        text (str): Text to split
+        max_length (int): Sentences longer than this are split at clause boundaries
+        min_length (int): Minimum chunk length (see SentenceSplitter)
+
+    Returns:
+        list: Chunks in order
+    """
+    chunks = []
+    for sentence in split_sentences(text, min_length):
+        if len(sentence) <= max_length:
+            chunks.append(sentence)
+            continue
+
+        current = ""
+        for clause in CLAUSE_BOUNDARY.split(sentence):
+            if len(current) >= min_length and len(current) + 1 + len(clause) > max_length:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
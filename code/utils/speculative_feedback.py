@@ -0,0 +1,228 @@
+"""
+Speculative Feedback Module
+Pre-generates Task 1 feedback in the background while the participant is still building
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from PyQt6.QtCore import QRunnable, QThreadPool, QTimer
+from utils.llm_metrics import call_context
+from utils.request_policy import _SentenceGate
+from utils.sentence_stream import split_sentences
+
+
+class _SpeculationTask(QRunnable):
+    """Runs one speculative feedback request on the thread pool"""
+
+    def __init__(self, engine, generation, key, request_args):
+        super().__init__()
+        self.engine = engine
+        self.generation = generation
+        self.key = key
+        self.request_args = request_args
+        self.future = Future()
+        self.result = None
+
+    def run(self):
+        """Generate feedback unless a newer speculation has superseded this one"""
+        try:
+            if not self.engine.is_current(self.generation):
+                print("Debug log: Skipping stale speculation")
+                return
+
+            # Speculative calls are logged too, so spend per participant stays accurate
+            with call_context(purpose="speculative"):
+                self.result, outcome = self.engine.llm_handler.get_feedback_response(
+                    *self.request_args, return_outcome=True
+                )
+
+            # Canned feedback after a missed deadline is not worth keeping; Submit makes a real request
+            if outcome is not None and outcome["outcome"] == "fallback":
+                print("Debug log: Discarding speculation answered with canned feedback")
+                return
+            self.engine.store_result(self.generation, self.key, (self.result, outcome))
+
+        except Exception as e:
+            print(f"Speculative feedback error: {e}")
+        finally:
+            self.future.set_result(None)
+
+
+class SpeculativeFeedbackEngine:
+    """
+    Regenerates Task 1 feedback for the current object list after each saved pattern
+
+    Requests are debounced so a burst of saves triggers one call, and only the
+    newest speculation is kept; results of superseded requests are discarded.
+    schedule() and cancel() must be called on the GUI thread, take() may be
+    called from any thread.
+    """
+
+    def __init__(self, llm_handler, debounce_ms=1500):
+        """
+        Initialize the engine
+
+        Args:
+            llm_handler (LLMHandler): Task 1 LLM handler used to generate feedback
+            debounce_ms (int): Quiet period after the last save before a request is sent
+        """
+        self.llm_handler = llm_handler
+        self.thread_pool = QThreadPool.globalInstance()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculation-submit")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending = None
+        self._in_flight = None
+        self._result_key = None
+        self._result = None
+
+        self.debounce_timer = QTimer()
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self._launch)
+
+    @staticmethod
+    def make_key(feedback_level, image_path, object_list):
+        """
+        Build the key that identifies a speculation
+
+        Args:
+            feedback_level (str): Feedback level
+            image_path (str): Path to the question image (identifies the set)
+            object_list (list): Objects made by the user
+
+        Returns:
+            tuple: Hashable key
+        """
+        return (feedback_level, image_path, tuple(object_list))
+
+    def schedule(self, feedback_level, image_path, shape_list_str, object_list, example_objects_str):
+        """
+        Schedule a speculative request for the current object list (debounced)
+
+        Args:
+            feedback_level (str): Feedback level (F_4 and locally answered levels are ignored)
+            image_path (str): Path to the question image
+            shape_list_str (str): Available shapes and colors
+            object_list (list): Objects made by the user so far
+            example_objects_str (str): Example objects that can be built
+        """
+        # Nothing to gain for levels answered without a network call
+        if feedback_level == "F_4" or self.llm_handler.uses_local_backend(feedback_level):
+            return
+
+        key = self.make_key(feedback_level, image_path, object_list)
+        request_args = (feedback_level, image_path, shape_list_str, ', '.join(object_list), example_objects_str)
+
+        with self._lock:
+            self._generation += 1
+            self._pending = (self._generation, key, request_args)
+
+        self.debounce_timer.start()
+
+    def _launch(self):
+        """Send the pending request once the debounce period has passed"""
+        with self._lock:
+            if self._pending is None:
+                return
+            generation, key, request_args = self._pending
+            self._pending = None
+            task = _SpeculationTask(self, generation, key, request_args)
+            self._in_flight = task
+
+        print(f"Debug log: Speculating feedback for {list(key[2])}")
+        self.thread_pool.start(task)
+
+    def is_current(self, generation):
+        """
+        Check whether a speculation is still the newest one
+
+        Args:
+            generation (int): Generation number of the speculation
+
+        Returns:
+            bool: True if no newer speculation has been scheduled
+        """
+        with self._lock:
+            return generation == self._generation
+
+    def store_result(self, generation, key, result):
+        """
+        Keep a finished speculation if it is still the newest one
+
+        Args:
+            generation (int): Generation number of the speculation
+            key (tuple): Speculation key
+            result (tuple): Generated feedback and its request policy outcome
+        """
+        with self._lock:
+            if generation != self._generation:
+                print("Debug log: Discarding stale speculation result")
+                return
+            self._result_key = key
+            self._result = result
+
+    def take(self, feedback_level, image_path, object_list, request_fn, on_sentence=None):
+        """
+        Return speculated feedback if it matches the submitted object list, else request it
+
+        If a matching speculation is still in flight, the normal request is sent
+        alongside it and whichever delivers feedback first is used (unless the
+        normal request has already started speaking), so Submit is never slower
+        than without speculation. Canned fallback feedback is never speculated.
+
+        Args:
+            feedback_level (str): Feedback level
+            image_path (str): Path to the question image
+            object_list (list): Objects made by the user at submission
+            request_fn (callable): request_fn(on_sentence) -> (feedback, outcome), the normal
+                                   request (LLMHandler.get_feedback_response with return_outcome)
+            on_sentence (callable): Sentence callback; speculated feedback is passed to it
+                                    sentence by sentence
+
+        Returns:
+            tuple: (feedback, outcome); the outcome of speculated feedback is marked
+                   with "speculative"
+        """
+        key = self.make_key(feedback_level, image_path, object_list)
+
+        with self._lock:
+            result = self._result if self._result_key == key else None
+            in_flight = self._in_flight
+
+        if result is not None:
+            return self._use_result(result, on_sentence)
+        if in_flight is None or in_flight.key != key:
+            return request_fn(on_sentence)
+
+        print("Debug log: Racing the speculation in flight against a new request")
+        gate = _SentenceGate(on_sentence)
+        request = self.executor.submit(request_fn, gate.for_attempt("request"))
+        wait([request, in_flight.future], return_when=FIRST_COMPLETED)
+
+        if not request.done():
+            with self._lock:
+                result = self._result if self._result_key == key else None
+            # The request keeps running in the background; its result is discarded
+            if result is not None and gate.close():
+                return self._use_result(result, on_sentence)
+        return request.result()
+
+    def _use_result(self, result, on_sentence):
+        """Speak speculated feedback through the caller's sentence callback"""
+        print("Debug log: Using speculative feedback")
+        feedback, outcome = result
+        if on_sentence is not None:
+            for sentence in split_sentences(feedback):
+                on_sentence(sentence)
+        return feedback, (dict(outcome, speculative=True) if outcome is not None else None)
+
+    def cancel(self):
+        """Drop pending and in-flight speculations and forget the last result"""
+        self.debounce_timer.stop()
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+            self._in_flight = None
+            self._result_key = None
+            self._result = None
@@ -0,0 +1,280 @@
+"""
+Speech Queue Module
+Plays agent utterances (NAO robot or TTS voice) one after another on a background thread
+"""
+
+import threading
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class SpeechQueue(QObject):
+    """
+    Non-blocking utterance queue shared by both agent types
+
+    say() returns at once; a single delivery thread speaks the utterances in
+    order, so the phase timer and the UI keep running while the agent talks.
+    Signals are emitted from the delivery thread and reach slots on the GUI
+    thread through queued connections.
+
+    Each agent is registered with a speak function, speak_fn(text, stop_event),
+    that blocks until the utterance has been spoken (or stop_event is set), and
+    an optional stop function that interrupts the agent mid-utterance. A dict
+    returned by speak_fn (e.g. the TTS engine used) is kept in the record.
+
+    Stop functions run off the caller's thread, but the delivery thread waits
+    for them before it starts the next utterance, so a late stop cannot cut
+    off new speech. An agent registered with preempt=True takes a barge-in
+    utterance as speak_fn(text, stop_event, preempt=True) and stops its old
+    speech itself in the same request, so no separate stop is sent.
+
+    An agent registered with a prepare function, prepare_fn(text), is asked to
+    prepare the next queued utterance (e.g. synthesize it) while the current one
+    plays, so consecutive utterances follow each other without a gap.
+    """
+
+    started = pyqtSignal(int, str)       # utterance id, text
+    finished = pyqtSignal(int, float)    # utterance id, speaking time in seconds
+    failed = pyqtSignal(int, str)        # utterance id, error message
+    cancelled = pyqtSignal(int)          # utterance id
+    idle = pyqtSignal()                  # nothing queued or playing
+
+    def __init__(self, parent=None):
+        """
+        Initialize the queue and start its delivery thread
+
+        Args:
+            parent (QObject): Optional Qt parent
+        """
+        super().__init__(parent)
+        self.agents = {}
+        self.records = []
+        self._pending = deque()
+        self._current = None
+        self._next_id = 1
+        self._stoppers = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="speech-queue", daemon=True)
+        self._thread.start()
+
+    def register(self, agent_id, speak_fn, stop_fn=None, preempt=False, prepare_fn=None):
+        """
+        Register how an agent speaks
+
+        Args:
+            agent_id (str): Agent ID (e.g. "agent_1")
+            speak_fn (callable): speak_fn(text, stop_event), blocks until spoken
+            stop_fn (callable): Optional stop_fn(), interrupts the current utterance
+            preempt (bool): speak_fn also accepts preempt=True, which stops the
+                            agent's current speech and speaks text in one request
+            prepare_fn (callable): Optional prepare_fn(text), starts preparing an
+                                   utterance that is spoken next; must return at once
+        """
+        self.agents[agent_id] = (speak_fn, stop_fn, preempt, prepare_fn)
+
+    def say(self, text, agent_id, barge_in=False):
+        """
+        Queue an utterance and return immediately (safe from any thread)
+
+        Args:
+            text (str): Text to speak
+            agent_id (str): Registered agent ID
+            barge_in (bool): Cancel everything queued or playing first (an agent
+                             registered with preempt=True is not stopped separately;
+                             the new utterance preempts it)
+
+        Returns:
+            int: Utterance ID
+            None: If the text is empty or the agent is not registered
+        """
+        if not text or not text.strip():
+            return None
+        if agent_id not in self.agents:
+            print(f"Warning: No speech output registered for {agent_id}")
+            return None
+
+        preempt = barge_in and self.agents[agent_id][2]
+        if barge_in:
+            self._cancel(keep_agent=agent_id if preempt else None)
+
+        with self._condition:
+            utterance = {
+                "id": self._next_id,
+                "agent": agent_id,
+                "text": text,
+                "queued_at": time.time(),
+                "started_at": None,
+                "duration_s": None,
+                "status": "queued",
+                "preempt": preempt,
+                "prepared": False,
+                "delivery": None,
+                "stop_event": threading.Event()
+            }
+            self._next_id += 1
+            self._pending.append(utterance)
+            self._condition.notify()
+
+        self._prepare_next()
+        return utterance["id"]
+
+    def cancel(self):
+        """Drop every queued utterance and stop the one playing (safe from any thread)"""
+        self._cancel()
+
+    def _cancel(self, keep_agent=None):
+        """
+        Drop every queued utterance and stop the one playing
+
+        Args:
+            keep_agent (str): Agent whose stop function is not run, because the
+                              next utterance preempts its speech
+        """
+        with self._condition:
+            dropped = list(self._pending)
+            self._pending.clear()
+            current = self._current
+
+            stop_fn = None
+            if current is not None and current["agent"] != keep_agent:
+                stop_fn = self.agents[current["agent"]][1]
+            if stop_fn is not None:
+                # Stopping may need a network round trip; keep the caller (often the GUI)
+                # responsive, but make the delivery thread wait for it (see _run)
+                stopper = threading.Thread(target=self._stop_agent, args=(stop_fn,), name="speech-stop", daemon=True)
+                self._stoppers.append(stopper)
+                stopper.start()
+
+        for utterance in dropped:
+            self._close_record(utterance, "cancelled")
+            self.cancelled.emit(utterance["id"])
+
+        if current is not None:
+            current["stop_event"].set()
+
+        if dropped and current is None:
+            self.idle.emit()
+
+    def is_speaking(self):
+        """
+        Check whether an utterance is playing or queued
+
+        Returns:
+            bool: True if the queue is busy
+        """
+        with self._condition:
+            return self._current is not None or bool(self._pending)
+
+    def wait(self, timeout=None):
+        """
+        Block until every queued utterance has been spoken
+
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if the queue is idle
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._current is None and not self._pending, timeout)
+
+    def drain_records(self):
+        """
+        Return and clear the records of the utterances that have ended
+
+        Returns:
+            list: Dicts with id, agent, text, queued_at, started_at, duration_s,
+                  status ("finished", "failed" or "cancelled") and delivery
+                  (what speak_fn returned, if a dict)
+        """
+        with self._condition:
+            records, self.records = self.records, []
+            return records
+
+    def close(self):
+        """Cancel all speech and stop the delivery thread (safe to call twice)"""
+        self.cancel()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _prepare_next(self):
+        """Let the agent of the next queued utterance prepare it while the current one plays"""
+        with self._condition:
+            if self._current is None or not self._pending:
+                return
+            utterance = self._pending[0]
+            prepare_fn = self.agents[utterance["agent"]][3]
+            if prepare_fn is None or utterance["prepared"]:
+                return
+            utterance["prepared"] = True
+
+        try:
+            prepare_fn(utterance["text"])
+        except Exception as e:
+            print(f"Speech prepare error: {e}")
+
+    def _stop_agent(self, stop_fn):
+        """Interrupt the agent that is speaking (runs on its own thread)"""
+        try:
+            stop_fn()
+        except Exception as e:
+            print(f"Speech stop error: {e}")
+
+    def _close_record(self, utterance, status, duration=None):
+        """Store the record of an utterance that has ended"""
+        utterance["status"] = status
+        utterance["duration_s"] = round(duration, 3) if duration is not None else None
+        with self._condition:
+            self.records.append({key: value for key, value in utterance.items()
+                                 if key not in ("stop_event", "prepared")})
+            self._condition.notify_all()
+
+    def _run(self):
+        """Delivery loop"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                utterance = self._pending.popleft()
+                self._current = utterance
+                stoppers, self._stoppers = self._stoppers, []
+
+            # A stop still on its way to the agent must not arrive after this utterance
+            for stopper in stoppers:
+                stopper.join()
+
+            speak_fn = self.agents[utterance["agent"]][0]
+            utterance["started_at"] = time.time()
+            self.started.emit(utterance["id"], utterance["text"])
+            self._prepare_next()
+
+            start = time.perf_counter()
+            try:
+                if utterance["preempt"]:
+                    delivery = speak_fn(utterance["text"], utterance["stop_event"], preempt=True)
+                else:
+                    delivery = speak_fn(utterance["text"], utterance["stop_event"])
+                if isinstance(delivery, dict):
+                    utterance["delivery"] = delivery
+                duration = time.perf_counter() - start
+                if utterance["stop_event"].is_set():
+                    self._close_record(utterance, "cancelled", duration)
+                    self.cancelled.emit(utterance["id"])
+                else:
+                    self._close_record(utterance, "finished", duration)
+                    self.finished.emit(utterance["id"], duration)
+            except Exception as e:
+                print(f"Speech delivery error: {e}")
+                self._close_record(utterance, "failed", time.perf_counter() - start)
+                self.failed.emit(utterance["id"], str(e))
+
+            with self._condition:
+                self._current = None
+                now_idle = not self._pending
+                self._condition.notify_all()
+            if now_idle:
+                self.idle.emit()
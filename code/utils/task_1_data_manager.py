@@ -2,6 +2,7 @@
 import json
 import os
 import time
+from utils.task_1_inventory import ShapeInventory
 
 class DataManager:
     """Handles all data operations for the pattern recognition feedback study (Task 1)"""
@@ -76,6 +77,26 @@ class DataManager:
 
         return objects_str
 
+    def load_inventory(self, shape_file_path, object_file_path):
+        """
+        Load the shapes and example objects as count vectors
+
+        Args:
+            shape_file_path (str): Path to the shapes file
+            object_file_path (str): Path to the objects file
+
+        Returns:
+            ShapeInventory: Parsed inventory and recipes
+            None: If the files cannot be parsed
+        """
+        try:
+            return ShapeInventory.from_files(shape_file_path, object_file_path)
+        except FileNotFoundError as e:
+            print(f"Error: Inventory file not found: {e}")
+        except ValueError as e:
+            print(f"Error: Incorrect inventory file format: {e}")
+        return None
+
     def get_data_directory_path(self, task_id, agent_id, sub_id, feedback_level):
         """
         Get the directory path for storing data
@@ -112,7 +133,8 @@ class DataManager:
             return os.path.join(base_path, "images_after_feedback")
 
     def collect_data(self, phase, sub_id, task_id, agent_id, feedback_level,
-                     object_list, openai_response="", submission_time=None, time_left=None):
+                     object_list, openai_response="", submission_time=None, time_left=None, llm_calls=None,
+                     set_number=None, speech=None, llm_outcome=None):
         """
         Collect and save phase data to JSON file
 
@@ -126,6 +148,11 @@ class DataManager:
             openai_response (str): OpenAI generated response
             submission_time (float): Timestamp of submission
             time_left (int): Remaining time when submitted
+            llm_calls (list): Per-call LLM latency/token records for this phase
+            set_number (str): Set number (needed to rebuild the prompt offline)
+            speech (list): Records of the agent utterances played (SpeechQueue.drain_records)
+            llm_outcome (dict): Request policy outcome of openai_response ("primary", "hedge"
+                                or "fallback" for the canned feedback)
 
         Returns:
             str: Success message
@@ -144,6 +171,14 @@ class DataManager:
             f"Submission_timestamp{phase}": submission_time,
             f"Time_Left_{phase}": time_left
         }
+        if set_number is not None:
+            data["Set_Number"] = set_number
+        if llm_outcome is not None:
+            data[f"LLM_Outcome_{phase}"] = llm_outcome
+        if llm_calls is not None:
+            data[f"LLM_Calls_{phase}"] = llm_calls
+        if speech is not None:
+            data[f"Speech_{phase}"] = speech
 
         # Create directory if it doesn't exist
         directory_path = self.get_data_directory_path(task_id, agent_id, sub_id, feedback_level)
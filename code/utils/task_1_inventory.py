@@ -0,0 +1,276 @@
+"""
+Task 1 Inventory Module
+Array-backed shape inventories and object recipes, and the check of which example
+objects the participant has not built yet
+"""
+
+import difflib
+import re
+import numpy as np
+
+# Misspellings found in the database files
+COLOR_ALIASES = {
+    "yello": "yellow",
+    "oragne": "orange",
+    "clue": "blue",
+}
+SHAPE_ALIASES = {
+    "rectangel": "rectangle",
+}
+
+
+def normalize_color(color):
+    """
+    Normalize a color name (case, whitespace, known typos)
+
+    Args:
+        color (str): Color as written in a database file
+
+    Returns:
+        str: Normalized color
+    """
+    color = color.strip().lower()
+    return COLOR_ALIASES.get(color, color)
+
+
+def normalize_shape(shape):
+    """
+    Normalize a shape name (case, whitespace, known typos, plurals)
+
+    Args:
+        shape (str): Shape as written in a database file, e.g. "3D Trapezoids"
+
+    Returns:
+        str: Normalized singular shape, e.g. "3D trapezoid"
+    """
+    words = shape.strip().lower().split()
+    if not words:
+        return ""
+
+    last = SHAPE_ALIASES.get(words[-1], words[-1])
+    if last.endswith("uses"):
+        last = last[:-2]                    # rhombuses -> rhombus
+    elif last.endswith("s") and not last.endswith(("ss", "us")):
+        last = last[:-1]                    # triangles -> triangle
+    words[-1] = SHAPE_ALIASES.get(last, last)
+    return " ".join("3D" if word == "3d" else word for word in words)
+
+
+def normalize_object_name(name):
+    """
+    Normalize an object name for matching user input against recipes
+
+    Args:
+        name (str): Object name, e.g. "Fish 2" or " pear  fruit"
+
+    Returns:
+        tuple: (lowercase name without numbering, number or None),
+               e.g. ("fish", 2) or ("pear fruit", None)
+    """
+    name = " ".join(re.sub(r"[^a-z0-9 ]", " ", name.lower()).split())
+    match = re.match(r"^(.*\S)\s+(\d+)$", name)
+    if match:
+        return match.group(1), int(match.group(2))
+    return name, None
+
+
+class ShapeInventory:
+    """
+    Shape inventory and example-object recipes of one Task 1 set
+
+    Every (shape, color) pair is a column; the inventory is a count vector and
+    the recipes form a matrix with one count vector per example object. Objects
+    are built one at a time from the whole inventory, so a recipe is feasible
+    when it needs no more of any piece than the inventory holds. Every recipe in
+    the current database files is feasible; the check guards against recipe
+    files that name pieces a set does not have.
+
+    Numbered examples ("flower 1", "flower 2") are different objects and are
+    tracked separately.
+    """
+
+    def __init__(self, inventory, recipes):
+        """
+        Build the count vectors
+
+        Args:
+            inventory (dict): (shape, color) -> count
+            recipes (list): (object name, {(shape, color): count}) in file order
+        """
+        self.pieces = list(inventory)
+        self.column = {piece: index for index, piece in enumerate(self.pieces)}
+        self.inventory = np.array([inventory[piece] for piece in self.pieces], dtype=np.int32)
+
+        self.names = []
+        rows = []
+        for name, recipe in recipes:
+            row = np.zeros(len(self.pieces), dtype=np.int32)
+            impossible = False
+            for piece, count in recipe.items():
+                piece = self._resolve_piece(name, piece)
+                if piece is None:
+                    impossible = True
+                    continue
+                row[self.column[piece]] += count
+            if impossible:
+                # Needs a piece the set does not have at all
+                row[:] = np.iinfo(np.int32).max
+            self.names.append(name)
+            rows.append(row)
+
+        self.recipes = np.array(rows, dtype=np.int32).reshape(len(rows), len(self.pieces))
+        self.recipe_ids = [normalize_object_name(name) for name in self.names]
+        self.base_names = sorted({base for base, _ in self.recipe_ids})
+
+    def _resolve_piece(self, object_name, piece):
+        """
+        Map a recipe piece to an inventory column
+
+        Some recipe files name a color the set does not have (e.g. "orange square"
+        when the set has one red square); if the shape exists in exactly one
+        color, that piece is used.
+
+        Args:
+            object_name (str): Object the piece belongs to (for the warning)
+            piece (tuple): (shape, color)
+
+        Returns:
+            tuple: Inventory piece
+            None: If the shape is not in the inventory
+        """
+        if piece in self.column:
+            return piece
+
+        same_shape = [candidate for candidate in self.pieces if candidate[0] == piece[0]]
+        if len(same_shape) == 1:
+            print(f"Warning: '{object_name}' uses {piece[1]} {piece[0]}, "
+                  f"using the set's {same_shape[0][1]} {same_shape[0][0]}")
+            return same_shape[0]
+
+        print(f"Warning: '{object_name}' needs {piece[1]} {piece[0]}, which is not in the set")
+        return None
+
+    @classmethod
+    def from_files(cls, shape_file_path, object_file_path):
+        """
+        Parse shape_list/shape_N.txt and object_list/object_N.txt
+
+        Args:
+            shape_file_path (str): Lines of "shape,color,count"
+            object_file_path (str): Lines of "object name: 1 color shape, 2 color shapes"
+
+        Returns:
+            ShapeInventory: Parsed inventory
+
+        Raises:
+            FileNotFoundError: If a file is missing
+            ValueError: If a count is not a number
+        """
+        inventory = {}
+        with open(shape_file_path, 'r') as file:
+            for line in file:
+                shape_data = line.strip().split(',')
+                if len(shape_data) != 3:
+                    continue
+                piece = (normalize_shape(shape_data[0]), normalize_color(shape_data[1]))
+                inventory[piece] = inventory.get(piece, 0) + int(shape_data[2])
+
+        recipes = []
+        with open(object_file_path, 'r') as file:
+            for line in file:
+                object_data = line.strip().split(':')
+                if len(object_data) != 2:
+                    continue
+                recipe = {}
+                for item in object_data[1].split(','):
+                    words = item.split()
+                    if len(words) < 3 or not words[0].isdigit():
+                        continue
+                    piece = (normalize_shape(" ".join(words[2:])), normalize_color(words[1]))
+                    recipe[piece] = recipe.get(piece, 0) + int(words[0])
+                if recipe:
+                    recipes.append((object_data[0].strip(), recipe))
+
+        return cls(inventory, recipes)
+
+    def feasible_mask(self):
+        """
+        Recipes that fit in the inventory
+
+        Returns:
+            np.ndarray: Boolean mask, one entry per recipe
+        """
+        return np.all(self.recipes <= self.inventory, axis=1)
+
+    def built_mask(self, object_list):
+        """
+        Recipes the participant has already built (matched by name, typo tolerant)
+
+        The name without its number is matched fuzzily; a number must match
+        exactly. A name typed without a number marks one unbuilt example of
+        that name (e.g. "fish" marks "fish 1", a second "fish" marks "fish 2").
+
+        Args:
+            object_list (list): Object names typed by the participant
+
+        Returns:
+            np.ndarray: Boolean mask, one entry per recipe
+        """
+        built = np.zeros(len(self.names), dtype=bool)
+        for object_name in object_list:
+            base, number = normalize_object_name(object_name)
+            if not base:
+                continue
+            bases = difflib.get_close_matches(base, self.base_names, n=len(self.base_names), cutoff=0.8)
+            matches = [index for index, (recipe_base, recipe_number) in enumerate(self.recipe_ids)
+                       if recipe_base in bases and (number is None or recipe_number == number)]
+            if number is None:
+                matches = [index for index in matches if not built[index]][:1]
+            built[matches] = True
+        return built
+
+    def candidates(self, object_list, limit=None):
+        """
+        Example objects that are feasible and not yet built
+
+        Args:
+            object_list (list): Object names typed by the participant
+            limit (int): Maximum number of candidates
+
+        Returns:
+            list: Object names in file order
+        """
+        mask = self.feasible_mask() & ~self.built_mask(object_list)
+        names = [self.names[index] for index in np.flatnonzero(mask)]
+        return names[:limit] if limit is not None else names
+
+    def describe(self, object_name):
+        """
+        Format an object's recipe with the set's pieces
+
+        Args:
+            object_name (str): Object name as in the recipe file
+
+        Returns:
+            str: e.g. "fish: 1 red trapezoid, 1 yellow hexagon"
+        """
+        row = self.recipes[self.names.index(object_name)]
+        pieces = [f"{row[index]} {color} {shape}" for index, (shape, color) in enumerate(self.pieces) if row[index]]
+        return f"{object_name}: {', '.join(pieces)}"
+
+    def candidates_str(self, object_list, limit=None):
+        """
+        Format the candidate list for the F_1 prompt
+
+        Args:
+            object_list (list): Object names typed by the participant
+            limit (int): Maximum number of candidates
+
+        Returns:
+            str: "name: pieces; name: pieces;" (same format as load_objects_from_file)
+            None: If every example object has been built
+        """
+        names = self.candidates(object_list, limit)
+        if not names:
+            return None
+        return '; '.join(self.describe(name) for name in names) + ';'
@@ -1,22 +1,37 @@
 
-import base64
-import io
-import requests
-import cv2
-from PIL import Image
+import json
 from unidecode import unidecode
-from config.config import OPENAI_API_KEY, OPENAI_VISION_MODEL
+from config.config import (
+    OPENAI_VISION_MODEL, LLM_STREAMING, PROMPT_LAYOUT, FALLBACK_FEEDBACK, TASK_1_IMAGE_MAX_SIDE,
+    TASK_1_IMAGE_FORMAT, TASK_1_IMAGE_QUALITY, TASK_1_IMAGE_DETAIL, TASK_1_IMAGE_SIDECAR_DIR
+)
 from utils.task_1_prompt_handler import PromptHandler
+from utils.sentence_stream import SentenceSplitter, split_sentences
+from utils.response_cache import get_response_cache, ResponseCache
+from utils.http_transport import get_transport
+from utils.image_payload_cache import ImagePayloadCache
+from utils.llm_metrics import CallTimer, LLMCallLog, call_context
+from utils.request_policy import create_request_policy
+from utils.feedback_backends import create_local_backend, LocalFeedbackMixin
 
-class LLMHandler:
+class LLMHandler(LocalFeedbackMixin):
     """Handles all OpenAI API interactions for Task 1 (pattern recognition)"""
 
     def __init__(self):
-        """Initialize OpenAI client and prompt handler"""
-        self.api_key = OPENAI_API_KEY
+        """Initialize shared HTTP transport and prompt handler"""
+        self.transport = get_transport()
         self.prompt_handler = PromptHandler()
+        self.cache = get_response_cache()
+        self.image_cache = ImagePayloadCache(
+            TASK_1_IMAGE_MAX_SIDE, TASK_1_IMAGE_FORMAT, TASK_1_IMAGE_QUALITY, TASK_1_IMAGE_SIDECAR_DIR
+        )
+        self.call_log = LLMCallLog()
+        self.prompt_layout = PROMPT_LAYOUT
+        self.request_policy = create_request_policy()
+        self.local_backend = create_local_backend("task_1")
 
-    def get_feedback_response(self, feedback_level, image_path, shape_list_str, object_list_str, example_objects_str):
+    def get_feedback_response(self, feedback_level, image_path, shape_list_str, object_list_str, example_objects_str,
+                              on_sentence=None, subject_id=None, return_outcome=False):
         """
         Get feedback response from OpenAI based on feedback level with image context
 
@@ -26,74 +41,130 @@ class LLMHandler:
             shape_list_str (str): Available shapes and colors
             object_list_str (str): Objects already made by user
             example_objects_str (str): Example objects that can be built
+            on_sentence (callable): If given and LLM_STREAMING is enabled, the response
+                                    is streamed and on_sentence(sentence) is called as
+                                    soon as each sentence completes
+            subject_id (str): Participant ID (used by the local backend to avoid repeats)
+            return_outcome (bool): Also return the request policy outcome, so callers
+                                   can tell real feedback from the canned fallback
+
+        Levels in LOCAL_FEEDBACK_LEVELS are answered by the local backend. With
+        the request policy enabled, a slow request is hedged with a duplicate
+        and canned feedback is returned if nothing arrives before the deadline.
 
         Returns:
             str: OpenAI generated feedback response
             str: Empty string for F_4 (no feedback)
+            tuple: (response, outcome) if return_outcome is set; outcome is the policy
+                   outcome dict ("outcome" is "primary", "hedge" or "fallback"), or None
+                   when no request policy was applied
 
         Raises:
             Exception: If OpenAI API call fails
         """
+        response, outcome = self._get_feedback_response(
+            feedback_level, image_path, shape_list_str, object_list_str, example_objects_str, on_sentence, subject_id
+        )
+        return (response, outcome) if return_outcome else response
+
+    def _get_feedback_response(self, feedback_level, image_path, shape_list_str, object_list_str,
+                               example_objects_str, on_sentence, subject_id):
+        """
+        Generate feedback and report how the request policy answered
+
+        Args: as for get_feedback_response
+
+        Returns:
+            tuple: (response, outcome dict or None)
+        """
         # F_4 has no feedback
         if feedback_level == "F_4":
-            return ""
+            return "", None
+
+        if self.uses_local_backend(feedback_level):
+            return self._generate_local_feedback(feedback_level, subject_id, on_sentence), None
 
         try:
+            # Prefix layout - the object list goes in a final message so the rest is a cacheable prefix
+            dynamic_prompt = None
+            if self.prompt_layout == "prefix":
+                dynamic_prompt = self.prompt_handler.get_dynamic_prompt(object_list_str)
+                object_list_str = self.prompt_handler.DYNAMIC_FIELD_REFERENCE
+
             # Get appropriate prompt for feedback level
             user_prompt = self.prompt_handler.get_prompt_for_feedback_level(
                 feedback_level, shape_list_str, object_list_str, example_objects_str
             )
 
             if user_prompt is None:
-                return ""
+                return "", None
+
+            # Load and encode image (cached after the first request)
+            image_url = self._encode_image(image_path)
 
-            # Load and encode image
-            base64_image = self._encode_image(image_path)
+            with call_context(feedback_level=feedback_level):
+                if self.request_policy is None:
+                    return self._make_vision_api_call(user_prompt, image_url, on_sentence, dynamic_prompt), None
 
-            # Make API call with vision
-            return self._make_vision_api_call(user_prompt, base64_image)
+                # Make API call with vision under the deadline, hedging a slow request
+                timer = CallTimer(OPENAI_VISION_MODEL, "request_policy")
+                response, outcome = self.request_policy.run(
+                    lambda attempt_on_sentence: self._make_vision_api_call(user_prompt, image_url,
+                                                                           attempt_on_sentence, dynamic_prompt),
+                    feedback_level, FALLBACK_FEEDBACK["task_1"][feedback_level], on_sentence
+                )
+                record = timer.finish()
+                record.update(outcome)
+                self.call_log.add(record)
+                return response, outcome
 
         except Exception as e:
             print(f"Error in LLM Handler: {e}")
             raise e
 
+    def preload_image(self, image_path):
+        """
+        Encode the question image ahead of the first feedback request
+
+        Args:
+            image_path (str): Path to the image file
+        """
+        try:
+            self._encode_image(image_path)
+        except Exception as e:
+            print(f"Image preload error: {e}")
+
     def _encode_image(self, image_path):
         """
-        Encode image to base64 for API transmission
+        Encode image to a base64 data URL for API transmission
 
         Args:
             image_path (str): Path to the image file
 
         Returns:
-            str: Base64 encoded image
+            str: Data URL with the base64 encoded image
 
         Raises:
             Exception: If image loading fails
         """
         try:
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Failed to load image from {image_path}")
-
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(image_rgb)
-            buffered = io.BytesIO()
-            pil_image.save(buffered, format="PNG")
-            base64_image = base64.b64encode(buffered.getvalue()).decode('utf-8')
-
-            return base64_image
+            return self.image_cache.get_data_url(image_path)
 
         except Exception as e:
             print(f"Image encoding error: {e}")
             raise e
 
-    def _make_vision_api_call(self, user_prompt, base64_image):
+    def _make_vision_api_call(self, user_prompt, image_url, on_sentence=None, dynamic_prompt=None):
         """
         Make API call to OpenAI Vision API
 
         Args:
             user_prompt (str): The user prompt to send
-            base64_image (str): Base64 encoded image
+            image_url (str): Data URL with the base64 encoded image
+            on_sentence (callable): If given and LLM_STREAMING is enabled, stream the
+                                    completion and pass each finished sentence to it
+            dynamic_prompt (str): Participant-specific text sent as a final user message
+                                  after the prompt and image (prefix layout)
 
         Returns:
             str: OpenAI response content
@@ -101,44 +172,123 @@ class LLMHandler:
         Raises:
             Exception: If API call fails
         """
+        system_prompt = self.prompt_handler.get_system_prompt()
+        timer = CallTimer(OPENAI_VISION_MODEL, "feedback", on_sentence is not None and LLM_STREAMING)
+
+        # Serve identical requests from the cache (disabled for real study sessions)
+        cache_key = None
+        if self.cache is not None:
+            cache_prompt = user_prompt if dynamic_prompt is None else json.dumps([user_prompt, dynamic_prompt])
+            cache_key = ResponseCache.make_key(
+                OPENAI_VISION_MODEL, system_prompt, cache_prompt, f"{TASK_1_IMAGE_DETAIL}:{image_url}"
+            )
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                print(f"Debug log: LLM cache hit {self.cache.stats()}")
+                self.call_log.add(timer.finish(cache_hit=True))
+                if on_sentence is not None:
+                    for sentence in split_sentences(cached_response):
+                        on_sentence(sentence)
+                return cached_response
+
+        error = None
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
+            openai_response = self._request_vision_completion(system_prompt, user_prompt, image_url, timer,
+                                                              on_sentence, dynamic_prompt)
+        except Exception as e:
+            error = e
+            raise e
+        finally:
+            self.call_log.add(timer.finish(error=error))
 
+        if self.cache is not None:
+            self.cache.put(cache_key, openai_response)
+
+        return openai_response
+
+    def _request_vision_completion(self, system_prompt, user_prompt, image_url, timer, on_sentence=None,
+                                   dynamic_prompt=None):
+        """
+        Send the vision chat-completion request
+
+        Args:
+            system_prompt (str): The system prompt to send
+            user_prompt (str): The user prompt to send
+            image_url (str): Data URL with the base64 encoded image
+            timer (CallTimer): Receives first-token time, usage and retry count
+            on_sentence (callable): Sentence callback for streamed responses
+            dynamic_prompt (str): Optional final user message (prefix layout)
+
+        Returns:
+            str: OpenAI response content
+
+        Raises:
+            Exception: If API call fails
+        """
+        stream_info = {}
+        try:
             payload = {
                 "model": OPENAI_VISION_MODEL,
                 "messages": [
                     {
                         "role": "system",
-                        "content": self.prompt_handler.get_system_prompt()
+                        "content": system_prompt
                     },
                     {
                         "role": "user",
                         "content": [
                             {"type": "text", "text": user_prompt},
-                            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{base64_image}"}}
+                            {"type": "image_url", "image_url": {"url": image_url, "detail": TASK_1_IMAGE_DETAIL}}
                         ]
                     }
                 ],
                 "max_tokens": 300
             }
+            if dynamic_prompt is not None:
+                payload["messages"].append({"role": "user", "content": dynamic_prompt})
 
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload
-            )
+            if on_sentence is not None and LLM_STREAMING:
+                deltas = self.transport.stream_chat_completion(payload, stream_info)
+                return self._read_stream(deltas, on_sentence, timer)
 
-            if response.status_code == 200:
-                data = response.json()
-                result = data['choices'][0]['message']['content'].strip()
-                # Convert to ASCII to handle special characters
-                return unidecode(result)
-            else:
-                raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
+            data = self.transport.create_chat_completion(payload)
+            stream_info["usage"] = data.get("usage")
+            stream_info["retry_count"] = data.get("_retry_count", 0)
+            result = data['choices'][0]['message']['content'].strip()
+            # Convert to ASCII to handle special characters
+            return unidecode(result)
 
         except Exception as e:
             print(f"OpenAI API Error: {e}")
             raise e
+
+        finally:
+            timer.usage = stream_info.get("usage")
+            timer.retries = stream_info.get("retry_count", 0)
+            print(f"Debug log: HTTP transport {self.transport.stats()}")
+
+    def _read_stream(self, deltas, on_sentence, timer):
+        """
+        Split a streamed completion into sentences
+
+        Args:
+            deltas (iterator): Text deltas from the transport
+            on_sentence (callable): Called with each complete sentence (ASCII)
+            timer (CallTimer): Receives the first-token time
+
+        Returns:
+            str: Full response content
+        """
+        splitter = SentenceSplitter()
+        chunks = []
+
+        for delta in deltas:
+            timer.mark_first_token()
+            chunks.append(delta)
+            for sentence in splitter.feed(delta):
+                on_sentence(unidecode(sentence))
+
+        for sentence in splitter.flush():
+            on_sentence(unidecode(sentence))
+
+        return unidecode("".join(chunks).strip())
@@ -1,9 +1,20 @@
 
-import os
+from utils.prompt_registry import get_prompt_registry
 
 class PromptHandler:
     """Handles loading and formatting of prompts from text files for Task 1"""
 
+    # Format arguments each template is rendered with (validated at startup)
+    TEMPLATE_FIELDS = {
+        "system": set(),
+        "F_1": {"shape_list_str", "object_list_str", "example_objects_str"},
+        "F_2": {"shape_list_str", "object_list_str", "example_objects_str"},
+        "F_3": {"shape_list_str", "object_list_str", "example_objects_str"}
+    }
+
+    # Stands in for object_list_str in the static part of a "prefix" layout prompt
+    DYNAMIC_FIELD_REFERENCE = "(given in the final message)"
+
     def __init__(self, task_id="task_1"):
         """
         Initialize PromptHandler
@@ -13,10 +24,13 @@ class PromptHandler:
         """
         self.task_id = task_id
         self.prompts_dir = f"prompts/{task_id}"
+        self.registry = get_prompt_registry(self.prompts_dir, self.TEMPLATE_FIELDS)
 
     def load_prompt(self, prompt_name):
         """
-        Load prompt from text file
+        Load prompt template from the in-memory registry
+
+        The file is only re-read when its modification time changes.
 
         Args:
             prompt_name (str): Name of the prompt file (without .txt extension)
@@ -27,13 +41,24 @@ class PromptHandler:
         Raises:
             FileNotFoundError: If prompt file doesn't exist
         """
-        file_path = os.path.join(self.prompts_dir, f"{prompt_name}.txt")
+        return self.registry.get(prompt_name)
+
+    def get_dynamic_prompt(self, object_list_str):
+        """
+        Get the participant-specific final message of a "prefix" layout prompt
+
+        The feedback prompt is then rendered with DYNAMIC_FIELD_REFERENCE in place
+        of object_list_str, so everything before this message is identical for every
+        request of a set and feedback level and can be served from the
+        provider's prompt cache.
 
-        try:
-            with open(file_path, 'r') as file:
-                return file.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Prompt file not found: {file_path}")
+        Args:
+            object_list_str (str): Objects already made by user
+
+        Returns:
+            str: Final user message
+        """
+        return f"Objects already made by the user: {object_list_str}"
 
     def get_system_prompt(self):
         """
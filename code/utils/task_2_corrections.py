@@ -0,0 +1,462 @@
+"""
+Task 2 Corrections Module
+Local diff of a proofreading response against the answer paragraph and the numbered error list
+"""
+
+import difflib
+import re
+import threading
+
+# "position: third sentence" in the error files
+SENTENCE_ORDINALS = [
+    "first", "second", "third", "fourth", "fifth", "sixth",
+    "seventh", "eighth", "ninth", "tenth", "eleventh", "twelfth"
+]
+
+# Words with inner apostrophes/hyphens stay whole ("don't"), punctuation is its own token
+TOKEN_PATTERN = re.compile(r"\w+(?:['’]\w+)*|[^\w\s]")
+ERROR_LINE_PATTERN = re.compile(r'^\s*(\d+)\.\s*(.+?):\s*"(.+?)"\s*(?:,\s*position:\s*(.+?))?\s*$')
+SENTENCE_END_TOKENS = {".", "!", "?"}
+
+# Similarity needed to match an error's quoted text that is not in the paragraph verbatim
+FUZZY_MATCH_CUTOFF = 0.7
+
+_checkers = {}
+_checkers_lock = threading.Lock()
+
+
+def tokenize(text):
+    """
+    Split text into word and punctuation tokens
+
+    Args:
+        text (str): Paragraph text
+
+    Returns:
+        list: Tokens
+    """
+    return TOKEN_PATTERN.findall(text)
+
+
+def normalize_token(token):
+    """
+    Normalize a token for comparison (typographic quotes only; case matters
+    because capitalization is one of the error types)
+
+    Args:
+        token (str): Token
+
+    Returns:
+        str: Normalized token
+    """
+    return token.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+
+
+def parse_error_list(error_text):
+    """
+    Parse an error/error_N.txt file
+
+    Args:
+        error_text (str): Lines of '1.  Spelling Error: "developement", position: first sentence'
+
+    Returns:
+        list: One dict per error with number, type, text, position and sentence
+              (0-based sentence index, or None if the position is not an ordinal)
+    """
+    errors = []
+    for line in error_text.splitlines():
+        match = ERROR_LINE_PATTERN.match(line)
+        if not match:
+            continue
+        position = (match.group(4) or "").strip()
+        ordinal = position.split()[0].lower() if position else ""
+        errors.append({
+            "number": int(match.group(1)),
+            "type": match.group(2).strip(),
+            "text": match.group(3).strip(),
+            "position": position,
+            "sentence": SENTENCE_ORDINALS.index(ordinal) if ordinal in SENTENCE_ORDINALS else None
+        })
+    return errors
+
+
+def get_correction_checker(paragraph_text, answer, error_list):
+    """
+    Get the shared checker for a question set, creating it on first use
+
+    Args:
+        paragraph_text (str): Original paragraph with errors
+        answer (str): Corrected answer paragraph
+        error_list (str): Content of the error file
+
+    Returns:
+        CorrectionChecker: Checker for the set
+        None: If the error list has no parsable entries
+    """
+    key = (paragraph_text, answer, error_list)
+    with _checkers_lock:
+        if key in _checkers:
+            return _checkers[key]
+
+    checker = None
+    if parse_error_list(error_list):
+        checker = CorrectionChecker(paragraph_text, answer, error_list)
+    else:
+        print("Warning: Error list has no parsable entries, corrections cannot be checked")
+
+    with _checkers_lock:
+        _checkers[key] = checker
+    return checker
+
+
+class CorrectionChecker:
+    """
+    Finds which listed errors a response fixed, missed or newly introduced
+
+    The question paragraph is aligned token by token with the answer paragraph
+    to find the span each listed error covers and what it should become. A
+    response is then aligned with both: an error is fixed when the response
+    matches the answer over its span, and an edit to text the answer keeps
+    unchanged is a newly introduced error.
+    """
+
+    def __init__(self, paragraph_text, answer, error_list):
+        """
+        Align the question with the answer and locate every listed error
+
+        Args:
+            paragraph_text (str): Original paragraph with errors
+            answer (str): Corrected answer paragraph
+            error_list (str): Content of the error file
+        """
+        self.question_tokens = tokenize(paragraph_text)
+        self.question_norm = [normalize_token(token) for token in self.question_tokens]
+        self.answer_norm = [normalize_token(token) for token in tokenize(answer)]
+
+        # Sentence index of every question token
+        self.sentence_of = []
+        sentence = 0
+        for token in self.question_tokens:
+            self.sentence_of.append(sentence)
+            if token in SENTENCE_END_TOKENS:
+                sentence += 1
+
+        # Spans the answer changes: (tag, question start, question end, answer start, answer end)
+        matcher = difflib.SequenceMatcher(None, self.question_norm, self.answer_norm, autojunk=False)
+        self.answer_opcodes = matcher.get_opcodes()
+        self.answer_edits = [opcode for opcode in self.answer_opcodes if opcode[0] != "equal"]
+
+        self.errors = parse_error_list(error_list)
+        for error in self.errors:
+            self._locate(error)
+
+    def _locate(self, error):
+        """
+        Find an error's span in the question and the answer
+
+        Sets error["span"] (question tokens) and error["answer_span"] (answer
+        tokens). The quoted text is widened to the answer edits that overlap it,
+        e.g. "bring problem" -> "brings problems", and to words the answer adds
+        or removes right next to it ("The Global" -> "Global"). Both are None if
+        the quoted text is not in the paragraph or the answer leaves it as is;
+        such errors cannot be checked and are left out of the score.
+
+        Args:
+            error (dict): Parsed error entry
+        """
+        error["span"] = error["answer_span"] = None
+
+        start = self._find(error)
+        if start is None:
+            print(f"Warning: Error {error['number']} \"{error['text']}\" not found in the paragraph")
+            return
+        end = start + len(tokenize(error["text"]))
+
+        widened = False
+        for tag, i1, i2, _, _ in self.answer_edits:
+            if (i1 < end and i2 > start) or (tag in ("insert", "delete") and i1 <= end and i2 >= start):
+                start, end = min(start, i1), max(end, i2)
+                widened = True
+        if not widened:
+            print(f"Warning: Error {error['number']} \"{error['text']}\" is not corrected in the answer")
+            return
+
+        error["span"] = (start, end)
+        error["answer_span"] = (self._to_answer(start, True), self._to_answer(end, False))
+
+    def _find(self, error):
+        """
+        Find the first token of an error's quoted text in the question
+
+        Matching ignores case. If the text does not occur exactly (the error
+        files have a few typos, e.g. "relies" for "relys"), the closest run of
+        tokens in the given sentence is used.
+
+        Args:
+            error (dict): Parsed error entry
+
+        Returns:
+            int: Token index
+            None: If nothing similar is found
+        """
+        target = [normalize_token(token).lower() for token in tokenize(error["text"])]
+        if not target:
+            return None
+        lowered = [token.lower() for token in self.question_norm]
+        starts = list(range(len(lowered) - len(target) + 1))
+
+        exact = [index for index in starts if lowered[index:index + len(target)] == target]
+        if exact:
+            # Several occurrences - prefer the one in the given sentence
+            if error["sentence"] is None:
+                return exact[0]
+            return min(exact, key=lambda index: abs(self.sentence_of[index] - error["sentence"]))
+
+        if error["sentence"] is not None:
+            starts = [index for index in starts if self.sentence_of[index] == error["sentence"]] or starts
+        text = " ".join(target)
+        best = max(starts, default=None, key=lambda index: difflib.SequenceMatcher(
+            None, text, " ".join(lowered[index:index + len(target)])).ratio())
+        if best is None or difflib.SequenceMatcher(
+                None, text, " ".join(lowered[best:best + len(target)])).ratio() < FUZZY_MATCH_CUTOFF:
+            return None
+        return best
+
+    @staticmethod
+    def _overlaps(i1, i2, start, end, inclusive=False):
+        """
+        Check whether an edit of tokens [i1, i2) touches the span [start, end)
+
+        Args:
+            i1 (int): Edit start
+            i2 (int): Edit end (equal to i1 for an insertion)
+            start (int): Span start
+            end (int): Span end
+            inclusive (bool): Count an insertion right at either end of the span
+
+        Returns:
+            bool: True if they overlap
+        """
+        if i1 == i2:
+            return start <= i1 <= end if inclusive else (start < i1 < end or start == i1 == end)
+        if start == end:
+            return i1 <= start <= i2 if inclusive else i1 < start < i2
+        return i1 < end and i2 > start
+
+    def _to_answer(self, index, is_start):
+        """
+        Map a question token boundary of an error span to the answer
+
+        Args:
+            index (int): Question token boundary
+            is_start (bool): Start of the span (else end)
+
+        Returns:
+            int: Answer token boundary
+        """
+        if is_start:
+            for tag, i1, i2, j1, j2 in self.answer_opcodes:
+                if tag == "equal" and i1 <= index < i2:
+                    return j1 + (index - i1)
+                if tag != "equal" and i1 == index:
+                    return j1
+            return len(self.answer_norm)
+
+        for tag, i1, i2, j1, j2 in reversed(self.answer_opcodes):
+            if tag == "equal" and i1 < index <= i2:
+                return j1 + (index - i1)
+            if tag != "equal" and i2 == index:
+                return j2
+        return 0
+
+    def check(self, user_response):
+        """
+        Score a response against the error list
+
+        Args:
+            user_response (str): User's submitted response
+
+        Returns:
+            dict: JSON-serializable result with
+                  score (percent of listed errors fixed), total, fixed, missed
+                  and introduced counts, completion (share of the paragraph the
+                  response reaches), errors (status per listed error:
+                  fixed, missed, attempted, not_reached or unchecked) and
+                  introduced_edits (original and changed text, sentence)
+        """
+        user_tokens = tokenize(user_response)
+        user_norm = [normalize_token(token) for token in user_tokens]
+
+        question_matcher = difflib.SequenceMatcher(None, self.question_norm, user_norm, autojunk=False)
+        question_opcodes = question_matcher.get_opcodes()
+        user_edits = [opcode for opcode in question_opcodes if opcode[0] != "equal"]
+
+        answer_matcher = difflib.SequenceMatcher(None, self.answer_norm, user_norm, autojunk=False)
+        answer_diffs = [opcode for opcode in answer_matcher.get_opcodes() if opcode[0] != "equal"]
+
+        # The response stops where the last run of matching question tokens ends
+        covered = 0
+        for tag, i1, i2, _, _ in question_opcodes:
+            if tag == "equal":
+                covered = i2
+
+        errors = []
+        for error in self.errors:
+            errors.append({
+                "number": error["number"],
+                "type": error["type"],
+                "text": error["text"],
+                "position": error["position"],
+                "status": self._error_status(error, user_edits, answer_diffs, covered),
+                "user_text": self._user_text(error, question_opcodes, user_tokens)
+            })
+
+        # Edits to text the answer keeps unchanged (ignoring the unfinished tail)
+        introduced_edits = []
+        for tag, i1, i2, j1, j2 in user_edits:
+            if i1 >= covered and i2 == len(self.question_norm):
+                continue
+            spans = [(a1, a2) for _, a1, a2, _, _ in self.answer_edits]
+            spans += [error["span"] for error in self.errors if error["span"] is not None]
+            if any(self._overlaps(i1, i2, start, end, inclusive=True) for start, end in spans):
+                continue
+            introduced_edits.append({
+                "original": " ".join(self.question_tokens[i1:i2]),
+                "changed": " ".join(user_tokens[j1:j2]),
+                "sentence": self.sentence_of[min(i1, len(self.sentence_of) - 1)] if self.sentence_of else 0
+            })
+
+        located = [error for error in errors if error["status"] != "unchecked"]
+        fixed = sum(error["status"] == "fixed" for error in located)
+        return {
+            "score": round(100 * fixed / len(located), 1) if located else 0.0,
+            "total": len(located),
+            "fixed": fixed,
+            "missed": len(located) - fixed,
+            "introduced": len(introduced_edits),
+            "completion": round(covered / len(self.question_norm), 2) if self.question_norm else 0.0,
+            "errors": errors,
+            "introduced_edits": introduced_edits
+        }
+
+    def _error_status(self, error, user_edits, answer_diffs, covered):
+        """
+        Classify one listed error
+
+        Returns:
+            str: fixed, missed (left as in the question), attempted (changed but
+                 not to the answer), not_reached (after the end of the response)
+                 or unchecked (see _locate)
+        """
+        if error["span"] is None:
+            return "unchecked"
+
+        start, end = error["span"]
+        answer_start, answer_end = error["answer_span"]
+        if not any(self._overlaps(i1, i2, answer_start, answer_end, inclusive=True)
+                   for _, i1, i2, _, _ in answer_diffs):
+            return "fixed"
+
+        if start >= covered:
+            return "not_reached"
+        if any(self._overlaps(i1, i2, start, end, inclusive=True) for _, i1, i2, _, _ in user_edits):
+            return "attempted"
+        return "missed"
+
+    def _user_text(self, error, question_opcodes, user_tokens):
+        """
+        Text of the response over an error's span
+
+        Returns:
+            str: The participant's version of the span ("" if not located)
+        """
+        if error["span"] is None:
+            return ""
+
+        start, end = error["span"]
+        user_start, user_end = None, None
+        for tag, i1, i2, j1, j2 in question_opcodes:
+            if user_start is None and i2 >= start and (i2 > start or i1 == i2 == start):
+                user_start = j1 + (start - i1) if tag == "equal" else j1
+            if i2 >= end and (i2 > end or tag != "insert"):
+                user_end = j1 + (end - i1) if tag == "equal" else j2
+                break
+        if user_start is None:
+            return ""
+        if user_end is None:
+            user_end = len(user_tokens)
+        return " ".join(user_tokens[user_start:user_end])
+
+    def overview(self):
+        """
+        Describe the listed errors for the prompt context
+
+        Errors that cannot be checked (see _locate) are left out, so the count
+        matches the "Listed errors" line of summarize().
+
+        Returns:
+            str: e.g. "14 errors across 6 types:\nGrammar (5), Spelling (4), ..., and Consistency (1)"
+        """
+        counts = {}
+        for error in self.errors:
+            if error["span"] is None:
+                continue
+            error_type = re.sub(r"\s+error$", "", error["type"], flags=re.IGNORECASE)
+            counts[error_type] = counts.get(error_type, 0) + 1
+
+        # Most frequent first; ties keep the error list order
+        parts = [f"{error_type} ({count})" for error_type, count in sorted(counts.items(), key=lambda item: -item[1])]
+        if len(parts) > 1:
+            parts[-1] = "and " + parts[-1]
+        return f"{sum(counts.values())} errors across {len(counts)} types:\n{', '.join(parts)}"
+
+    def summarize(self, result):
+        """
+        Format a check() result as the compact summary sent to the LLM
+
+        Corrections are not included, so the feedback cannot give them away.
+
+        Args:
+            result (dict): Result of check()
+
+        Returns:
+            str: Correction summary
+        """
+        lines = [
+            f"Listed errors: {result['total']}. Fixed: {result['fixed']}. "
+            f"Not fixed: {result['missed']}. Newly introduced errors: {result['introduced']}.",
+            f"The response covers {round(result['completion'] * 100)}% of the paragraph."
+        ]
+
+        fixed = [error for error in result["errors"] if error["status"] == "fixed"]
+        if fixed:
+            lines.append("Fixed: " + ", ".join(f"{error['type']} \"{error['text']}\"" for error in fixed))
+
+        remaining = [error for error in result["errors"] if error["status"] in ("missed", "attempted")]
+        if remaining:
+            lines.append("Not fixed:")
+            for error in remaining:
+                if error["status"] == "attempted":
+                    detail = f"changed to \"{error['user_text']}\", still incorrect"
+                else:
+                    detail = "unchanged"
+                lines.append(f"- {error['type']} \"{error['text']}\" ({error['position']}): {detail}")
+
+        not_reached = [error for error in result["errors"] if error["status"] == "not_reached"]
+        if not_reached:
+            lines.append("Not reached (after the end of the response): " + ", ".join(
+                f"{error['type']} \"{error['text']}\" ({error['position']})" for error in not_reached))
+
+        if result["introduced_edits"]:
+            lines.append("Newly introduced errors:")
+            for edit in result["introduced_edits"]:
+                if not edit["changed"]:
+                    change = f"\"{edit['original']}\" removed"
+                elif not edit["original"]:
+                    change = f"\"{edit['changed']}\" added"
+                else:
+                    change = f"\"{edit['original']}\" changed to \"{edit['changed']}\""
+                position = SENTENCE_ORDINALS[edit["sentence"]] if edit["sentence"] < len(SENTENCE_ORDINALS) else "later"
+                lines.append(f"- {change} ({position} sentence)")
+
+        return "\n".join(lines)
@@ -29,7 +29,8 @@ class DataManager:
 
     def collect_data(self, phase, sub_id, task_id, agent_id, feedback_level,
                      set_number, user_response, openai_response="",
-                     submission_time=None, time_left=None):
+                     submission_time=None, time_left=None, llm_calls=None, corrections=None,
+                     speech=None, llm_outcome=None):
         """
         Collect and save phase data to JSON file
 
@@ -44,6 +45,11 @@ class DataManager:
             openai_response (str): OpenAI generated response
             submission_time (float): Timestamp of submission
             time_left (int): Remaining time when submitted
+            llm_calls (list): Per-call LLM latency/token records for this phase
+            corrections (dict): Correction score of the response (CorrectionChecker.check)
+            speech (list): Records of the agent utterances played (SpeechQueue.drain_records)
+            llm_outcome (dict): Request policy outcome of openai_response ("primary", "hedge"
+                                or "fallback" for the canned feedback)
 
         Returns:
             str: Success message
@@ -63,6 +69,14 @@ class DataManager:
             f"Submission_timestamp{phase}": submission_time,
             f"Time_Left_{phase}": time_left
         }
+        if llm_outcome is not None:
+            data[f"LLM_Outcome_{phase}"] = llm_outcome
+        if llm_calls is not None:
+            data[f"LLM_Calls_{phase}"] = llm_calls
+        if corrections is not None:
+            data[f"Corrections_{phase}"] = corrections
+        if speech is not None:
+            data[f"Speech_{phase}"] = speech
 
         # Create directory if it doesn't exist
         directory_path = get_data_directory_path(task_id, agent_id, sub_id, feedback_level)
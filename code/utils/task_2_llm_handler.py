@@ -1,18 +1,53 @@
 
-from openai import OpenAI
+import json
 from unidecode import unidecode
-from config.config import OPENAI_API_KEY, OPENAI_MODEL
+from config.config import (
+    OPENAI_MODEL, LLM_STREAMING, TASK_2_F1_MODE, TASK_2_PROMPT_INPUT, PROMPT_LAYOUT, FALLBACK_FEEDBACK
+)
 from utils.task_2_prompt_handler import PromptHandler
+from utils.sentence_stream import SentenceSplitter, split_sentences
+from utils.response_cache import get_response_cache, ResponseCache
+from utils.http_transport import get_transport
+from utils.llm_metrics import CallTimer, LLMCallLog, call_context
+from utils.request_policy import create_request_policy
+from utils.feedback_backends import create_local_backend, LocalFeedbackMixin
+from utils.task_2_corrections import get_correction_checker
 
-class LLMHandler:
+# Structured output for single-call F_1: analysis and spoken feedback in one response
+F1_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "f1_feedback",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "analysis": {"type": "string"},
+                "feedback": {"type": "string"}
+            },
+            "required": ["analysis", "feedback"],
+            "additionalProperties": False
+        }
+    }
+}
+
+class LLMHandler(LocalFeedbackMixin):
     """Handles all OpenAI API interactions"""
 
     def __init__(self):
-        """Initialize OpenAI client and prompt handler"""
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        """Initialize shared HTTP transport and prompt handler"""
+        self.transport = get_transport()
         self.prompt_handler = PromptHandler()
+        self.cache = get_response_cache()
+        self.f1_mode = TASK_2_F1_MODE
+        self.prompt_input = TASK_2_PROMPT_INPUT
+        self.prompt_layout = PROMPT_LAYOUT
+        self.call_log = LLMCallLog()
+        self.request_policy = create_request_policy()
+        self.local_backend = create_local_backend("task_2")
 
-    def get_feedback_response(self, feedback_level, paragraph_text, answer, error_list, user_response):
+    def get_feedback_response(self, feedback_level, paragraph_text, answer, error_list, user_response,
+                              on_sentence=None, subject_id=None, return_outcome=False):
         """
         Get feedback response from OpenAI based on feedback level
 
@@ -22,62 +57,225 @@ class LLMHandler:
             answer (str): Corrected answer paragraph
             error_list (str): List of errors and their types
             user_response (str): User's submitted response
+            on_sentence (callable): If given and LLM_STREAMING is enabled, the final
+                                    response is streamed and on_sentence(sentence) is
+                                    called as soon as each sentence completes
+            subject_id (str): Participant ID (used by the local backend to avoid repeats)
+            return_outcome (bool): Also return the request policy outcome, so callers
+                                   can tell real feedback from the canned fallback
+
+        Levels in LOCAL_FEEDBACK_LEVELS are answered by the local backend. With
+        the request policy enabled, a slow request is hedged with a duplicate
+        and canned feedback is returned if nothing arrives before the deadline.
 
         Returns:
             str: OpenAI generated feedback response
             str: Empty string for F_4 (no feedback)
+            tuple: (response, outcome) if return_outcome is set; outcome is the policy
+                   outcome dict ("outcome" is "primary", "hedge" or "fallback"), or None
+                   when no request policy was applied
 
         Raises:
             Exception: If OpenAI API call fails
         """
+        response, outcome = self._get_feedback_response(
+            feedback_level, paragraph_text, answer, error_list, user_response, on_sentence, subject_id
+        )
+        return (response, outcome) if return_outcome else response
+
+    def _get_feedback_response(self, feedback_level, paragraph_text, answer, error_list, user_response,
+                               on_sentence, subject_id):
+        """
+        Generate feedback and report how the request policy answered
+
+        Args: as for get_feedback_response
+
+        Returns:
+            tuple: (response, outcome dict or None)
+        """
         # F_4 has no feedback
         if feedback_level == "F_4":
-            return ""
+            return "", None
 
-        try:
-            # Get appropriate prompt for feedback level
-            user_prompt = self.prompt_handler.get_prompt_for_feedback_level(
-                feedback_level, paragraph_text, answer, error_list, user_response
-            )
+        if self.uses_local_backend(feedback_level):
+            return self._generate_local_feedback(feedback_level, subject_id, on_sentence), None
 
-            if user_prompt is None:
-                return ""
+        try:
+            with call_context(feedback_level=feedback_level):
+                if self.request_policy is None:
+                    return self._generate_feedback(feedback_level, paragraph_text, answer, error_list,
+                                                   user_response, on_sentence), None
 
-            # Special handling for F_1 - requires two API calls
-            if feedback_level == "F_1":
-                return self._handle_f1_feedback(user_prompt)
-            else:
-                return self._make_api_call(user_prompt)
+                # Run the whole feedback pipeline under the deadline, hedging a slow request
+                timer = CallTimer(OPENAI_MODEL, "request_policy")
+                response, outcome = self.request_policy.run(
+                    lambda attempt_on_sentence: self._generate_feedback(
+                        feedback_level, paragraph_text, answer, error_list, user_response, attempt_on_sentence
+                    ),
+                    feedback_level, FALLBACK_FEEDBACK["task_2"][feedback_level], on_sentence
+                )
+                record = timer.finish()
+                record.update(outcome)
+                self.call_log.add(record)
+                return response, outcome
 
         except Exception as e:
             print(f"Error in LLM Handler: {e}")
             raise e
 
-    def _handle_f1_feedback(self, initial_prompt):
+    def _generate_feedback(self, feedback_level, paragraph_text, answer, error_list, user_response,
+                           on_sentence=None):
+        """
+        Build the prompt for a feedback level and make the API call(s)
+
+        Args:
+            feedback_level (str): Feedback level (F_1, F_2, F_3)
+            paragraph_text (str): Original paragraph with errors
+            answer (str): Corrected answer paragraph
+            error_list (str): List of errors and their types
+            user_response (str): User's submitted response
+            on_sentence (callable): Sentence callback for the spoken response
+
+        Returns:
+            str: OpenAI generated feedback response
+        """
+        single_call = feedback_level == "F_1" and self.f1_mode == "single"
+        user_prompt, dynamic_prompt = self._build_prompt(
+            feedback_level, paragraph_text, answer, error_list, user_response, single_call
+        )
+
+        if user_prompt is None:
+            return ""
+
+        # Single-call F_1 - analysis and conversational rewrite in one structured response
+        if single_call:
+            return self._handle_f1_single_call(user_prompt, on_sentence, dynamic_prompt)
+
+        # Special handling for F_1 - requires two API calls
+        if feedback_level == "F_1":
+            return self._handle_f1_feedback(user_prompt, on_sentence, dynamic_prompt)
+        else:
+            return self._make_api_call(user_prompt, on_sentence, dynamic_prompt=dynamic_prompt)
+
+    def _build_prompt(self, feedback_level, paragraph_text, answer, error_list, user_response, structured=False):
+        """
+        Build the feedback prompt and, in the prefix layout, its final message
+
+        In "summary" prompt input the response is first checked locally against
+        the answer and error list, and only the correction summary is sent.
+
+        Args:
+            feedback_level (str): Feedback level (F_1, F_2, F_3)
+            paragraph_text (str): Original paragraph with errors
+            answer (str): Corrected answer paragraph
+            error_list (str): List of errors and their types
+            user_response (str): User's submitted response
+            structured (bool): Build the single-call F_1 structured-output prompt
+
+        Returns:
+            tuple: (user prompt or None for F_4, final user message or None)
+        """
+        checker = None
+        if self.prompt_input == "summary":
+            checker = get_correction_checker(paragraph_text, answer, error_list)
+
+        # Prefix layout - the participant data goes in a final message so the rest is a cacheable prefix
+        dynamic_prompt = None
+
+        if checker is not None:
+            correction_summary = checker.summarize(checker.check(user_response))
+            if self.prompt_layout == "prefix":
+                dynamic_prompt = self.prompt_handler.get_dynamic_summary_prompt(correction_summary)
+                correction_summary = self.prompt_handler.DYNAMIC_FIELD_REFERENCE
+            user_prompt = self.prompt_handler.get_summary_prompt(
+                feedback_level, checker.overview(), correction_summary, structured
+            )
+            return user_prompt, dynamic_prompt
+
+        if self.prompt_layout == "prefix":
+            dynamic_prompt = self.prompt_handler.get_dynamic_prompt(user_response)
+            user_response = self.prompt_handler.DYNAMIC_FIELD_REFERENCE
+
+        if structured:
+            user_prompt = self.prompt_handler.get_f1_structured_prompt(
+                paragraph_text, answer, error_list, user_response
+            )
+        else:
+            user_prompt = self.prompt_handler.get_prompt_for_feedback_level(
+                feedback_level, paragraph_text, answer, error_list, user_response
+            )
+        return user_prompt, dynamic_prompt
+
+    def _handle_f1_feedback(self, initial_prompt, on_sentence=None, dynamic_prompt=None):
         """
         Handle F_1 feedback which requires two API calls
 
         Args:
             initial_prompt (str): The initial F_1 prompt
+            on_sentence (callable): Sentence callback for the streamed rewrite call
+            dynamic_prompt (str): Final message of the initial call in the prefix layout
 
         Returns:
             str: Processed conversational feedback
         """
-        # First API call - get initial detailed response
-        initial_response = self._make_api_call(initial_prompt)
+        # First API call - get initial detailed response (never spoken, so not streamed)
+        initial_response = self._make_api_call(initial_prompt, stage="f1_initial", dynamic_prompt=dynamic_prompt)
 
         # Second API call - rewrite in conversational style
         rewrite_prompt = self.prompt_handler.get_f1_rewrite_prompt(initial_response)
-        final_response = self._make_api_call(rewrite_prompt)
+        final_response = self._make_api_call(rewrite_prompt, on_sentence, stage="f1_rewrite")
+
+        return final_response
+
+    def _handle_f1_single_call(self, user_prompt, on_sentence=None, dynamic_prompt=None):
+        """
+        Handle F_1 feedback with one structured-output API call
+
+        The JSON response is not streamed because the spoken "feedback" field
+        follows the "analysis" field; its sentences are emitted once it arrives.
+
+        Args:
+            user_prompt (str): F_1 prompt with structured-output instructions
+            on_sentence (callable): Receives each sentence of the spoken feedback
+            dynamic_prompt (str): Final user message in the prefix layout
+
+        Returns:
+            str: Conversational feedback
+
+        Raises:
+            ValueError: If the response is not the expected JSON object
+        """
+        raw_response = self._make_api_call(user_prompt, response_format=F1_RESPONSE_FORMAT, stage="f1_structured",
+                                           dynamic_prompt=dynamic_prompt)
+
+        try:
+            result = json.loads(raw_response)
+            final_response = unidecode(result["feedback"]).strip()
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Unexpected F_1 structured response: {raw_response}")
+
+        print(f"Debug log: F_1 analysis: {unidecode(result.get('analysis', ''))}")
+
+        if on_sentence is not None:
+            for sentence in split_sentences(final_response):
+                on_sentence(sentence)
 
         return final_response
 
-    def _make_api_call(self, user_prompt):
+    def _make_api_call(self, user_prompt, on_sentence=None, response_format=None, stage="feedback",
+                       dynamic_prompt=None):
         """
         Make API call to OpenAI
 
         Args:
             user_prompt (str): The user prompt to send
+            on_sentence (callable): If given and LLM_STREAMING is enabled, stream the
+                                    completion and pass each finished sentence to it
+            response_format (dict): Optional structured-output format; the raw JSON
+                                    text is returned and the call is never streamed
+            stage (str): Call label stored in the call record
+            dynamic_prompt (str): Participant-specific text sent as a final user message
+                                  after the static prompt (prefix layout)
 
         Returns:
             str: OpenAI response content
@@ -85,19 +283,145 @@ class LLMHandler:
         Raises:
             Exception: If API call fails
         """
+        system_prompt = self.prompt_handler.get_system_prompt()
+        messages = self._build_messages(system_prompt, user_prompt, dynamic_prompt)
+        streamed = response_format is None and on_sentence is not None and LLM_STREAMING
+        timer = CallTimer(OPENAI_MODEL, stage, streamed)
+
+        # Serve identical requests from the cache (disabled for real study sessions)
+        cache_key = None
+        if self.cache is not None:
+            format_key = json.dumps(response_format, sort_keys=True) if response_format else None
+            cache_prompt = user_prompt if dynamic_prompt is None else json.dumps([user_prompt, dynamic_prompt])
+            cache_key = ResponseCache.make_key(OPENAI_MODEL, system_prompt, cache_prompt, format_key)
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                print(f"Debug log: LLM cache hit {self.cache.stats()}")
+                self.call_log.add(timer.finish(cache_hit=True))
+                if on_sentence is not None:
+                    for sentence in split_sentences(cached_response):
+                        on_sentence(sentence)
+                return cached_response
+
+        error = None
         try:
-            response = self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": self.prompt_handler.get_system_prompt()},
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
+            if streamed:
+                openai_response = self._make_streaming_api_call(messages, on_sentence, timer)
+            else:
+                openai_response = self._make_blocking_api_call(messages, timer, response_format)
+        except Exception as e:
+            error = e
+            raise e
+        finally:
+            self.call_log.add(timer.finish(error=error))
+
+        if self.cache is not None:
+            self.cache.put(cache_key, openai_response)
+
+        return openai_response
+
+    def _build_messages(self, system_prompt, user_prompt, dynamic_prompt=None):
+        """
+        Build the chat messages, static content first
+
+        Args:
+            system_prompt (str): The system prompt to send
+            user_prompt (str): The user prompt to send
+            dynamic_prompt (str): Optional participant-specific final message
+
+        Returns:
+            list: Chat messages
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        if dynamic_prompt is not None:
+            messages.append({"role": "user", "content": dynamic_prompt})
+        return messages
+
+    def _make_blocking_api_call(self, messages, timer, response_format=None):
+        """
+        Make a non-streaming API call to OpenAI
+
+        Args:
+            messages (list): Chat messages to send
+            timer (CallTimer): Receives usage and retry count
+            response_format (dict): Optional structured-output format
+
+        Returns:
+            str: OpenAI response content (raw JSON text when response_format is set)
+
+        Raises:
+            Exception: If API call fails
+        """
+        try:
+            payload = {
+                "model": OPENAI_MODEL,
+                "messages": messages
+            }
+            if response_format is not None:
+                payload["response_format"] = response_format
+
+            data = self.transport.create_chat_completion(payload)
+            timer.usage = data.get("usage")
+            timer.retries = data.get("_retry_count", 0)
+
+            openai_response = data['choices'][0]['message']['content']
+            if response_format is not None:
+                # unidecode would turn curly quotes inside strings into unescaped JSON quotes
+                return openai_response
 
-            openai_response = response.choices[0].message.content
             # Convert to ASCII to handle special characters
             return unidecode(openai_response)
 
         except Exception as e:
             print(f"OpenAI API Error: {e}")
-            raise e
\ No newline at end of file
+            raise e
+
+        finally:
+            print(f"Debug log: HTTP transport {self.transport.stats()}")
+
+    def _make_streaming_api_call(self, messages, on_sentence, timer):
+        """
+        Make a streaming API call to OpenAI and emit sentences as they complete
+
+        Args:
+            messages (list): Chat messages to send
+            on_sentence (callable): Called with each complete sentence (ASCII)
+            timer (CallTimer): Receives first-token time, usage and retry count
+
+        Returns:
+            str: Full OpenAI response content
+
+        Raises:
+            Exception: If API call fails
+        """
+        stream_info = {}
+        try:
+            deltas = self.transport.stream_chat_completion({
+                "model": OPENAI_MODEL,
+                "messages": messages
+            }, stream_info)
+
+            splitter = SentenceSplitter()
+            chunks = []
+            for delta in deltas:
+                timer.mark_first_token()
+                chunks.append(delta)
+                for sentence in splitter.feed(delta):
+                    on_sentence(unidecode(sentence))
+
+            for sentence in splitter.flush():
+                on_sentence(unidecode(sentence))
+
+            return unidecode("".join(chunks))
+
+        except Exception as e:
+            print(f"OpenAI API Error: {e}")
+            raise e
+
+        finally:
+            timer.usage = stream_info.get("usage")
+            timer.retries = stream_info.get("retry_count", 0)
+            print(f"Debug log: HTTP transport {self.transport.stats()}")
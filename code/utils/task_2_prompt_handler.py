@@ -1,10 +1,25 @@
 
 
-import os
+from utils.prompt_registry import get_prompt_registry
 
 class PromptHandler:
     """Handles loading and formatting of prompts from text files"""
 
+    # Format arguments each template is rendered with (validated at startup)
+    TEMPLATE_FIELDS = {
+        "system": set(),
+        "F_1": {"paragraph_text", "answer", "error_list", "user_response"},
+        "F_1_structured": set(),
+        "F_2": {"paragraph_text", "answer", "error_list", "user_response"},
+        "F_3": {"paragraph_text", "answer", "error_list", "user_response"},
+        "F_1_summary": {"error_overview", "correction_summary"},
+        "F_2_summary": {"error_overview", "correction_summary"},
+        "F_3_summary": {"error_overview", "correction_summary"}
+    }
+
+    # Stands in for user_response (or correction_summary) in the static part of a "prefix" layout prompt
+    DYNAMIC_FIELD_REFERENCE = "(given in the final message)"
+
     def __init__(self, task_id="task_2"):
         """
         Initialize PromptHandler
@@ -14,10 +29,13 @@ class PromptHandler:
         """
         self.task_id = task_id
         self.prompts_dir = f"prompts/{task_id}"
+        self.registry = get_prompt_registry(self.prompts_dir, self.TEMPLATE_FIELDS)
 
     def load_prompt(self, prompt_name):
         """
-        Load prompt from text file
+        Load prompt template from the in-memory registry
+
+        The file is only re-read when its modification time changes.
 
         Args:
             prompt_name (str): Name of the prompt file (without .txt extension)
@@ -28,13 +46,36 @@ class PromptHandler:
         Raises:
             FileNotFoundError: If prompt file doesn't exist
         """
-        file_path = os.path.join(self.prompts_dir, f"{prompt_name}.txt")
+        return self.registry.get(prompt_name)
+
+    def get_dynamic_prompt(self, user_response):
+        """
+        Get the participant-specific final message of a "prefix" layout prompt
+
+        The feedback prompt is then rendered with DYNAMIC_FIELD_REFERENCE in place
+        of user_response, so everything before this message is identical for every
+        request of a set and feedback level and can be served from the
+        provider's prompt cache.
+
+        Args:
+            user_response (str): User's submitted response
+
+        Returns:
+            str: Final user message
+        """
+        return f"User's submitted response:\n{user_response}"
 
-        try:
-            with open(file_path, 'r') as file:
-                return file.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Prompt file not found: {file_path}")
+    def get_dynamic_summary_prompt(self, correction_summary):
+        """
+        Get the final message of a "prefix" layout summary prompt
+
+        Args:
+            correction_summary (str): Summary of the response's corrections
+
+        Returns:
+            str: Final user message
+        """
+        return f"Correction summary:\n{correction_summary}"
 
     def get_system_prompt(self):
         """
@@ -84,6 +125,23 @@ class PromptHandler:
 Rewrite this in a conversational style at maximum of two sentences.
 '''
 
+    def get_f1_structured_prompt(self, paragraph_text, answer, error_list, user_response):
+        """
+        Get single-call F_1 prompt that asks for the analysis and the conversational
+        rewrite together as a JSON object
+
+        Args:
+            paragraph_text (str): Original paragraph with errors
+            answer (str): Corrected answer paragraph
+            error_list (str): List of errors and their types
+            user_response (str): User's submitted response
+
+        Returns:
+            str: Formatted F_1 prompt with the structured-output instructions appended
+        """
+        f1_prompt = self.get_f1_prompt(paragraph_text, answer, error_list, user_response)
+        return f1_prompt + self.load_prompt("F_1_structured")
+
     def get_f2_prompt(self, paragraph_text, answer, error_list, user_response):
         """
         Get F_2 feedback prompt with parameters filled in
@@ -126,6 +184,35 @@ Rewrite this in a conversational style at maximum of two sentences.
             user_response=user_response
         )
 
+    def get_summary_prompt(self, feedback_level, error_overview, correction_summary, structured=False):
+        """
+        Get the feedback prompt that gives the LLM the correction summary instead
+        of the full paragraphs, error list and response
+
+        Args:
+            feedback_level (str): F_1, F_2, F_3, or F_4
+            error_overview (str): Error count by type from CorrectionChecker.overview
+            correction_summary (str): Summary from CorrectionChecker.summarize
+            structured (bool): Append the single-call F_1 structured-output instructions
+
+        Returns:
+            str: Formatted prompt
+            None: For F_4 (no feedback)
+
+        Raises:
+            ValueError: If feedback level is unknown
+        """
+        if feedback_level == "F_4":
+            return None  # No feedback for F_4
+        if feedback_level not in ("F_1", "F_2", "F_3"):
+            raise ValueError(f"Unknown feedback level: {feedback_level}")
+
+        template = self.load_prompt(f"{feedback_level}_summary")
+        prompt = template.format(error_overview=error_overview, correction_summary=correction_summary)
+        if structured:
+            prompt += self.load_prompt("F_1_structured")
+        return prompt
+
     def get_prompt_for_feedback_level(self, feedback_level, paragraph_text, answer, error_list, user_response):
         """
         Factory function to get the appropriate prompt based on feedback level
@@ -1,20 +1,79 @@
 
 import os
 import io
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
-from playsound import playsound
 from google.cloud import texttospeech
 from config.config import (
-    GOOGLE_CREDENTIALS_PATH, TTS_LANGUAGE, TTS_VOICE_NAME,
-    TEMP_AUDIO_FILE, OUTPUT_AUDIO_FILE
+    GOOGLE_CREDENTIALS_PATH, TTS_LANGUAGE, TTS_VOICE_NAME, TTS_WARM_UP_TEXT, AUDIO_SAMPLE_RATE,
+    TTS_CHUNKED, TTS_CHUNK_MAX_CHARS, TTS_CHUNK_PREFETCH,
+    TTS_ENGINES, TTS_RACE_ENGINES, TTS_RACE_HEDGE_DELAY, TTS_ENGINE_DEADLINES, TTS_RACE_MIN_SAMPLES,
+    TTS_LOCAL_SYNTHESIZER, TTS_LOCAL_COMMAND, TTS_LOCAL_VOICE, TTS_LOCAL_RATE,
+    TTS_PIPER_MODEL, TTS_PIPER_SAMPLE_RATE
 )
+from utils.audio_output import get_audio_output
+from utils.audio_cache import get_audio_cache, AudioCache
+from utils.sentence_stream import split_chunks
+from utils.tts_race import TTSRace
 
 class TTSHandler:
     """Handles text-to-speech functionality"""
 
+    # Prefetched chunks kept for utterances that have not been spoken yet
+    PREFETCH_ENTRIES = 8
+
     def __init__(self):
         """Initialize TTS handler"""
-        pass
+        self.audio_output = get_audio_output()
+        self.audio_cache = get_audio_cache()
+
+        # One Google Cloud TTS client (and gRPC channel) for the whole process
+        self.cloud_client = None
+        self._client_lock = threading.Lock()
+        self.cloud_voice = texttospeech.VoiceSelectionParams(
+            language_code=TTS_LANGUAGE,
+            name=TTS_VOICE_NAME
+        )
+        # Request uncompressed PCM at the output stream's rate (nothing to decode)
+        self.cloud_audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+            sample_rate_hertz=AUDIO_SAMPLE_RATE
+        )
+
+        # Setup vs synthesis timing
+        self._stats_lock = threading.Lock()
+        self.client_setup_time = None
+        self.warm_up_time = None
+        self.synthesis_count = 0
+        self.synthesis_time = 0.0
+        self.last_synthesis_time = None
+        self.last_time_to_first_audio = None
+        self.last_utterance_time = None
+
+        # Synthesizes the next chunks while the current one plays
+        self.chunk_executor = ThreadPoolExecutor(max_workers=TTS_CHUNK_PREFETCH + 1,
+                                                 thread_name_prefix="tts-chunk")
+
+        # Synthesizes the start of the next queued utterance while the current one plays
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-prefetch")
+        self._prefetched = OrderedDict()
+        self._prefetch_lock = threading.Lock()
+
+        # Hedges the preferred engine with the other one and tracks which is faster
+        self.tts_race = TTSRace(self.synthesize, TTS_ENGINES, TTS_ENGINE_DEADLINES,
+                                TTS_RACE_HEDGE_DELAY, TTS_RACE_MIN_SAMPLES)
+
+        # Open the output stream now so the first utterance does not wait for the device
+        try:
+            self.audio_output.open()
+        except Exception as e:
+            print(f"Warning: Audio output not available yet: {e}")
 
     def speak_with_gtts(self, text):
         """
@@ -29,21 +88,7 @@ class TTSHandler:
         try:
             print("Debug log: Using gTTS for TTS...")
 
-            tts = gTTS(text=text, lang='en')
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-
-            # Save to temporary file
-            with open(TEMP_AUDIO_FILE, "wb") as f:
-                f.write(audio_buffer.read())
-
-            # Play the audio
-            playsound(TEMP_AUDIO_FILE)
-
-            # Clean up temporary file
-            if os.path.exists(TEMP_AUDIO_FILE):
-                os.remove(TEMP_AUDIO_FILE)
+            self.speak_with_engine(text, "gtts")
 
         except Exception as e:
             print(f"gTTS Error: {e}")
@@ -60,75 +105,503 @@ class TTSHandler:
             Exception: If TTS conversion or playback fails
         """
         try:
-            # Set Google Cloud credentials
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_CREDENTIALS_PATH
+            self.speak_with_engine(text, "google_cloud")
+
+        except Exception as e:
+            print(f"Google Cloud TTS Error: {e}")
+            raise e
+
+    def speak_with_local(self, text):
+        """
+        Convert text to speech using the local synthesizer (espeak-ng or Piper)
+
+        Args:
+            text (str): Text to convert to speech
+
+        Raises:
+            Exception: If TTS conversion or playback fails
+        """
+        try:
+            self.speak_with_engine(text, "local")
 
-            # Initialize client
-            client = texttospeech.TextToSpeechClient()
+        except Exception as e:
+            print(f"Local TTS Error: {e}")
+            raise e
 
-            # Set input text
-            input_text = texttospeech.SynthesisInput(text=text)
+    def speak_with_engine(self, text, engine, race=False, stop_event=None):
+        """
+        Synthesize and play text, chunk by chunk when TTS_CHUNKED is enabled
 
-            # Build voice request
-            voice = texttospeech.VoiceSelectionParams(
-                language_code=TTS_LANGUAGE,
-                name=TTS_VOICE_NAME
-            )
+        The text is split into sentences (long ones at clauses). Chunk N+1 is
+        synthesized while chunk N plays, and the chunks are written back to back
+        on the output stream with their padding silence trimmed, so the wait
+        before speech starts is that of the first chunk only.
 
-            # Select audio file format
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
-            )
+        With race=True the first chunk is raced across the engines and the rest
+        of the utterance uses the winner, so the voice does not change mid-feedback.
+        If a later chunk fails, that chunk is synthesized again with the next
+        engine in the ranking (and the rest of the utterance uses that engine),
+        instead of failing part-way through the sentence; a failure of the first
+        chunk is raised, so the caller can fall back before anything has played.
 
-            # Perform text-to-speech request
-            response = client.synthesize_speech(
-                input=input_text,
-                voice=voice,
-                audio_config=audio_config
-            )
+        Args:
+            text (str): Text to convert to speech
+            engine (str): "google_cloud", "gtts" or "local" (with race=True, the preferred engine)
+            race (bool): Race the engines for the first chunk
+            stop_event (threading.Event): Optional event that stops playback early
+
+        Returns:
+            dict: engine (of the last chunk played), engines (every engine that
+                  played a chunk), chunks, time_to_first_audio_s, total_s and stopped
+
+        Raises:
+            Exception: If synthesis or playback fails
+        """
+        chunks = split_chunks(text, TTS_CHUNK_MAX_CHARS) if TTS_CHUNKED else [text]
+        chunks = chunks or [text]
+        start = time.perf_counter()
+        time_to_first_audio = None
+        stopped = False
+
+        if race:
+            # Audio cached (or already prefetched) for either engine beats any network request
+            cached_engine = next((name for name in self.tts_race.engine_stats.ranking(engine)
+                                  if self.is_cached(chunks[0], name) or self.is_prefetched(chunks[0], name)), None)
+            race = cached_engine is None
+            engine = cached_engine or engine
+
+        # Engine each chunk was submitted to (a fallback changes it for later chunks)
+        chunk_engines = [engine]
+        if race:
+            futures = [self.chunk_executor.submit(self.tts_race.run, chunks[0], engine)]
+        else:
+            chunk_engines = [engine] * len(chunks[:TTS_CHUNK_PREFETCH + 1])
+            futures = [self._submit_chunk(chunk, engine) for chunk in chunks[:TTS_CHUNK_PREFETCH + 1]]
+        chunk_engine = engine
+        engines_used = []
+        try:
+            with self.audio_output.exclusive():
+                for index in range(len(chunks)):
+                    if stop_event is not None and stop_event.is_set():
+                        stopped = True
+                        break
 
-            # Save audio to file
-            with open(OUTPUT_AUDIO_FILE, "wb") as out:
-                out.write(response.audio_content)
-                print("Playing audio")
+                    if race and index == 0:
+                        engine, audio_content, encoding = futures[index].result()
+                        chunk_engine = engine
+                    elif index == 0:
+                        audio_content, encoding = futures[index].result()
+                        chunk_engine = engine
+                    else:
+                        chunk_engine = chunk_engines[index]
+                        try:
+                            audio_content, encoding = futures[index].result()
+                        except Exception as e:
+                            chunk_engine, audio_content, encoding = self._synthesize_chunk_fallback(
+                                chunks[index], chunk_engine, e
+                            )
+                            engine = chunk_engine  # chunks not yet submitted use the fallback engine
+                    if chunk_engine not in engines_used:
+                        engines_used.append(chunk_engine)
 
-            # Play the audio
-            playsound(OUTPUT_AUDIO_FILE)
+                    # Keep the synthesis pipeline TTS_CHUNK_PREFETCH chunks ahead of playback
+                    while len(futures) < min(len(chunks), index + TTS_CHUNK_PREFETCH + 2):
+                        futures.append(self._submit_chunk(chunks[len(futures)], engine))
+                        chunk_engines.append(engine)
 
-            # Clean up audio file
-            if os.path.exists(OUTPUT_AUDIO_FILE):
-                os.remove(OUTPUT_AUDIO_FILE)
+                    pcm = self.audio_output.trim_silence(self.audio_output.decode(audio_content, encoding))
+                    if time_to_first_audio is None:
+                        time_to_first_audio = time.perf_counter() - start
+
+                    # Blocks while the previous chunk plays; the next one is synthesized meanwhile
+                    if not self.audio_output.write(pcm, stop_event):
+                        stopped = True
+                        break
+
+                if not stopped:
+                    self.audio_output.drain()
+        finally:
+            for future in futures:
+                future.cancel()
+
+        total = time.perf_counter() - start
+        with self._stats_lock:
+            self.last_time_to_first_audio = time_to_first_audio
+            self.last_utterance_time = total
+        if stopped:
+            print(f"Debug log: {engine} stopped after {total:.3f}s")
+        else:
+            print(f"Debug log: {engine} spoke {len(chunks)} chunk(s), time to first audio "
+                  f"{time_to_first_audio:.3f}s, total {total:.3f}s")
+
+        return {
+            "engine": chunk_engine,
+            "engines": engines_used,
+            "chunks": len(chunks),
+            "time_to_first_audio_s": round(time_to_first_audio, 4) if time_to_first_audio is not None else None,
+            "total_s": round(total, 4),
+            "stopped": stopped
+        }
+
+    def prefetch(self, text, engine):
+        """
+        Start synthesizing the first chunks of an utterance that is spoken next
+
+        Returns at once; speak_with_engine picks the prefetched audio up instead
+        of requesting it again, so the utterance starts without a synthesis wait.
+
+        Args:
+            text (str): Text of the upcoming utterance
+            engine (str): "google_cloud", "gtts" or "local"
+        """
+        chunks = split_chunks(text, TTS_CHUNK_MAX_CHARS) if TTS_CHUNKED else [text]
+        chunks = chunks or [text]
+
+        with self._prefetch_lock:
+            for chunk in chunks[:TTS_CHUNK_PREFETCH + 1]:
+                if (engine, chunk) not in self._prefetched:
+                    self._prefetched[(engine, chunk)] = self.prefetch_executor.submit(self.synthesize, chunk, engine)
+            # Utterances that were cancelled before they were spoken
+            while len(self._prefetched) > self.PREFETCH_ENTRIES:
+                _, future = self._prefetched.popitem(last=False)
+                future.cancel()
+
+    def is_prefetched(self, text, engine):
+        """
+        Check whether a chunk is being (or has been) prefetched for an engine
+
+        Args:
+            text (str): Chunk text
+            engine (str): "google_cloud", "gtts" or "local"
+
+        Returns:
+            bool: True if speak_with_engine would reuse the prefetched request
+        """
+        with self._prefetch_lock:
+            return (engine, text) in self._prefetched
+
+    def _submit_chunk(self, chunk, engine):
+        """Synthesize a chunk on the chunk executor, reusing its prefetched request if there is one"""
+        with self._prefetch_lock:
+            future = self._prefetched.pop((engine, chunk), None)
+        if future is not None:
+            return future
+        return self.chunk_executor.submit(self.synthesize, chunk, engine)
+
+    def _synthesize_chunk_fallback(self, chunk, failed_engine, error):
+        """
+        Synthesize a chunk with the next engines in the ranking after its engine failed
+
+        Args:
+            chunk (str): Chunk text
+            failed_engine (str): Engine whose request failed
+            error (Exception): Its error
+
+        Returns:
+            tuple: (engine, audio_content, encoding)
+
+        Raises:
+            Exception: The last error if every engine fails
+        """
+        print(f"Chunk TTS Error ({failed_engine}): {error}")
+        self.tts_race.engine_stats.record(failed_engine, error=error)
+        for fallback in self.tts_race.engine_stats.ranking(failed_engine):
+            if fallback == failed_engine:
+                continue
+            try:
+                print(f"Falling back to {fallback} for this chunk...")
+                start = time.perf_counter()
+                audio_content, encoding = self.synthesize(chunk, fallback)
+                self.tts_race.engine_stats.record(fallback, latency=time.perf_counter() - start)
+                return fallback, audio_content, encoding
+            except Exception as fallback_error:
+                print(f"Fallback TTS also failed: {fallback_error}")
+                self.tts_race.engine_stats.record(fallback, error=fallback_error)
+                error = fallback_error
+        raise error
+
+    def _engine_settings(self, engine):
+        """
+        Get what an engine produces and how to call it
+
+        Args:
+            engine (str): "google_cloud", "gtts" or "local"
+
+        Returns:
+            tuple: (voice, language, encoding, cache encoding, synthesis function)
+
+        Raises:
+            ValueError: If the engine is unknown
+        """
+        if engine == "google_cloud":
+            # The sample rate is part of the LINEAR16 bytes, so it is part of the key
+            return (TTS_VOICE_NAME, TTS_LANGUAGE, "linear16", f"linear16/{AUDIO_SAMPLE_RATE}",
+                    self._synthesize_with_google_cloud)
+        if engine == "gtts":
+            return "gtts", "en", "mp3", "mp3", self._synthesize_with_gtts
+        if engine == "local":
+            voice = TTS_PIPER_MODEL if TTS_LOCAL_SYNTHESIZER == "piper" else f"{TTS_LOCAL_VOICE}@{TTS_LOCAL_RATE}"
+            return (f"{TTS_LOCAL_SYNTHESIZER}:{voice}", TTS_LANGUAGE, "linear16", "linear16",
+                    self._synthesize_with_local)
+        raise ValueError(f"Unknown TTS engine: {engine}")
 
+    def is_cached(self, text, engine):
+        """
+        Check whether an engine's audio for text is in the audio cache
+
+        Args:
+            text (str): Text to synthesize
+            engine (str): "google_cloud", "gtts" or "local"
+
+        Returns:
+            bool: True if synthesize() would not call the engine
+        """
+        if self.audio_cache is None:
+            return False
+        voice, language, _, cache_encoding, _ = self._engine_settings(engine)
+        return self.audio_cache.contains(AudioCache.make_key(engine, voice, language, cache_encoding, text))
+
+    def synthesize(self, text, engine):
+        """
+        Synthesize text with an engine, serving repeated utterances from the audio cache
+
+        Args:
+            text (str): Text to synthesize
+            engine (str): "google_cloud", "gtts" or "local"
+
+        Returns:
+            tuple: (audio bytes, encoding for AudioOutput: "linear16" or "mp3")
+
+        Raises:
+            ValueError: If the engine is unknown
+            Exception: If synthesis fails
+        """
+        voice, language, encoding, cache_encoding, synthesize = self._engine_settings(engine)
+
+        cache_key = None
+        if self.audio_cache is not None:
+            cache_key = AudioCache.make_key(engine, voice, language, cache_encoding, text)
+            audio_content = self.audio_cache.get(cache_key)
+            if audio_content is not None:
+                print(f"Debug log: TTS cache hit {self.audio_cache.stats()}")
+                return audio_content, encoding
+
+        audio_content = synthesize(text)
+
+        if self.audio_cache is not None:
+            self.audio_cache.put(cache_key, audio_content, text)
+
+        return audio_content, encoding
+
+    def _synthesize_with_gtts(self, text):
+        """
+        Synthesize text with gTTS
+
+        Args:
+            text (str): Text to synthesize
+
+        Returns:
+            bytes: MP3 audio
+        """
+        tts = gTTS(text=text, lang='en', timeout=TTS_ENGINE_DEADLINES["gtts"])
+        audio_buffer = io.BytesIO()
+        tts.write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+    def _synthesize_with_local(self, text):
+        """
+        Synthesize text with the local synthesizer in a subprocess (no network)
+
+        espeak-ng writes a WAV to stdout; Piper writes raw int16 PCM at the
+        model's sample rate, which is wrapped in a WAV header here. The text is
+        passed on stdin so it is never parsed as command-line options.
+
+        Args:
+            text (str): Text to synthesize
+
+        Returns:
+            bytes: LINEAR16 audio (WAV)
+
+        Raises:
+            RuntimeError: If the synthesizer is not installed or fails
+            subprocess.TimeoutExpired: If it passes its deadline
+        """
+        command = TTS_LOCAL_COMMAND or shutil.which("espeak-ng" if TTS_LOCAL_SYNTHESIZER == "espeak-ng" else "piper")
+        if not command:
+            raise RuntimeError(f"Local TTS synthesizer '{TTS_LOCAL_SYNTHESIZER}' is not installed")
+
+        if TTS_LOCAL_SYNTHESIZER == "espeak-ng":
+            args = [command, "-v", TTS_LOCAL_VOICE, "-s", str(TTS_LOCAL_RATE), "--stdout"]
+        elif TTS_LOCAL_SYNTHESIZER == "piper":
+            args = [command, "--model", TTS_PIPER_MODEL, "--output_raw"]
+        else:
+            raise RuntimeError(f"Unknown local TTS synthesizer: {TTS_LOCAL_SYNTHESIZER}")
+
+        result = subprocess.run(args, input=text.encode('utf-8'), capture_output=True,
+                                timeout=TTS_ENGINE_DEADLINES["local"])
+        if result.returncode != 0 or not result.stdout:
+            raise RuntimeError(f"{TTS_LOCAL_SYNTHESIZER} failed ({result.returncode}): "
+                               f"{result.stderr.decode('utf-8', 'replace').strip()}")
+
+        if TTS_LOCAL_SYNTHESIZER == "espeak-ng":
+            return result.stdout
+
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(TTS_PIPER_SAMPLE_RATE)
+            wav.writeframes(result.stdout)
+        return wav_buffer.getvalue()
+
+    def _get_cloud_client(self):
+        """
+        Get the process-wide Google Cloud TTS client, creating it on first use
+
+        Returns:
+            texttospeech.TextToSpeechClient: Shared client
+        """
+        with self._client_lock:
+            if self.cloud_client is None:
+                start = time.perf_counter()
+
+                # Set Google Cloud credentials
+                os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_CREDENTIALS_PATH
+                self.cloud_client = texttospeech.TextToSpeechClient()
+
+                self.client_setup_time = time.perf_counter() - start
+                print(f"Debug log: Google Cloud TTS client created in {self.client_setup_time:.3f}s")
+            return self.cloud_client
+
+    def _synthesize_with_google_cloud(self, text, record=True):
+        """
+        Synthesize text with the shared Google Cloud TTS client
+
+        Args:
+            text (str): Text to synthesize
+            record (bool): Count the request in the synthesis statistics
+
+        Returns:
+            bytes: LINEAR16 audio (WAV)
+
+        Raises:
+            Exception: If the request fails
+        """
+        client = self._get_cloud_client()
+
+        start = time.perf_counter()
+        response = client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=self.cloud_voice,
+            audio_config=self.cloud_audio_config,
+            timeout=TTS_ENGINE_DEADLINES["google_cloud"]
+        )
+        elapsed = time.perf_counter() - start
+
+        if record:
+            with self._stats_lock:
+                self.synthesis_count += 1
+                self.synthesis_time += elapsed
+                self.last_synthesis_time = elapsed
+            print(f"Debug log: Google Cloud TTS synthesis {elapsed:.3f}s {self.stats()}")
+
+        return response.audio_content
+
+    def warm_up(self):
+        """
+        Create the Google Cloud TTS client and open its channel in the background
+
+        A tiny synthesis request pays for credential loading, the gRPC channel and
+        the TLS handshake at start-up, so the first participant utterance is as
+        fast as the rest.
+
+        Returns:
+            threading.Thread: The warm-up thread
+        """
+        thread = threading.Thread(target=self._warm_up, name="tts-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        """Run the warm-up request (see warm_up)"""
+        try:
+            start = time.perf_counter()
+            self._synthesize_with_google_cloud(TTS_WARM_UP_TEXT, record=False)
+            self.warm_up_time = time.perf_counter() - start
+            print(f"Debug log: Google Cloud TTS warmed up in {self.warm_up_time:.3f}s")
         except Exception as e:
-            print(f"Google Cloud TTS Error: {e}")
-            raise e
+            print(f"Warning: Google Cloud TTS warm-up failed: {e}")
+
+    def stats(self):
+        """
+        Get the setup vs synthesis time split of Google Cloud TTS
+
+        Returns:
+            dict: client_setup_s (client creation), warm_up_s (first request incl.
+                  channel setup), syntheses, mean_synthesis_s, last_synthesis_s, and
+                  the last utterance's time_to_first_audio_s and utterance_s;
+                  engines holds the per-engine race statistics
+        """
+        with self._stats_lock:
+            mean = self.synthesis_time / self.synthesis_count if self.synthesis_count else None
+            return {
+                "client_setup_s": round(self.client_setup_time, 4) if self.client_setup_time is not None else None,
+                "warm_up_s": round(self.warm_up_time, 4) if self.warm_up_time is not None else None,
+                "syntheses": self.synthesis_count,
+                "mean_synthesis_s": round(mean, 4) if mean is not None else None,
+                "last_synthesis_s": round(self.last_synthesis_time, 4) if self.last_synthesis_time is not None else None,
+                "time_to_first_audio_s": (round(self.last_time_to_first_audio, 4)
+                                          if self.last_time_to_first_audio is not None else None),
+                "utterance_s": round(self.last_utterance_time, 4) if self.last_utterance_time is not None else None,
+                "engines": self.tts_race.engine_stats.stats()
+            }
 
-    def speak(self, text, use_google_cloud=False):
+    def speak(self, text, use_google_cloud=False, engine=None, stop_event=None):
         """
         Convert text to speech using preferred TTS engine
 
+        With TTS_RACE_ENGINES the next engine in TTS_ENGINES is started if the
+        preferred one has not answered within TTS_RACE_HEDGE_DELAY (or fails),
+        and whichever delivers first is played. Otherwise the other engines are
+        only tried, in order, after the preferred one fails.
+
         Args:
             text (str): Text to convert to speech
-            use_google_cloud (bool): If True, use Google Cloud TTS; otherwise use gTTS
+            use_google_cloud (bool): If True, prefer Google Cloud TTS; otherwise prefer gTTS
+            engine (str): Preferred engine ("google_cloud", "gtts" or "local");
+                          overrides use_google_cloud
+            stop_event (threading.Event): Optional event that stops playback early
+
+        Returns:
+            dict: Result of speak_with_engine (records which engine(s) spoke)
 
         Raises:
             Exception: If TTS conversion or playback fails
         """
+        preferred = engine or ("google_cloud" if use_google_cloud else "gtts")
+
+        if TTS_RACE_ENGINES:
+            try:
+                result = self.speak_with_engine(text, preferred, race=True, stop_event=stop_event)
+                print(f"Debug log: TTS engines {self.tts_race.engine_stats.stats()}")
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                raise e
+            return result
+
         try:
-            if use_google_cloud:
-                self.speak_with_google_cloud(text)
-            else:
-                self.speak_with_gtts(text)
+            return self.speak_with_engine(text, preferred, stop_event=stop_event)
         except Exception as e:
             print(f"TTS Error: {e}")
-            # Fallback to the other TTS method
-            try:
-                if use_google_cloud:
-                    print("Falling back to gTTS...")
-                    self.speak_with_gtts(text)
-                else:
-                    print("Falling back to Google Cloud TTS...")
-                    self.speak_with_google_cloud(text)
-            except Exception as fallback_error:
-                print(f"Fallback TTS also failed: {fallback_error}")
-                raise fallback_error
\ No newline at end of file
+            # Fallback to the other TTS engines
+            error = e
+            for fallback in TTS_ENGINES:
+                if fallback == preferred:
+                    continue
+                try:
+                    print(f"Falling back to {fallback}...")
+                    return self.speak_with_engine(text, fallback, stop_event=stop_event)
+                except Exception as fallback_error:
+                    print(f"Fallback TTS also failed: {fallback_error}")
+                    error = fallback_error
+            raise error
@@ -0,0 +1,215 @@
+"""
+TTS Race Module
+Races TTS engines (preferred engine first, the other after a hedge delay) and keeps
+per-engine statistics that decide which engine is preferred
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class EngineStats:
+    """Success and latency statistics of each TTS engine"""
+
+    def __init__(self, engines, min_samples=5, history_size=50):
+        """
+        Initialize empty statistics
+
+        Args:
+            engines (list): Engine names
+            min_samples (int): Requests per engine before the statistics rank engines
+            history_size (int): Recent latencies kept per engine
+        """
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self.engines = {
+            engine: {
+                "requests": 0, "successes": 0, "failures": 0, "timeouts": 0, "wins": 0,
+                "latencies": deque(maxlen=history_size)
+            }
+            for engine in engines
+        }
+
+    def record(self, engine, latency=None, error=None, timed_out=False):
+        """
+        Record a finished synthesis request
+
+        Args:
+            engine (str): Engine name
+            latency (float): Seconds until the audio arrived (successes only)
+            error (Exception): Set if the request failed
+            timed_out (bool): The request passed its deadline
+        """
+        with self._lock:
+            entry = self.engines[engine]
+            entry["requests"] += 1
+            if timed_out:
+                entry["timeouts"] += 1
+                entry["failures"] += 1
+            elif error is not None:
+                entry["failures"] += 1
+            else:
+                entry["successes"] += 1
+                entry["latencies"].append(latency)
+
+    def record_win(self, engine):
+        """Count a race won by an engine"""
+        with self._lock:
+            self.engines[engine]["wins"] += 1
+
+    def _cost(self, entry):
+        """Median latency divided by the success rate (lower is better)"""
+        latencies = sorted(entry["latencies"])
+        success_rate = entry["successes"] / entry["requests"]
+        if not latencies or success_rate == 0:
+            return float("inf")
+        return latencies[len(latencies) // 2] / success_rate
+
+    def ranking(self, preferred):
+        """
+        Order the engines, best first
+
+        Until every engine has min_samples requests, the preferred engine goes
+        first; afterwards the engine with the lower median latency per success
+        rate does.
+
+        Args:
+            preferred (str): Engine requested by the caller
+
+        Returns:
+            list: Engine names
+        """
+        with self._lock:
+            engines = list(self.engines)
+            default_order = sorted(engines, key=lambda engine: engine != preferred)
+            if any(entry["requests"] < self.min_samples for entry in self.engines.values()):
+                return default_order
+            return sorted(default_order, key=lambda engine: self._cost(self.engines[engine]))
+
+    def stats(self):
+        """
+        Get per-engine statistics
+
+        Returns:
+            dict: Engine -> requests, successes, failures, timeouts, wins,
+                  success_rate and median_latency_s
+        """
+        with self._lock:
+            result = {}
+            for engine, entry in self.engines.items():
+                latencies = sorted(entry["latencies"])
+                result[engine] = {
+                    "requests": entry["requests"],
+                    "successes": entry["successes"],
+                    "failures": entry["failures"],
+                    "timeouts": entry["timeouts"],
+                    "wins": entry["wins"],
+                    "success_rate": entry["successes"] / entry["requests"] if entry["requests"] else None,
+                    "median_latency_s": round(latencies[len(latencies) // 2], 4) if latencies else None
+                }
+            return result
+
+
+class TTSRace:
+    """
+    Runs a synthesis on the best-ranked engine and hedges it with the next one
+
+    The second engine starts after hedge_delay (at once if the first fails).
+    The first audio to arrive wins. Each engine has its own deadline, after
+    which it is abandoned. The loser's request is cancelled if it has not
+    started; a running request cannot be interrupted, so its result is only
+    recorded in the statistics (and the audio cache) and never played.
+    """
+
+    def __init__(self, synthesize_fn, engines, deadlines, hedge_delay=0.8, min_samples=5):
+        """
+        Initialize the race
+
+        Args:
+            synthesize_fn (callable): synthesize_fn(text, engine) -> (audio bytes, encoding)
+            engines (list): Engine names
+            deadlines (dict): Engine -> seconds before a request is abandoned
+            hedge_delay (float): Seconds before the next engine is started
+            min_samples (int): See EngineStats
+        """
+        self.synthesize_fn = synthesize_fn
+        self.deadlines = deadlines
+        self.hedge_delay = hedge_delay
+        self.engine_stats = EngineStats(engines, min_samples)
+        self.executor = ThreadPoolExecutor(max_workers=2 * len(engines), thread_name_prefix="tts-race")
+
+    def _attempt(self, text, engine):
+        """Run one engine and record its outcome (runs on the race executor)"""
+        start = time.perf_counter()
+        try:
+            result = self.synthesize_fn(text, engine)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            self.engine_stats.record(engine, error=e, timed_out=elapsed >= self.deadlines.get(engine, float("inf")))
+            raise e
+        self.engine_stats.record(engine, latency=time.perf_counter() - start)
+        return result
+
+    def run(self, text, preferred):
+        """
+        Synthesize text on whichever engine delivers first
+
+        Args:
+            text (str): Text to synthesize
+            preferred (str): Engine to try first until the statistics say otherwise
+
+        Returns:
+            tuple: (winning engine, audio bytes, encoding)
+
+        Raises:
+            Exception: The last error if every engine fails or passes its deadline
+        """
+        pending_engines = self.engine_stats.ranking(preferred)
+        running = {}          # future -> (engine, start time)
+        last_error = None
+        next_start = time.perf_counter()
+
+        while pending_engines or running:
+            now = time.perf_counter()
+
+            # Start the next engine when the hedge delay has passed (or nothing is running)
+            if pending_engines and (now >= next_start or not running):
+                engine = pending_engines.pop(0)
+                running[self.executor.submit(self._attempt, text, engine)] = (engine, now)
+                next_start = now + self.hedge_delay
+                if len(running) > 1 or last_error is not None:
+                    print(f"Debug log: TTS race started {engine}")
+
+            # Wait for a result, the next hedge or the earliest deadline
+            wake_times = [start + self.deadlines.get(engine, float("inf")) for engine, start in running.values()]
+            if pending_engines:
+                wake_times.append(next_start)
+            timeout = max(0.0, min(wake_times) - time.perf_counter())
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                engine, _ = running.pop(future)
+                try:
+                    audio_content, encoding = future.result()
+                except Exception as e:
+                    print(f"TTS race: {engine} failed: {e}")
+                    last_error = e
+                    continue
+
+                self.engine_stats.record_win(engine)
+                for loser in running:
+                    loser.cancel()
+                return engine, audio_content, encoding
+
+            # Abandon engines past their deadline
+            now = time.perf_counter()
+            for future, (engine, start) in list(running.items()):
+                if now - start >= self.deadlines.get(engine, float("inf")):
+                    print(f"TTS race: {engine} passed its {self.deadlines[engine]}s deadline")
+                    future.cancel()
+                    del running[future]
+                    last_error = TimeoutError(f"{engine} did not respond within {self.deadlines[engine]}s")
+
+        raise last_error